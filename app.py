@@ -2,15 +2,29 @@
 import streamlit as st
 import sys
 from pathlib import Path
-import os
-import pandas as pd
-from datetime import date
 
 # Add src directory to Python path so imports work
 sys.path.append(str(Path(__file__).resolve().parent / "src"))
 
 # Import the Add Entry function
 from add_entry import show_add_entry_form
+from entry_store import get_entry_store
+
+TABLE_PAGE_SIZE = 1_000  # entries sent to the browser at a time
+
+# Query results are cached per store version (changes only when entries are added), so reruns
+# (every widget change) reuse them instead of querying and re-aggregating the whole store.
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_filters(_store, version):
+    return _store.date_bounds(), _store.categories()
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_aggregates(_store, version, start, end, categories):
+    return _store.category_counts(start, end, categories), _store.timeline(start, end, categories)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_page(_store, version, start, end, categories, page):
+    return _store.query(start, end, categories, limit=TABLE_PAGE_SIZE, offset=page * TABLE_PAGE_SIZE)
 
 # ------------------ Helper functions for other pages ------------------
 
@@ -32,25 +46,42 @@ def show_home():
 def show_progress():
     st.title("📊 View Progress")
 
-    DATA_PATH = os.path.join("data", "spices_entries.csv")
-    if os.path.exists(DATA_PATH):
-        df = pd.read_csv(DATA_PATH)
-        if df.empty:
-            st.info("No entries yet. Add some SPICES experiences first!")
-        else:
-            st.subheader("All Entries")
-            st.dataframe(df)
-
-            st.subheader("Entries by Category")
-            chart_data = df['Category'].value_counts()
-            st.bar_chart(chart_data)
-
-            st.subheader("Entries Over Time")
-            df['Date'] = pd.to_datetime(df['Date'])
-            timeline = df.groupby('Date').size()
-            st.line_chart(timeline)
-    else:
+    store = get_entry_store()
+    version = store.version()
+    (first, last), all_categories = cached_filters(store, version)
+    if first is None:
         st.info("No entries yet. Add some SPICES experiences first!")
+        return
+
+    # Only the selected date range and categories are queried from the store
+    col1, col2 = st.columns(2)
+    with col1:
+        picked = st.date_input("Date range", (first, last), min_value=first, max_value=last)
+    with col2:
+        categories = st.multiselect("Categories", all_categories, default=all_categories)
+    start, end = picked if isinstance(picked, (tuple, list)) and len(picked) == 2 else (first, last)
+    categories = tuple(categories)
+
+    chart_data, timeline = cached_aggregates(store, version, start, end, categories)
+    total = int(chart_data.sum())
+    if total == 0:
+        st.info("No entries match these filters.")
+        return
+
+    st.subheader("All Entries")
+    pages = -(-total // TABLE_PAGE_SIZE)
+    page = 1
+    if pages > 1:
+        page = int(st.number_input(f"Page (of {pages}, {TABLE_PAGE_SIZE:,} entries each)",
+                                   min_value=1, max_value=pages, value=1))
+    st.caption(f"{total:,} matching entries")
+    st.dataframe(cached_page(store, version, start, end, categories, page - 1))
+
+    st.subheader("Entries by Category")
+    st.bar_chart(chart_data)
+
+    st.subheader("Entries Over Time")
+    st.line_chart(timeline)
 
 def show_settings():
     st.title("⚙️ Settings")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py
+-----------------------------
+Startup-time regression guard for SPICESsense.
+Times a fresh interpreter that imports spicessense.classify, builds a SPICESClassifier and
+classifies one keyword-matching event, and checks that no heavy ML stack was imported on the way.
+With the default semantic_suggestions=False, a keyword-matching event never needs the model, so
+this holds with sentence-transformers installed too.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget 2.0]
+Exits non-zero if the median time exceeds the budget (seconds) or a heavy module was imported.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+
+HEAVY_MODULES = ["sentence_transformers", "torch", "transformers"]
+
+PROBE = """
+import json, sys
+from spicessense.classify import SPICESClassifier
+clf = SPICESClassifier()
+result = clf.classify_text("Volunteer Food Drive", "Help the community at our campus food drive.")
+print(json.dumps({"result": result, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def run_once():
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=2.0, help="max median startup time in seconds")
+    args = parser.parse_args()
+
+    times, heavy = [], set()
+    for _ in range(args.runs):
+        elapsed, probe = run_once()
+        times.append(elapsed)
+        heavy.update(probe["heavy"])
+
+    median = statistics.median(times)
+    print(f"startup: median {median:.3f}s, min {min(times):.3f}s, max {max(times):.3f}s over {args.runs} runs")
+    ok = True
+    if heavy:
+        print(f"❌ heavy modules imported during keyword-only startup: {sorted(heavy)}")
+        ok = False
+    if median > args.budget:
+        print(f"❌ median startup {median:.3f}s exceeds budget {args.budget:.3f}s")
+        ok = False
+    if ok:
+        print("✅ startup within budget")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
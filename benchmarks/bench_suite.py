@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+bench_suite.py
+-----------------------------
+Throughput benchmarks for SPICESsense on synthetic events (see synthetic.py).
+
+Covers keyword matching (assign_spices_keywords), SPICESClassifier.classify_text and
+classify_dataframe (keyword-only and with the semantic step), SemanticMatcher.score/score_batch,
+the honors stats pipeline (ingest + metrics + tagging + pivots) and predict_attendance training.
+The semantic benchmarks use a deterministic hashing stub instead of sentence-transformers, so the
+suite runs offline and measures our code rather than the model.
+
+Per-call benchmarks (classify_text, score, ...) and model training run on at most their row cap;
+the rows actually used are recorded with each result.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 1k,100k,1m] [--only classify] [-o results.json]
+    python benchmarks/bench_suite.py --compare benchmarks/results/baseline.json [--tolerance 0.2]
+Results are written as JSON; with --compare the run exits non-zero if any benchmark is slower than
+the baseline by more than the tolerance.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic import generate_events  # noqa: E402
+from spicessense import semantic_match  # noqa: E402
+from spicessense.classify import SPICESClassifier, assign_spices_keywords  # noqa: E402
+from spicessense.keywords import SPICES_KEYWORDS  # noqa: E402
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+# ---------- offline stand-in for the sentence-transformers model ----------
+class StubEncoder:
+    """Deterministic bag-of-hashed-words embeddings (same text -> same vector, similar words -> overlap)."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in str(text).lower().split():
+                out[i, zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+        return out
+
+
+def stub_semantic_matcher(keyword_map=SPICES_KEYWORDS):
+    """SemanticMatcher backed by StubEncoder, without the on-disk cache."""
+    return semantic_match.SemanticMatcher(keyword_map, cache_dir=None, encoder=StubEncoder())
+
+
+def stub_semantic_classifier(**kwargs):
+    return SPICESClassifier(cache_dir=None, encoder=StubEncoder(), **kwargs)
+
+
+def _load_script(name):
+    path = os.path.join(REPO_ROOT, "scripts", f"{name}.py")
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---------- benchmarks: name -> (row cap or None, setup(df) -> run()) ----------
+def _texts(df):
+    return (df["Event Title"] + ". " + df["Description"]).tolist()
+
+
+def bench_assign_keywords(df):
+    texts = _texts(df)
+    return lambda: [assign_spices_keywords(t) for t in texts]
+
+
+def bench_classify_text(df):
+    clf = SPICESClassifier(use_semantic=False)
+    pairs = list(zip(df["Event Title"], df["Description"]))
+    clf.classify_text(*pairs[0])  # build the keyword tables outside the timing
+    return lambda: [clf.classify_text(t, d) for t, d in pairs]
+
+
+def bench_classify_dataframe_keywords(df):
+    clf = SPICESClassifier(use_semantic=False)
+    return lambda: clf.classify_dataframe(df, title_col="Event Title", desc_col="Description")
+
+
+def bench_classify_dataframe_semantic(df):
+    clf = stub_semantic_classifier()
+    return lambda: clf.classify_dataframe(df, title_col="Event Title", desc_col="Description")
+
+
+def bench_classify_dataframe_dedup(df):
+    clf = stub_semantic_classifier(dedup_threshold=0.8)
+    return lambda: clf.classify_dataframe(df, title_col="Event Title", desc_col="Description")
+
+
+def bench_semantic_score(df):
+    matcher = stub_semantic_matcher()
+    texts = _texts(df)
+    return lambda: [matcher.score(t) for t in texts]
+
+
+def bench_semantic_score_batch(df):
+    matcher = stub_semantic_matcher()
+    texts = _texts(df)
+    return lambda: matcher.score_batch(texts)
+
+
+def bench_honors_stats(df):
+    stats = _load_script("honors_event_stats")
+    tmp = tempfile.mkdtemp(prefix="spices_bench_")
+    path = os.path.join(tmp, "events_fall_2024.csv")
+    df.drop(columns=["Semester"]).to_csv(path, index=False)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            processed = stats.build_processed([path])
+            stats.report(processed)
+
+    return run, lambda: shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_predict_attendance_train(df):
+    pa = _load_script("predict_attendance")
+    data = df.copy()
+    data["high_attendance"] = (data[pa.TARGET_COL] > data[pa.TARGET_COL].median()).astype(int)
+    data = pa.add_features(data)
+    return lambda: pa.build_pipeline().fit(data[pa.FEATURE_COLUMNS], data["high_attendance"])
+
+
+BENCHMARKS = {
+    "assign_spices_keywords": (100_000, bench_assign_keywords),
+    "classify_text": (20_000, bench_classify_text),
+    "classify_dataframe[keywords]": (None, bench_classify_dataframe_keywords),
+    "classify_dataframe[semantic-stub]": (None, bench_classify_dataframe_semantic),
+    "classify_dataframe[semantic-stub,dedup]": (None, bench_classify_dataframe_dedup),
+    "SemanticMatcher.score[stub]": (20_000, bench_semantic_score),
+    "SemanticMatcher.score_batch[stub]": (None, bench_semantic_score_batch),
+    "honors_event_stats": (None, bench_honors_stats),
+    "predict_attendance.train": (200_000, bench_predict_attendance_train),
+}
+
+
+def time_benchmark(setup, df, repeat):
+    """setup(df) returns run, or (run, cleanup) when it leaves files behind."""
+    run, cleanup = setup(df), None
+    if isinstance(run, tuple):
+        run, cleanup = run
+    try:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+    finally:
+        if cleanup is not None:
+            cleanup()
+    return min(times)
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, only=None, repeat=3, seed=0):
+    results = []
+    for label in sizes:
+        rows = SIZES[label]
+        data = generate_events(rows, seed)
+        for name, (cap, setup) in BENCHMARKS.items():
+            if only and not any(o in name for o in only):
+                continue
+            n = rows if cap is None else min(rows, cap)
+            df = data.iloc[:n].reset_index(drop=True)
+            seconds = time_benchmark(setup, df, 1 if n >= 1_000_000 else repeat)
+            result = {"name": name, "size": label, "rows": n, "seconds": round(seconds, 6),
+                      "rows_per_sec": round(n / seconds, 1) if seconds else None}
+            results.append(result)
+            print(f"{name:<36} {label:>5} {n:>9,} rows  {seconds:>9.3f}s  {result['rows_per_sec']:>12,.0f} rows/s",
+                  flush=True)
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """Print per-benchmark ratios against a baseline; returns the list of regressions."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\nvs {baseline_path} (tolerance {tolerance:.0%}):")
+    for r in results:
+        old = baseline.get((r["name"], r["size"]))
+        if old is None or old["rows"] != r["rows"]:
+            continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        flag = "❌" if ratio > 1 + tolerance else "✅"
+        print(f"  {flag} {r['name']:<36} {r['size']:>5}  {old['seconds']:.3f}s -> {r['seconds']:.3f}s  ({ratio:.2f}x)")
+        if ratio > 1 + tolerance:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k,1m", help=f"comma-separated, from {list(SIZES)}")
+    parser.add_argument("--only", default=None, help="comma-separated substrings of benchmark names")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (best is kept; 1 at 1m rows)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default=None, help="JSON path (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", default=None, help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes {unknown}; choose from {list(SIZES)}")
+    only = [o.strip() for o in args.only.split(",")] if args.only else None
+
+    results = run_suite(sizes, only, args.repeat, args.seed)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+check_equivalence.py
+-----------------------------
+Reference checks for the compiled keyword engine and the vectorized scoring in spicessense.classify.
+- Keywords: on deterministic synthetic events (see synthetic.py) plus a word soup built to hit
+  overlapping keywords ("food drive" / "drive", "career" / "career services", partial overlaps),
+  KeywordMatcher.mask, KeywordMatcher.match and assign_spices_keywords are compared with the original
+  search: one r"\b<kw>\b" regex per keyword, run on the lowercased text.
+- Scores: combine_scores + format_scores are compared with the original per-row classify_text merge
+  and classify_dataframe formatting, on random keyword hits and float32 similarities on a 0.001 grid
+  (so exact-threshold values and printed ties occur), with and without the semantic step. Similarities
+  stop below 1.0: a semantic 1.0 is indistinguishable from a keyword hit in the score matrix.
+
+Usage:
+    python benchmarks/check_equivalence.py [--rows 20000] [--seed 0]
+Exits non-zero and prints the first mismatches if any check disagrees.
+"""
+
+import argparse
+import os
+import re
+import sys
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic import generate_events  # noqa: E402
+from spicessense.classify import assign_spices_keywords, combine_scores, format_scores  # noqa: E402
+from spicessense.keyword_match import KeywordMatcher  # noqa: E402
+from spicessense.keywords import SPICES_KEYWORDS  # noqa: E402
+
+# Keywords nested in, prefixing or partially overlapping each other, to exercise the lookahead scan
+OVERLAP_KEYWORDS = {
+    "Service": ["food drive", "drive", "community service", "service", "house party", "services fair"],
+    "Professional Development": ["career", "career services", "fair"],
+    "Cultural Exploration": ["open house", "art", "art history"],
+}
+SOUP = ["food", "drive", "community", "service", "services", "career", "fair", "open", "house", "party",
+        "art", "history", "artist", "drive-in", "Career-Services", "(art)", "houseparty", "co-op", "café"]
+
+MAX_REPORTED = 5
+
+
+# ---------- references ----------
+def reference_hits(keyword_map, text):
+    """{spice: [(start, keyword)]} with one r"\\b<kw>\\b" search per keyword."""
+    text_l = text.lower()
+    hits = {}
+    for spice, keywords in keyword_map.items():
+        for kw in keywords:
+            kw_l = kw.lower().strip()
+            m = re.search(r"\b" + re.escape(kw_l) + r"\b", text_l) if kw_l else None
+            if m:
+                hits.setdefault(spice, []).append((m.start(), kw_l))
+    return hits
+
+
+def reference_match(keyword_map, text):
+    """{spice: trigger}: the keyword that appears first, the longer one when two start together."""
+    hits = reference_hits(keyword_map, text)
+    return {spice: min(found, key=lambda p: (p[0], -len(p[1])))[1]
+            for spice in keyword_map if (found := hits.get(spice))}
+
+
+def reference_classify(spices, kw_row, sem_row, sem_threshold):
+    """{spice: score} as the original classify_text built it (sem_row None = no semantic step)."""
+    scores = {spice: 1.0 for spice, hit in zip(spices, kw_row) if hit}
+    if sem_row is None:
+        return scores or {"Uncategorized": 0.0}
+    sem = {spice: float(v) for spice, v in zip(spices, sem_row)}
+    if scores:
+        for spice, val in sem.items():
+            if val >= sem_threshold and spice not in scores:
+                scores[spice] = val
+        return scores
+    filtered = {k: v for k, v in sem.items() if v >= sem_threshold}
+    if not filtered:
+        filtered = dict(sorted(sem.items(), key=lambda x: x[1], reverse=True)[:2])
+    return filtered
+
+
+def reference_format(result):
+    """('SPICES', 'SPICES_scores') as the original classify_dataframe formatted one row."""
+    items = sorted(result.items(), key=lambda x: x[1], reverse=True)
+    return "; ".join(k for k, _ in items), "; ".join(f"{v:.3f}" for _, v in items)
+
+
+# ---------- checks ----------
+def texts_for(rows, seed):
+    df = generate_events(rows, seed)
+    rng = np.random.default_rng(seed)
+    soup = [" ".join(rng.choice(SOUP, size=rng.integers(0, 8))) for _ in range(rows)]
+    return (df["Event Title"] + ". " + df["Description"]).tolist() + soup + ["", "   ", "DRIVE", "Food  Drive"]
+
+
+def check_keywords(texts):
+    failures = []
+    for name, keyword_map in [("SPICES_KEYWORDS", SPICES_KEYWORDS), ("overlaps", OVERLAP_KEYWORDS)]:
+        matcher = KeywordMatcher(keyword_map)
+        mask = matcher.mask(texts)
+        for i, text in enumerate(texts):
+            expected = reference_match(keyword_map, text)
+            got_mask = [s for s, hit in zip(matcher.spices, mask[i]) if hit]
+            if got_mask != list(expected):
+                failures.append(f"{name} mask {text!r}: {got_mask} != {list(expected)}")
+            got = matcher.match(text)
+            if got != expected:
+                failures.append(f"{name} match {text!r}: {got} != {expected}")
+            if keyword_map is SPICES_KEYWORDS and assign_spices_keywords(text) != list(expected):
+                failures.append(f"assign_spices_keywords {text!r}: {assign_spices_keywords(text)}")
+    return failures
+
+
+def check_scores(rows, seed):
+    failures = []
+    spices = list(SPICES_KEYWORDS)
+    rng = np.random.default_rng(seed)
+    # Rows with 0, 1 or several keyword hits; similarities on a 0.001 grid, plus near-ties within it
+    kw_mask = rng.random((rows, len(spices))) < rng.choice([0.0, 0.1, 0.4], size=(rows, 1))
+    sem = rng.integers(0, 1000, (rows, len(spices))) / 1000
+    sem = (sem + rng.choice([0.0, 0.0002, -0.0002], size=sem.shape)).clip(0, 0.999).astype(np.float32)
+    for sem_threshold in (0.45, 0.3, 0.9):
+        for sem_scores in (sem, None):
+            labels, values = format_scores(combine_scores(kw_mask, sem_scores, sem_threshold), spices)
+            for i in range(rows):
+                result = reference_classify(spices, kw_mask[i], None if sem_scores is None else sem[i], sem_threshold)
+                expected = reference_format(result)
+                if (labels[i], values[i]) != expected:
+                    mode = "keywords" if sem_scores is None else f"threshold {sem_threshold}"
+                    failures.append(f"{mode} row {i}: {(labels[i], values[i])} != {expected}")
+    return failures
+
+
+def report(label, n, failures):
+    if failures:
+        print(f"❌ {label}: {len(failures):,} mismatches over {n:,} texts")
+        for line in failures[:MAX_REPORTED]:
+            print(f"   {line}")
+        return False
+    print(f"✅ {label}: {n:,} texts match the reference")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000, help="synthetic events (and as many soup texts)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = texts_for(args.rows, args.seed)
+    ok = report("keyword matching", len(texts), check_keywords(texts))
+    ok = report("score merging and formatting", args.rows, check_scores(args.rows, args.seed)) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+load_test.py
+-----------------------------
+Load-test client for the SPICES HTTP service (python -m spicessense serve).
+Keeps --concurrency keep-alive connections busy sending POST /classify requests built from synthetic
+events (see synthetic.py), then reports latency percentiles, throughput and rejected (503) requests,
+plus the server's own /metrics.
+
+Usage:
+    python benchmarks/load_test.py [--url http://127.0.0.1:8080] [--requests 2000] [--concurrency 32]
+                                   [--events-per-request 1]
+Standard library only (asyncio streams); numpy/pandas are used for the synthetic events.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic import generate_events  # noqa: E402
+
+
+async def _request(reader, writer, host, method, path, body=b""):
+    head = (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    writer.write(head.encode("latin1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    payload = await reader.readexactly(length) if length else b""
+    return status, payload
+
+
+async def _worker(host, port, bodies, next_index, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            i = next(next_index, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, host, "POST", "/classify", bodies[i])
+            statuses.append(status)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run(url, n_requests, concurrency, events_per_request, seed):
+    parsed = urlparse(url)
+    host, port = parsed.hostname or "127.0.0.1", parsed.port or 80
+    df = generate_events(n_requests * events_per_request, seed)
+    events = [{"title": t, "description": d} for t, d in zip(df["Event Title"], df["Description"])]
+    if events_per_request == 1:
+        bodies = [json.dumps(e).encode("utf-8") for e in events]
+    else:
+        bodies = [json.dumps({"events": events[i:i + events_per_request]}).encode("utf-8")
+                  for i in range(0, len(events), events_per_request)]
+
+    latencies, statuses = [], []
+    next_index = iter(range(len(bodies)))  # shared by all workers; safe within one event loop
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(host, port, bodies, next_index, latencies, statuses)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, metrics = await _request(reader, writer, host, "GET", "/metrics")
+    writer.close()
+    return latencies, statuses, elapsed, json.loads(metrics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--events-per-request", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        latencies, statuses, elapsed, metrics = asyncio.run(
+            run(args.url, args.requests, args.concurrency, args.events_per_request, args.seed))
+    except ConnectionError as e:
+        print(f"❌ Could not reach {args.url}: {e}")
+        return 1
+
+    ok = len(latencies)
+    lat = np.asarray(latencies) * 1000
+    print(f"{len(statuses)} requests, {ok} ok, {statuses.count(503)} rejected (503) in {elapsed:.2f}s")
+    if ok:
+        print(f"latency ms: p50 {np.percentile(lat, 50):.1f}, p90 {np.percentile(lat, 90):.1f}, "
+              f"p99 {np.percentile(lat, 99):.1f}, max {lat.max():.1f}")
+        print(f"throughput: {ok / elapsed:,.0f} req/s, {ok * args.events_per_request / elapsed:,.0f} events/s")
+    print(f"server: avg batch {metrics.get('avg_batch_size')}, {metrics.get('batches')} batches, "
+          f"queue depth {metrics.get('queue_depth')}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+synthetic.py
+-----------------------------
+Deterministic synthetic Honors event exports for the benchmarks.
+Titles and descriptions are assembled from the SPICES vocabulary in spicessense/keywords.py plus
+neutral filler, so the mix of keyword hits, multi-SPICE events and keyword-free (semantic fallback)
+events looks like a real export. The same (rows, seed) always produces the same table.
+
+Usage:
+    python benchmarks/synthetic.py 100000 -o /tmp/events_100k.csv
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+from spicessense.keywords import SPICES_KEYWORDS  # noqa: E402
+
+TITLE_NOUNS = ["Night", "Meetup", "Session", "Series", "Social", "Day", "Hour", "Forum", "Kickoff", "Showcase"]
+ORGS = ["the Honors College", "Student Life", "the Career Center", "the Library", "Campus Rec",
+        "the International Office", "Residence Life", "the Science Society"]
+FILLER = [
+    "Light refreshments will be provided.", "Bring a friend!", "Space is limited, so RSVP early.",
+    "Meet in the main lobby.", "All majors are welcome.", "Doors open ten minutes early.",
+    "Check the calendar for room changes.", "Questions? Email the organizers.",
+]
+NEUTRAL_TITLES = ["Open House", "Monthly Gathering", "Spring Kickoff", "Pizza Friday", "Board Games",
+                  "Movie Marathon", "Trivia Night", "Ice Cream Social"]
+EVENT_TYPES = ["Meeting", "Workshop", "Social", "Info Session", "Service", "Trip", "Lecture"]
+VISIBILITY = ["Public", "Institution", "Honors Only"]
+SEMESTERS = ["Fall 2023", "Spring 2024", "Fall 2024", "Spring 2025"]
+
+# Share of events with 0, 1 or 2 SPICE themes in their text
+THEME_WEIGHTS = [0.25, 0.55, 0.20]
+
+
+def _pick(rng, values, n):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def generate_events(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A synthetic export with the columns the scripts and classifier read."""
+    rng = np.random.default_rng(seed)
+    spices = list(SPICES_KEYWORDS)
+    vocab = [list(SPICES_KEYWORDS[s]) for s in spices]
+
+    n_themes = rng.choice(len(THEME_WEIGHTS), size=rows, p=THEME_WEIGHTS)
+    theme_a = rng.integers(0, len(spices), rows)
+    theme_b = (theme_a + rng.integers(1, len(spices), rows)) % len(spices)
+    kw_a = rng.random(rows)
+    kw_b = rng.random(rows)
+    nouns = _pick(rng, TITLE_NOUNS, rows)
+    orgs = _pick(rng, ORGS, rows)
+    filler_a = _pick(rng, FILLER, rows)
+    filler_b = _pick(rng, FILLER, rows)
+    neutral = _pick(rng, NEUTRAL_TITLES, rows)
+    start = pd.Timestamp("2023-08-21") + pd.to_timedelta(rng.integers(0, 700, rows), unit="D")
+    when = np.asarray(start.strftime("%b %d"), dtype=object)
+    rooms = rng.integers(100, 1000, rows)
+
+    titles, descriptions = [], []
+    for i in range(rows):
+        if n_themes[i] == 0:
+            titles.append(f"{neutral[i]} {nouns[i]}")
+            descriptions.append(f"Hosted by {orgs[i]} on {when[i]} in room {rooms[i]}. {filler_a[i]} {filler_b[i]}")
+            continue
+        words_a = vocab[theme_a[i]]
+        kw1 = words_a[int(kw_a[i] * len(words_a))]
+        titles.append(f"{kw1.title()} {nouns[i]}")
+        if n_themes[i] == 2:
+            words_b = vocab[theme_b[i]]
+            kw2 = words_b[int(kw_b[i] * len(words_b))]
+            descriptions.append(f"Join {orgs[i]} for {kw1} and {kw2} on {when[i]} in room {rooms[i]}. {filler_a[i]}")
+        else:
+            descriptions.append(
+                f"Join {orgs[i]} for an afternoon of {kw1} on {when[i]} in room {rooms[i]}. {filler_a[i]} {filler_b[i]}"
+            )
+
+    hours = rng.integers(8, 21, rows)
+    invited = rng.integers(20, 500, rows)
+    rsvp_yes = (invited * rng.beta(2, 8, rows)).astype(int)
+    rsvp_no = (invited * rng.beta(1, 10, rows)).astype(int)
+    rsvp_maybe = (invited * rng.beta(1, 15, rows)).astype(int)
+    no_response = np.maximum(invited - rsvp_yes - rsvp_no - rsvp_maybe, 0)
+    attended = np.minimum(rng.poisson(rsvp_yes * 0.7 + 2), invited)
+
+    return pd.DataFrame({
+        "Event Title": titles,
+        "Description": descriptions,
+        "Event Type": _pick(rng, EVENT_TYPES, rows),
+        "Visibility": _pick(rng, VISIBILITY, rows),
+        "Status": np.where(rng.random(rows) < 0.03, "Cancelled", "Active"),
+        "Start Date": start.strftime("%Y-%m-%d"),
+        "Start Time": [f"{h:02d}:00" for h in hours],
+        "Online Location": np.where(rng.random(rows) < 0.2, "https://zoom.example/j/1", None),
+        "# Invited": invited,
+        "# RSVP Yes": rsvp_yes,
+        "# RSVP No": rsvp_no,
+        "# RSVP Maybe": rsvp_maybe,
+        "# RSVP No Response": no_response,
+        "# Marked Attended": attended,
+        "Semester": _pick(rng, SEMESTERS, rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("rows", type=int)
+    parser.add_argument("-o", "--output", required=True, help="CSV path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_events(args.rows, args.seed).to_csv(args.output, index=False)
+    print(f"✅ Wrote {args.rows} synthetic events to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,24 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
-import re
+
+# Add src directory to Python path so the spicessense package imports
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from spicessense.data.processed_store import read_processed
+from spicessense.tagging import KeywordTagger, combine_text_columns
 
 # -----------------------------
 # Load data
 # -----------------------------
-CSV_PATH = "data/processed/honors_events_science_processed.csv"
 OUTPUT_PATH = "data/processed/events_with_spices.csv"
 
-df = pd.read_csv(CSV_PATH)
+# Typed processed store (Parquet) written by honors_event_stats.py; falls back to the processed CSV
+df = read_processed()
 
 # Combine text fields
-df["text"] = (
-    df["Event Title"].fillna("") + " " +
-    df["Description"].fillna("")
-).str.lower()
+text = combine_text_columns(df, ["Event Title", "Description"])
 
 # -----------------------------
 # SPICES keyword dictionary
@@ -46,26 +51,16 @@ SPICES_KEYWORDS = {
 }
 
 # -----------------------------
-# Tagging function
-# -----------------------------
-def assign_spices(text):
-    labels = {}
-    for category, keywords in SPICES_KEYWORDS.items():
-        labels[category] = int(
-            any(re.search(rf"\b{k}\b", text) for k in keywords)
-        )
-    return labels
-
-# -----------------------------
-# Apply tagging
+# Apply tagging (multi-label, whole-word matches)
 # -----------------------------
-spices_df = df["text"].apply(assign_spices).apply(pd.Series)
+tagger = KeywordTagger(SPICES_KEYWORDS, word_boundary=True)
+spices_df = tagger.tag_matrix(text).astype(int)
 
 # Rename columns for clarity
 spices_df.columns = [f"SPICES_{c.replace(' ', '_')}" for c in spices_df.columns]
 
 # Merge back
-df_out = pd.concat([df.drop(columns=["text"]), spices_df], axis=1)
+df_out = pd.concat([df, spices_df], axis=1)
 
 # Save result
 df_out.to_csv(OUTPUT_PATH, index=False)
@@ -8,83 +8,31 @@ cohort-normalized metrics, categorizes event size, applies SPICES classification
 and outputs pivot tables and summary stats.
 """
 
-import pandas as pd
 import sys
+from pathlib import Path
 
-# ---------- CONFIG ----------
-RAW_CSV_PATHS = [
-    "data/raw/Honors College Event Data 24-25(Fall 2024)(1).csv",
-    "data/events.csv"
-]
-
-PROCESSED_CSV_PATH = "data/processed/honors_events_science_processed.csv"
-HC_COHORT_SIZE = 460  # adjust per semester
-
-# ---------- LOAD DATA WITH ENCODING FALLBACK ----------
-df = None
-for path in RAW_CSV_PATHS:
-    for enc in ["utf-8", "latin1", "cp1252"]:
-        try:
-            df = pd.read_csv(path, encoding=enc)
-            print(f"✅ Loaded '{path}' successfully with encoding: {enc}")
-            break
-        except Exception as e:
-            print(f"❌ Failed to load '{path}' with encoding {enc}: {e}")
-    if df is not None:
-        break
-
-if df is None:
-    print("❌ Could not load any CSV. Exiting.")
-    sys.exit(1)
-
-# ---------- CLEAN COLUMN NAMES ----------
-df.columns = df.columns.str.strip()
-print("\nColumns loaded:")
-print(df.columns.tolist())
-
-# ---------- OPTIONAL: Drop cancelled events if column exists ----------
-if "Status" in df.columns:
-    df = df[df["Status"] != "Cancelled"].copy()
-else:
-    print("⚠️ 'Status' column not found; skipping cancelled events filter.")
-
-# ---------- ENSURE NUMERIC COLUMNS ----------
-numeric_cols = [
-    '# Invited', '# RSVP Yes', '# RSVP No', '# RSVP Maybe',
-    '# RSVP No Response', '# Marked Attended'
-]
-for col in numeric_cols:
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    else:
-        print(f"⚠️ Column '{col}' not found; filling with zeros.")
-        df[col] = 0
-
-# ---------- COHORT-NORMALIZED METRICS ----------
-df['Event_Size'] = df.get('# Marked Attended', 0)
-df['Event_Size_%'] = df['Event_Size'] / HC_COHORT_SIZE * 100
-df['Attendance_Rate'] = df['Event_Size'] / df.get('# RSVP Yes', 1).replace(0, 1)
-df['Reach_Rate'] = df['Event_Size'] / df.get('# Invited', 1).replace(0, 1)
-df['No_Response_%'] = df.get('# RSVP No Response', 0) / df.get('# Invited', 1).replace(0, 1)
-df['Engagement_Index'] = (
-    0.5 * df['Reach_Rate'] +
-    0.3 * df['Attendance_Rate'] +
-    0.2 * (1 - df['No_Response_%'])
-)
+# Add src directory to Python path so the spicessense package imports
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
-# ---------- COMMITTEE EVENT SIZE BUCKETS ----------
-def size_category(x):
-    if x <= 15:
-        return "Small"
-    elif x <= 34:
-        return "Medium"
-    else:
-        return "Large"
+from spicessense import metrics
+from spicessense.data.ingest import list_event_files, load_events
+from spicessense.data.processed_store import (
+    PARQUET_AVAILABLE, PROCESSED_CSV_PATH, PROCESSED_PARQUET_PATH, ProcessedStore,
+)
+from spicessense.tagging import KeywordTagger, combine_text_columns
 
-df['Size_Category'] = df['Event_Size'].apply(size_category)
+# ---------- CONFIG ----------
+# Every semester export under RAW_DIR is loaded; data/events.csv is used when there are none
+RAW_DIR = "data/raw"
+FALLBACK_CSV_PATHS = ["data/events.csv"]
+
+HC_COHORT_SIZE = 460  # default cohort size for semesters not listed below
+COHORT_SIZES = {
+    # "Fall 2024": 460,
+    # "Spring 2025": 452,
+}
 
-# ---------- SPICES CLASSIFICATION ----------
-spices_keywords = {
+SPICES_KEYWORDS = {
     "Service": ["volunteer", "community", "service"],
     "Professional Development": ["professional", "networking", "career", "scholarship", "info session"],
     "Intellectual Achievement": ["research", "academic", "study abroad", "competition", "thesis"],
@@ -93,48 +41,84 @@ spices_keywords = {
     "Skill Development": ["workshop", "training", "resume", "planning", "writing", "strategy", "panel"]
 }
 
-def classify_spices(title, description):
-    text = f"{title} {description}".lower()
-    for category, keywords in spices_keywords.items():
-        if any(kw.lower() in text for kw in keywords):
-            return category
-    return "Other"
 
-df['SPICES Category'] = df.apply(
-    lambda row: classify_spices(row.get('Event Title', ''), str(row.get('Description', ''))),
-    axis=1
-)
+def raw_input_paths():
+    return list_event_files(RAW_DIR) or list_event_files(FALLBACK_CSV_PATHS)
 
-# ---------- PIVOT TABLES ----------
-pivot_count = df.pivot_table(
-    index='SPICES Category',
-    columns='Size_Category',
-    values='Event_Size',
-    aggfunc='count',
-    fill_value=0
-)
 
-pivot_avg_engagement = df.pivot_table(
-    index='SPICES Category',
-    columns='Size_Category',
-    values='Engagement_Index',
-    aggfunc='mean'
-)
+def build_processed(paths):
+    """Load the raw exports (one read per file, concurrently) and derive the processed events table."""
+    # ---------- LOAD DATA (encoding sniffed per file, columns normalized, Semester tagged) ----------
+    if not paths:
+        print(f"❌ No event CSVs found in '{RAW_DIR}' or {FALLBACK_CSV_PATHS}. Exiting.")
+        sys.exit(1)
+    df = load_events(paths, verbose=True)
+
+    print("\nColumns loaded:")
+    print(df.columns.tolist())
+
+    # ---------- OPTIONAL: Drop cancelled events if column exists ----------
+    if "Status" in df.columns:
+        df = df[df["Status"] != "Cancelled"].copy()
+    else:
+        print("⚠️ 'Status' column not found; skipping cancelled events filter.")
+
+    # ---------- COHORT-NORMALIZED METRICS + SIZE BUCKETS ----------
+    metrics.ensure_numeric(df, verbose=True)
+    df = metrics.add_event_metrics(df, COHORT_SIZES, default_cohort_size=HC_COHORT_SIZE, inplace=True)
+
+    # ---------- SPICES CLASSIFICATION ----------
+    # First matching category wins (plain substring matches, as before)
+    tagger = KeywordTagger(SPICES_KEYWORDS, word_boundary=False)
+    df['SPICES Category'] = tagger.first_match(
+        combine_text_columns(df, ['Event Title', 'Description']), default="Other"
+    )
+
+    return df
+
+
+def load_processed():
+    """The processed events table, rebuilt only when the raw inputs or the processing code change."""
+    raw_paths = raw_input_paths()
+    sources = raw_paths + [__file__, metrics.__file__]
+    store = ProcessedStore(PROCESSED_PARQUET_PATH)
+    if PARQUET_AVAILABLE and store.is_fresh(sources):
+        print(f"✅ Raw inputs unchanged; loaded processed events from {PROCESSED_PARQUET_PATH}")
+        return store.read()
+
+    df = build_processed(raw_paths)
+    typed = df
+    if PARQUET_AVAILABLE:
+        typed = store.write(df, sources)
+        print(f"\n✅ Processed Parquet store saved to {PROCESSED_PARQUET_PATH}")
+    # The CSV keeps the values as they were read (dates and times as in the raw exports)
+    df.to_csv(PROCESSED_CSV_PATH, index=False)
+    print(f"\n✅ Processed CSV saved to {PROCESSED_CSV_PATH}")
+    return typed
+
+
+def report(df):
+    # ---------- PIVOT TABLES + SUMMARY STATS (one groupby pass) ----------
+    summary = metrics.summarize(df, by="SPICES Category")
+
+    print("\n--- SPICES Event Size Counts ---")
+    print(summary.counts)
+
+    print("\n--- SPICES Average Engagement Index ---")
+    print(summary.avg_engagement.round(2))
+
+    if "Semester" in df.columns and df["Semester"].nunique() > 1:
+        by_term = metrics.summarize(df, by=["Semester", "SPICES Category"])
+        print("\n--- SPICES Event Size Counts by Semester ---")
+        print(by_term.counts)
 
-# ---------- SUMMARY STATS ----------
-summary_cols = ['Event_Size_%', 'Attendance_Rate', 'Reach_Rate', 'No_Response_%', 'Engagement_Index']
-summary_stats = df[summary_cols].describe().T
+    print("\n--- Summary Statistics ---")
+    print(summary.stats.round(3))
 
-# ---------- OUTPUT ----------
-print("\n--- SPICES Event Size Counts ---")
-print(pivot_count)
 
-print("\n--- SPICES Average Engagement Index ---")
-print(pivot_avg_engagement.round(2))
+def main():
+    report(load_processed())
 
-print("\n--- Summary Statistics ---")
-print(summary_stats.round(3))
 
-# ---------- SAVE CSV ----------
-df.to_csv(PROCESSED_CSV_PATH, index=False)
-print(f"\n✅ Processed CSV saved to {PROCESSED_CSV_PATH}")
+if __name__ == "__main__":
+    main()
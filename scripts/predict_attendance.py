@@ -1,35 +1,67 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import sys
+from pathlib import Path
+
+import joblib
 import pandas as pd
 import numpy as np
 
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+import sklearn
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold, train_test_split
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import classification_report
 
+# Add src directory to Python path so the spicessense package imports
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from spicessense.data.processed_store import iter_processed, read_processed
+from spicessense.models.hashed_features import CategoryHasher
+
 
 # --------------------------------------------------
 # Configuration
 # --------------------------------------------------
 CSV_PATH = "data/processed/honors_events_science_processed.csv"
 TARGET_COL = "# Marked Attended"
+MODEL_PATH = "models/attendance_model.joblib"
+ARTIFACT_FORMAT = 1  # bump when the saved artifact layout changes
 
+TEXT_FEATURE = "text"
+CATEGORICAL_FEATURES = ["Event Type", "Visibility"]
+NUMERIC_FEATURES = ["start_hour", "day_of_week", "is_online"]
+FEATURE_COLUMNS = [TEXT_FEATURE] + CATEGORICAL_FEATURES + NUMERIC_FEATURES
+# Raw columns add_features needs (plus the target); the only ones read from the processed store
+RAW_COLUMNS = ["Event Title", "Description", "Start Date", "Start Time", "Online Location"] + CATEGORICAL_FEATURES
 
-# --------------------------------------------------
-# Load and prepare data
-# --------------------------------------------------
-def load_data(path):
-    df = pd.read_csv(path)
+# Out-of-core training (`train-online` / `update`): hashed features, fixed size whatever the history
+ONLINE_CHUNKSIZE = 50_000
+HASH_TEXT_FEATURES = 2 ** 18
+HASH_CATEGORY_FEATURES = 2 ** 12
 
-    # Drop rows with no attendance info
-    df = df.dropna(subset=[TARGET_COL])
+# Search space for `tune` (step names match build_pipeline)
+PARAM_GRID = {
+    "preprocess__text__max_features": [250, 500, 1000, 2000],
+    "preprocess__text__ngram_range": [(1, 1), (1, 2)],
+    "model__C": [0.1, 0.3, 1.0, 3.0, 10.0],
+    "model__class_weight": [None, "balanced"],
+}
 
-    # Create binary target: high vs low attendance
-    median_attendance = df[TARGET_COL].median()
-    df["high_attendance"] = (df[TARGET_COL] > median_attendance).astype(int)
 
+# --------------------------------------------------
+# Load and prepare data
+# --------------------------------------------------
+def add_features(df):
+    """Derive model features from raw event columns (no target needed)."""
     # Basic time features
     df["Start Date"] = pd.to_datetime(df["Start Date"], errors="coerce")
     df["day_of_week"] = df["Start Date"].dt.dayofweek
@@ -48,18 +80,73 @@ def load_data(path):
     return df
 
 
+def load_data(path=CSV_PATH):
+    if path == CSV_PATH:
+        # Typed Parquet store when honors_event_stats.py has built it, else the processed CSV
+        df = read_processed(columns=RAW_COLUMNS + [TARGET_COL])
+    else:
+        df = pd.read_csv(path)
+
+    # Drop rows with no attendance info
+    df = df.dropna(subset=[TARGET_COL])
+
+    # Create binary target: high vs low attendance
+    median_attendance = df[TARGET_COL].median()
+    df["high_attendance"] = (df[TARGET_COL] > median_attendance).astype(int)
+    df.attrs["attendance_threshold"] = float(median_attendance)
+
+    return add_features(df)
+
+
+def iter_labeled_chunks(path=CSV_PATH, chunksize=ONLINE_CHUNKSIZE, columns=None):
+    """Rows with attendance info, chunksize at a time (the table is never loaded whole)."""
+    columns = columns or RAW_COLUMNS + [TARGET_COL]
+    if path == CSV_PATH:
+        chunks = iter_processed(columns=columns, chunksize=chunksize)
+    else:
+        chunks = pd.read_csv(path, usecols=lambda c: c in set(columns), chunksize=chunksize)
+    for chunk in chunks:
+        chunk = chunk.dropna(subset=[TARGET_COL])
+        if len(chunk):
+            yield chunk
+
+
+def streaming_median(chunks):
+    """
+    Exact median of TARGET_COL over chunks (same value as Series.median on the whole column).
+    Keeps a count per distinct value: attendance counts are small integers, so memory does not
+    grow with the number of rows. Returns (median, rows).
+    """
+    counts = pd.Series(dtype="float64")
+    for chunk in chunks:
+        counts = counts.add(chunk[TARGET_COL].value_counts(), fill_value=0)
+    n = int(counts.sum())
+    if n == 0:
+        raise ValueError("No rows with attendance info")
+    counts = counts.sort_index()
+    cum = counts.cumsum().to_numpy()
+    values = counts.index.to_numpy(dtype=float)
+    lower = values[np.searchsorted(cum, (n - 1) // 2 + 1)]
+    upper = values[np.searchsorted(cum, n // 2 + 1)]
+    return float((lower + upper) / 2), n
+
+
 # --------------------------------------------------
 # Build ML pipeline
 # --------------------------------------------------
-def build_pipeline():
-    text_features = "text"
-    categorical_features = ["Event Type", "Visibility"]
-    numeric_features = ["start_hour", "day_of_week", "is_online"]
+def build_pipeline(max_features=500, max_iter=1000, memory=None):
+    """
+    memory: optional joblib cache location (path or joblib.Memory). With it, the fitted
+    preprocessing step is reused across model-only hyperparameter changes.
+    """
+    text_features = TEXT_FEATURE
+    categorical_features = CATEGORICAL_FEATURES
+    numeric_features = NUMERIC_FEATURES
 
     preprocessor = ColumnTransformer(
         transformers=[
             ("text", TfidfVectorizer(
-                max_features=500,
+                max_features=max_features,
                 stop_words="english"
             ), text_features),
             ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
@@ -67,27 +154,161 @@ def build_pipeline():
         ]
     )
 
-    model = LogisticRegression(max_iter=1000)
+    model = LogisticRegression(max_iter=max_iter)
 
     pipeline = Pipeline(
         steps=[
             ("preprocess", preprocessor),
             ("model", model),
-        ]
+        ],
+        memory=memory,
     )
 
     return pipeline
 
 
+def build_online_pipeline(alpha=1e-5, random_state=42):
+    """
+    Same features as build_pipeline, with stateless hashing instead of fitted vocabularies so the
+    model can learn chunk by chunk (partial_fit):
+    - text: HashingVectorizer (no vocabulary pass over the whole history)
+    - Event Type / Visibility, start_hour, day_of_week: hashed "column=value" indicators
+      (hours and weekdays as categories, which suits a linear model trained by SGD better than raw numbers)
+    - is_online: passed through
+    Logistic regression fitted by SGDClassifier(loss="log_loss").
+    """
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("text", HashingVectorizer(
+                n_features=HASH_TEXT_FEATURES,
+                stop_words="english",
+                alternate_sign=False,
+            ), TEXT_FEATURE),
+            ("cat", CategoryHasher(n_features=HASH_CATEGORY_FEATURES),
+             CATEGORICAL_FEATURES + ["start_hour", "day_of_week"]),
+            ("num", "passthrough", ["is_online"]),
+        ]
+    )
+    model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+    return Pipeline(steps=[("preprocess", preprocessor), ("model", model)])
+
+
+def train_online(make_chunks, threshold, pipeline=None, epochs=1, random_state=42):
+    """
+    Fit an online pipeline with partial_fit, one chunk at a time (make_chunks() -> iterable of
+    raw labeled chunks, called once per epoch). A fitted pipeline continues learning, e.g. from a
+    new semester.
+
+    Progressive validation: during the first epoch each chunk is scored before the model learns
+    from it, so the returned metrics are out-of-sample without a held-out copy of the data.
+    Returns (pipeline, metrics).
+    """
+    pipeline = pipeline if pipeline is not None else build_online_pipeline(random_state=random_state)
+    preprocess, model = pipeline.named_steps["preprocess"], pipeline.named_steps["model"]
+    rng = np.random.default_rng(random_state)
+    confusion = np.zeros((2, 2), dtype=np.int64)  # [actual, predicted]
+    rows = 0
+    for epoch in range(epochs):
+        for chunk in make_chunks():
+            chunk = add_features(chunk)
+            y = (chunk[TARGET_COL] > threshold).astype(int).to_numpy()
+            if not hasattr(preprocess, "transformers_"):
+                preprocess.fit(chunk[FEATURE_COLUMNS])  # stateless steps: only records the columns
+            X = preprocess.transform(chunk[FEATURE_COLUMNS])
+            if epoch == 0:
+                if hasattr(model, "classes_"):
+                    np.add.at(confusion, (y, model.predict(X)), 1)
+                rows += len(y)
+            order = rng.permutation(len(y))  # chunks often arrive sorted by semester
+            model.partial_fit(X[order], y[order], classes=np.array([0, 1]))
+
+    scored = int(confusion.sum())
+    tp, fp, fn = confusion[1, 1], confusion[0, 1], confusion[1, 0]
+    metrics = {
+        "rows": rows,
+        "progressive_rows": scored,
+        "progressive_accuracy": float(np.trace(confusion) / scored) if scored else None,
+        "progressive_f1": float(2 * tp / (2 * tp + fp + fn)) if (2 * tp + fp + fn) else None,
+    }
+    return pipeline, metrics
+
+
 # --------------------------------------------------
-# Train, evaluate, explain
+# Persisted model artifact
 # --------------------------------------------------
-def main():
-    df = load_data(CSV_PATH)
+def save_model(pipeline, path, threshold, train_rows, metrics=None, training="batch"):
+    """
+    Save the fitted pipeline with everything needed to score later without refitting:
+    feature schema, the training median threshold and version info.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    artifact = {
+        "format": ARTIFACT_FORMAT,
+        "model_version": datetime.now().strftime("%Y%m%d-%H%M%S"),
+        "sklearn_version": sklearn.__version__,
+        "pipeline": pipeline,
+        "feature_schema": {
+            "text": TEXT_FEATURE,
+            "categorical": CATEGORICAL_FEATURES,
+            "numeric": NUMERIC_FEATURES,
+        },
+        "target": TARGET_COL,
+        "threshold": threshold,  # high_attendance = attended > threshold
+        "train_rows": int(train_rows),
+        "training": training,  # "batch" (train/tune) or "online" (train-online/update; can be updated)
+        "metrics": metrics or {},
+    }
+    joblib.dump(artifact, path)
+    return artifact
+
+
+def load_model(path):
+    artifact = joblib.load(path)
+    if not isinstance(artifact, dict) or artifact.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"{path} is not a format-{ARTIFACT_FORMAT} attendance model artifact")
+    if artifact["sklearn_version"] != sklearn.__version__:
+        print(f"⚠️ Model was trained with scikit-learn {artifact['sklearn_version']}, "
+              f"running {sklearn.__version__}")
+    return artifact
+
+
+class AttendanceScorer:
+    """Load a saved model once, then score any number of event batches (no refitting)."""
 
-    X = df[
-        ["text", "Event Type", "Visibility", "start_hour", "day_of_week", "is_online"]
-    ]
+    def __init__(self, path=MODEL_PATH):
+        self.artifact = load_model(path)
+        self.pipeline = self.artifact["pipeline"]
+        schema = self.artifact["feature_schema"]
+        self.columns = [schema["text"]] + schema["categorical"] + schema["numeric"]
+
+    def score(self, df):
+        """Return df with high_attendance_proba / predicted_high_attendance / model_version columns."""
+        # Checked on the raw columns: add_features itself fails with a KeyError on the first missing one
+        missing = [c for c in RAW_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Input is missing columns needed for the features: {missing}")
+        df = add_features(df.copy())
+        proba = self.pipeline.predict_proba(df[self.columns])[:, 1]
+        df["high_attendance_proba"] = proba
+        df["predicted_high_attendance"] = (proba >= 0.5).astype(int)
+        df["model_version"] = self.artifact["model_version"]
+        return df
+
+    def score_csv(self, in_path, out_path, chunksize=50_000):
+        """Score a CSV in chunks, appending to out_path. Returns rows scored."""
+        total = 0
+        for i, chunk in enumerate(pd.read_csv(in_path, chunksize=chunksize)):
+            scored = self.score(chunk)
+            scored.to_csv(out_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+            total += len(scored)
+        return total
+
+
+# --------------------------------------------------
+# Train, evaluate, explain
+# --------------------------------------------------
+def train_and_evaluate(df):
+    X = df[FEATURE_COLUMNS]
     y = df["high_attendance"]
 
     X_train, X_test, y_train, y_test = train_test_split(
@@ -102,6 +323,10 @@ def main():
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred))
 
+    return pipeline, classification_report(y_test, y_pred, output_dict=True)
+
+
+def explain(pipeline):
     # --------------------------------------------------
     # Feature importance (explanation)
     # --------------------------------------------------
@@ -120,6 +345,183 @@ def main():
     print(importance.tail(10))
 
 
+# --------------------------------------------------
+# Hyperparameter search
+# --------------------------------------------------
+def tune(df, search="grid", n_iter=20, cv=5, n_jobs=-1, scoring="f1", cache_dir=None, random_state=42):
+    """
+    Cross-validated search over PARAM_GRID with folds fitted in parallel (n_jobs).
+
+    The pipeline is built with a joblib memory, so for each fold the TF-IDF/one-hot
+    preprocessing is fitted once per preprocessing setting and reused for every model
+    setting (C, class_weight) tried on it. cache_dir=None uses a temporary directory
+    that is removed afterwards. Returns the fitted search object.
+    """
+    X = df[FEATURE_COLUMNS]
+    y = df["high_attendance"]
+
+    tmp_dir = None
+    if cache_dir is None:
+        cache_dir = tmp_dir = tempfile.mkdtemp(prefix="spices_tune_")
+    memory = joblib.Memory(location=cache_dir, verbose=0)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+
+    try:
+        pipeline = build_pipeline(memory=memory)
+        if search == "grid":
+            searcher = GridSearchCV(pipeline, PARAM_GRID, scoring=scoring, cv=folds, n_jobs=n_jobs)
+        elif search == "random":
+            searcher = RandomizedSearchCV(pipeline, PARAM_GRID, n_iter=n_iter, scoring=scoring, cv=folds,
+                                          n_jobs=n_jobs, random_state=random_state)
+        else:
+            raise ValueError(f"search must be 'grid' or 'random', got {search!r}")
+
+        start = time.perf_counter()
+        searcher.fit(X, y)
+        searcher.wall_clock_ = time.perf_counter() - start
+        # Keep the returned model independent of the (possibly temporary) cache
+        searcher.best_estimator_.set_params(memory=None)
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    n_candidates = len(searcher.cv_results_["params"])
+    print(f"\n⏱️ {search} search: {n_candidates} configurations x {cv} folds in {searcher.wall_clock_:.1f}s")
+    print(f"Best {scoring}: {searcher.best_score_:.3f}")
+    print("Best configuration:")
+    for name, value in sorted(searcher.best_params_.items()):
+        print(f"  {name} = {value!r}")
+    return searcher
+
+
+def cmd_report(args):
+    df = load_data(args.data)
+    pipeline, _ = train_and_evaluate(df)
+    explain(pipeline)
+
+
+def cmd_train(args):
+    df = load_data(args.data)
+    pipeline, report = train_and_evaluate(df)
+    explain(pipeline)
+
+    # The saved model is refit on every labeled row
+    final = build_pipeline().fit(df[FEATURE_COLUMNS], df["high_attendance"])
+    artifact = save_model(final, args.model, df.attrs["attendance_threshold"], len(df),
+                          metrics={"holdout_accuracy": report["accuracy"]})
+    print(f"\n✅ Saved model {artifact['model_version']} to {args.model}")
+
+
+def cmd_tune(args):
+    df = load_data(args.data)
+    searcher = tune(df, search=args.search, n_iter=args.n_iter, cv=args.cv, n_jobs=args.n_jobs,
+                    scoring=args.scoring, cache_dir=args.cache_dir)
+    if args.save:
+        # best_estimator_ is already refit on every labeled row
+        artifact = save_model(searcher.best_estimator_, args.model, df.attrs["attendance_threshold"], len(df),
+                              metrics={f"cv_{args.scoring}": float(searcher.best_score_),
+                                       "best_params": {k: repr(v) for k, v in searcher.best_params_.items()}})
+        print(f"\n✅ Saved model {artifact['model_version']} to {args.model}")
+
+
+def _print_online_metrics(metrics):
+    if metrics["progressive_accuracy"] is None:
+        return
+    line = f"Progressive validation on {metrics['progressive_rows']:,} rows: accuracy {metrics['progressive_accuracy']:.3f}"
+    # F1 is undefined when no event was high attendance and none was predicted so
+    if metrics["progressive_f1"] is not None:
+        line += f", F1 {metrics['progressive_f1']:.3f}"
+    print(line)
+
+
+def cmd_train_online(args):
+    start = time.perf_counter()
+    # Pass 1: the target column only, for the high-attendance threshold
+    threshold, n = streaming_median(iter_labeled_chunks(args.data, args.chunksize, columns=[TARGET_COL]))
+    print(f"Attendance median over {n:,} events: {threshold:g}")
+
+    # Pass 2 (per epoch): features chunk by chunk
+    pipeline, metrics = train_online(lambda: iter_labeled_chunks(args.data, args.chunksize), threshold,
+                                     epochs=args.epochs)
+    _print_online_metrics(metrics)
+    artifact = save_model(pipeline, args.model, threshold, metrics["rows"], metrics=metrics, training="online")
+    print(f"\n✅ Saved model {artifact['model_version']} to {args.model} "
+          f"({metrics['rows']:,} rows in {time.perf_counter() - start:.1f}s)")
+
+
+def cmd_update(args):
+    artifact = load_model(args.model)
+    if artifact.get("training") != "online":
+        raise SystemExit(f"❌ {args.model} was not trained with train-online; it cannot be updated in place")
+    threshold = artifact["threshold"]
+    # Keep the original threshold so old and new labels mean the same thing; report drift instead
+    new_median, n = streaming_median(iter_labeled_chunks(args.input, args.chunksize, columns=[TARGET_COL]))
+    print(f"{n:,} new events, attendance median {new_median:g} (model threshold {threshold:g})")
+
+    pipeline, metrics = train_online(lambda: iter_labeled_chunks(args.input, args.chunksize), threshold,
+                                     pipeline=artifact["pipeline"], epochs=args.epochs)
+    # Scored before learning from them: how the previous model did on the new events
+    _print_online_metrics(metrics)
+    total = artifact["train_rows"] + metrics["rows"]
+    updated = save_model(pipeline, args.output or args.model, threshold, total,
+                         metrics={**metrics, "previous_version": artifact["model_version"]}, training="online")
+    print(f"\n✅ Saved model {updated['model_version']} ({total:,} rows seen) to {args.output or args.model}")
+
+
+def cmd_score(args):
+    scorer = AttendanceScorer(args.model)
+    try:
+        total = scorer.score_csv(args.input, args.output, chunksize=args.chunksize)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    print(f"✅ Scored {total} events with model {scorer.artifact['model_version']} -> {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict high vs low event attendance.")
+    parser.add_argument("--data", default=CSV_PATH, help="processed events CSV with attendance")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("train", help="train, evaluate and save a model artifact")
+    p.add_argument("--model", default=MODEL_PATH)
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("tune", help="cross-validated hyperparameter search (parallel folds)")
+    p.add_argument("--search", choices=["grid", "random"], default="grid")
+    p.add_argument("--n-iter", type=int, default=20, help="configurations to sample with --search random")
+    p.add_argument("--cv", type=int, default=5, help="number of folds")
+    p.add_argument("--n-jobs", type=int, default=-1, help="parallel fits (-1 = all cores)")
+    p.add_argument("--scoring", default="f1")
+    p.add_argument("--cache-dir", default=None, help="keep the preprocessing cache here (default: temporary)")
+    p.add_argument("--save", action="store_true", help="save the best model like `train` does")
+    p.add_argument("--model", default=MODEL_PATH)
+    p.set_defaults(func=cmd_tune)
+
+    p = sub.add_parser("train-online", help="train out of core on hashed features, chunk by chunk, and save")
+    p.add_argument("--model", default=MODEL_PATH)
+    p.add_argument("--chunksize", type=int, default=ONLINE_CHUNKSIZE, help="rows held in memory at a time")
+    p.add_argument("--epochs", type=int, default=1, help="passes over the data")
+    p.set_defaults(func=cmd_train_online)
+
+    p = sub.add_parser("update", help="continue training a train-online model on new events (e.g. a new semester)")
+    p.add_argument("--model", default=MODEL_PATH)
+    p.add_argument("--input", required=True, help="CSV of new events with attendance")
+    p.add_argument("--output", default=None, help="where to save the updated model (default: overwrite --model)")
+    p.add_argument("--chunksize", type=int, default=ONLINE_CHUNKSIZE)
+    p.add_argument("--epochs", type=int, default=1)
+    p.set_defaults(func=cmd_update)
+
+    p = sub.add_parser("score", help="score new events with a saved model (no refitting)")
+    p.add_argument("--model", default=MODEL_PATH)
+    p.add_argument("--input", required=True, help="CSV of events to score")
+    p.add_argument("--output", required=True, help="where to write the scored CSV")
+    p.add_argument("--chunksize", type=int, default=50_000)
+    p.set_defaults(func=cmd_score)
+
+    args = parser.parse_args(argv)
+    # No subcommand: original behaviour (train on a split, report, explain; nothing saved)
+    getattr(args, "func", cmd_report)(args)
+
+
 if __name__ == "__main__":
     main()
-
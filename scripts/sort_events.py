@@ -1,7 +1,14 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-# Load Excel file (replace with your file name)
-df = pd.read_excel("honors_events.xlsx")
+# Add src directory to Python path so the spicessense package imports
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from spicessense.data.processed_store import cached_excel
+from spicessense.tagging import KeywordTagger, combine_text_columns
+
+# Load Excel file (replace with your file name); a Parquet copy is reused until the workbook changes
+df = cached_excel("honors_events.xlsx")
 
 # Define SPICES categories and keyword triggers
 spices_keywords = {
@@ -34,22 +41,10 @@ spices_keywords = {
     ]
 }
 
-# Assign SPICES category
-def assign_spices(row):
-    text = (
-        str(row.get("Event Title", "")) + " " +
-        str(row.get("Description", "")) + " " +
-        str(row.get("Event Type", ""))
-    ).lower()
-
-    for category, keywords in spices_keywords.items():
-        if any(keyword in text for keyword in keywords):
-            return category
-
-    return "Uncategorized"
-
-# Apply the categorization
-df["SPICES Category"] = df.apply(assign_spices, axis=1)
+# Assign SPICES category: first category whose keyword appears in the title, description or type
+tagger = KeywordTagger(spices_keywords, word_boundary=False)
+text = combine_text_columns(df, ["Event Title", "Description", "Event Type"])
+df["SPICES Category"] = tagger.first_match(text, default="Uncategorized")
 
 # Save the result
 df.to_excel("honors_events_SPICES_labeled.xlsx", index=False)
@@ -1,16 +1,8 @@
 # src/add_entry.py
 import streamlit as st
-import pandas as pd
 from datetime import date
-import os
 
-DATA_PATH = os.path.join("data", "spices_entries.csv")
-
-# Ensure data folder exists
-if not os.path.exists("data"):
-    os.makedirs("data")
-if not os.path.exists(DATA_PATH):
-    pd.DataFrame(columns=["Date", "Category", "Reflection"]).to_csv(DATA_PATH, index=False)
+from entry_store import get_entry_store
 
 def show_add_entry_form():
     st.subheader("✍️ Add a New SPICES Entry")
@@ -37,9 +29,7 @@ def show_add_entry_form():
         if reflection.strip() == "":
             st.warning("Please enter a reflection before saving.")
         else:
-            new_entry = pd.DataFrame([[entry_date, category, reflection]],
-                                     columns=["Date", "Category", "Reflection"])
-            new_entry.to_csv(DATA_PATH, mode="a", header=False, index=False)
+            get_entry_store().add_entry(entry_date, category, reflection)
             st.success("✅ Entry saved successfully!")
 
 
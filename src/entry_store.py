@@ -0,0 +1,361 @@
+# src/entry_store.py
+"""
+Pluggable storage for SPICES reflection entries (Date, Category, Reflection).
+- SQLiteEntryStore (default): WAL mode, indexed on Date and Category, batched inserts in one transaction,
+  aggregates computed in SQL for just the requested date range / categories.
+- CSVEntryStore: the original data/spices_entries.csv, with a file lock around appends; reads parse
+  only the rows appended since the previous read.
+The first time the SQLite store opens, existing CSV entries are migrated into it (recorded so it runs once).
+
+Pick the backend with SPICESSENSE_ENTRY_BACKEND=sqlite|csv.
+"""
+
+import io
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    import fcntl  # advisory file locks (Unix only)
+except ImportError:
+    fcntl = None
+
+DATA_DIR = "data"
+CSV_PATH = os.path.join(DATA_DIR, "spices_entries.csv")
+SQLITE_PATH = os.path.join(DATA_DIR, "spices_entries.db")
+
+COLUMNS = ["Date", "Category", "Reflection"]
+
+Entry = Tuple[date, str, str]  # (date, category, reflection)
+
+
+def _iso(d) -> Optional[str]:
+    if d is None:
+        return None
+    if isinstance(d, (date, datetime, pd.Timestamp)):
+        return pd.Timestamp(d).strftime("%Y-%m-%d")
+    return pd.Timestamp(str(d)).strftime("%Y-%m-%d")
+
+
+class EntryStore:
+    """Interface shared by the storage backends."""
+
+    def add_entries(self, entries: Iterable[Entry]) -> int:
+        """Store many entries at once; returns how many were written."""
+        raise NotImplementedError
+
+    def add_entry(self, entry_date, category: str, reflection: str):
+        self.add_entries([(entry_date, category, reflection)])
+
+    def query(self, start=None, end=None, categories: Optional[Sequence[str]] = None,
+              limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """
+        Entries with start <= Date <= end and Category in categories (None = no filter), in insertion
+        order; limit/offset select one page of them.
+        """
+        raise NotImplementedError
+
+    def version(self) -> tuple:
+        """Cheap value that changes whenever entries are added or removed (a cache key for query results)."""
+        raise NotImplementedError
+
+    def category_counts(self, start=None, end=None, categories=None) -> pd.Series:
+        raise NotImplementedError
+
+    def timeline(self, start=None, end=None, categories=None) -> pd.Series:
+        """Number of entries per Date."""
+        raise NotImplementedError
+
+    def date_bounds(self) -> Tuple[Optional[date], Optional[date]]:
+        raise NotImplementedError
+
+    def categories(self) -> List[str]:
+        raise NotImplementedError
+
+
+# ---------- SQLite ----------
+class SQLiteEntryStore(EntryStore):
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()  # one connection per thread (Streamlit sessions run in threads)
+        with self._conn() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    reflection TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date);
+                CREATE INDEX IF NOT EXISTS idx_entries_category_date ON entries(category, date);
+                CREATE TABLE IF NOT EXISTS migrations (
+                    source TEXT PRIMARY KEY,
+                    rows INTEGER NOT NULL,
+                    migrated_at TEXT NOT NULL
+                );
+                """
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")      # readers never block the writer
+            conn.execute("PRAGMA synchronous=NORMAL")    # safe with WAL, far fewer fsyncs
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        conn = self._connection()
+        with conn:  # one transaction: commit on success, roll back on error
+            yield conn
+
+    def add_entries(self, entries: Iterable[Entry]) -> int:
+        rows = [(_iso(d), str(c), str(r)) for d, c, r in entries]
+        if not rows:
+            return 0
+        with self._conn() as conn:
+            conn.executemany("INSERT INTO entries (date, category, reflection) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    @staticmethod
+    def _where(start, end, categories):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(_iso(start))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(_iso(end))
+        if categories is not None:
+            categories = list(categories)
+            if not categories:
+                return " WHERE 0", []
+            clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, start=None, end=None, categories=None, limit=None, offset=0) -> pd.DataFrame:
+        where, params = self._where(start, end, categories)
+        page = ""
+        if limit is not None:
+            page = " LIMIT ? OFFSET ?"
+            params = params + [int(limit), int(offset)]
+        df = pd.read_sql_query(
+            f"SELECT date AS Date, category AS Category, reflection AS Reflection FROM entries{where} "
+            f"ORDER BY id{page}",
+            self._connection(), params=params,
+        )
+        df["Date"] = pd.to_datetime(df["Date"])
+        return df
+
+    def category_counts(self, start=None, end=None, categories=None) -> pd.Series:
+        where, params = self._where(start, end, categories)
+        rows = self._connection().execute(
+            f"SELECT category, COUNT(*) AS n FROM entries{where} GROUP BY category ORDER BY n DESC", params
+        ).fetchall()
+        return pd.Series({c: n for c, n in rows}, dtype="int64", name="count").rename_axis("Category")
+
+    def timeline(self, start=None, end=None, categories=None) -> pd.Series:
+        where, params = self._where(start, end, categories)
+        rows = self._connection().execute(
+            f"SELECT date, COUNT(*) FROM entries{where} GROUP BY date ORDER BY date", params
+        ).fetchall()
+        index = pd.to_datetime(pd.Index([d for d, _ in rows], name="Date"))
+        return pd.Series([n for _, n in rows], index=index, dtype="int64")
+
+    def version(self) -> tuple:
+        # MAX(id) is one b-tree lookup; COUNT(*) catches deletions and scans the smallest index
+        return tuple(self._connection().execute("SELECT MAX(id), COUNT(*) FROM entries").fetchone())
+
+    def date_bounds(self):
+        lo, hi = self._connection().execute("SELECT MIN(date), MAX(date) FROM entries").fetchone()
+        return (pd.Timestamp(lo).date() if lo else None, pd.Timestamp(hi).date() if hi else None)
+
+    def categories(self) -> List[str]:
+        rows = self._connection().execute("SELECT DISTINCT category FROM entries ORDER BY category").fetchall()
+        return [c for (c,) in rows]
+
+    def migrate_csv(self, csv_path: str = CSV_PATH) -> int:
+        """
+        One-time import of an existing entries CSV. Returns the number of rows imported
+        (0 if the file is missing or was already migrated).
+        """
+        if not os.path.exists(csv_path):
+            return 0
+        source = os.path.abspath(csv_path)
+        with self._conn() as conn:
+            # BEGIN IMMEDIATE: two sessions starting at once must not both import the file
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM migrations WHERE source = ?", (source,)).fetchone():
+                return 0
+            df = pd.read_csv(csv_path)
+            rows = [
+                (_iso(d), str(c), "" if pd.isna(r) else str(r))
+                for d, c, r in df.reindex(columns=COLUMNS).itertuples(index=False)
+                if not pd.isna(d) and not pd.isna(c)
+            ]
+            conn.executemany("INSERT INTO entries (date, category, reflection) VALUES (?, ?, ?)", rows)
+            conn.execute(
+                "INSERT INTO migrations (source, rows, migrated_at) VALUES (?, ?, ?)",
+                (source, len(rows), datetime.now().isoformat(timespec="seconds")),
+            )
+        return len(rows)
+
+
+# ---------- CSV ----------
+class CSVEntryStore(EntryStore):
+    """
+    Entries in a CSV file. The parsed entries are kept in memory; the file's size and mtime decide
+    whether anything needs reading, and then only the complete lines appended since the last read are
+    parsed. A shrunk or rewritten file (different header) is reloaded in full.
+    """
+
+    def __init__(self, path: str = CSV_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not os.path.exists(path):
+            pd.DataFrame(columns=COLUMNS).to_csv(path, index=False)
+        self._lock = threading.Lock()       # appends
+        self._read_lock = threading.Lock()  # the in-memory entries, shared by all sessions
+        self._reset()
+
+    def _reset(self):
+        self._entries = pd.DataFrame({c: pd.Series(dtype=object) for c in COLUMNS})
+        self._entries["Date"] = pd.Series(dtype="datetime64[ns]")
+        self._columns = None
+        self._header = b""
+        self._offset = 0        # bytes consumed (always at a record boundary)
+        self._stat = None       # (size, mtime_ns) at the last read
+
+    def _read(self) -> pd.DataFrame:
+        """All entries, after parsing whatever was appended since the last call."""
+        with self._read_lock:
+            if not os.path.exists(self.path):
+                self._reset()
+                return self._entries
+            st = os.stat(self.path)
+            stat = (st.st_size, st.st_mtime_ns)
+            if stat != self._stat:
+                if st.st_size < self._offset or not self._same_header():
+                    self._reset()
+                self._read_new(st.st_size)
+                self._stat = stat
+            return self._entries
+
+    def _same_header(self) -> bool:
+        if not self._header:
+            return True
+        with open(self.path, "rb") as f:
+            return f.read(len(self._header)) == self._header
+
+    def _read_new(self, size: int):
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        # Only consume complete lines; a record still being written is picked up next time
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return
+        data = data[:end]
+        if self._columns is None:
+            header_end = data.find(b"\n") + 1
+            self._header = data[:header_end]
+            self._columns = pd.read_csv(io.BytesIO(self._header), nrows=0).columns.tolist()
+            body = data[header_end:]
+        else:
+            body = data
+        self._offset += end
+        if not body.strip():
+            return
+        new = pd.read_csv(io.BytesIO(body), header=None, names=self._columns)
+        if "Date" in new.columns:
+            new["Date"] = pd.to_datetime(new["Date"], errors="coerce")
+        self._entries = new if self._entries.empty else pd.concat([self._entries, new], ignore_index=True)
+
+    def add_entries(self, entries: Iterable[Entry]) -> int:
+        new = pd.DataFrame([(_iso(d), c, r) for d, c, r in entries], columns=COLUMNS)
+        if new.empty:
+            return 0
+        payload = new.to_csv(header=False, index=False)
+        # One write per batch, under a process lock and an advisory file lock so appends never interleave
+        with self._lock, open(self.path, "a", encoding="utf-8", newline="") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(payload)
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return len(new)
+
+    def _filtered(self, start, end, categories) -> pd.DataFrame:
+        df = self._read()
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df["Date"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= df["Date"] <= pd.Timestamp(end)
+        if categories is not None:
+            mask &= df["Category"].isin(list(categories))
+        return df[mask]
+
+    def query(self, start=None, end=None, categories=None, limit=None, offset=0) -> pd.DataFrame:
+        df = self._filtered(start, end, categories)
+        if limit is not None:
+            df = df.iloc[offset:offset + limit]
+        return df.reset_index(drop=True)
+
+    def version(self) -> tuple:
+        st = os.stat(self.path)
+        return st.st_size, st.st_mtime_ns
+
+    def category_counts(self, start=None, end=None, categories=None) -> pd.Series:
+        return self._filtered(start, end, categories)["Category"].value_counts()
+
+    def timeline(self, start=None, end=None, categories=None) -> pd.Series:
+        return self._filtered(start, end, categories).groupby("Date").size()
+
+    def date_bounds(self):
+        dates = self._read()["Date"].dropna()
+        if dates.empty:
+            return None, None
+        return dates.min().date(), dates.max().date()
+
+    def categories(self) -> List[str]:
+        return sorted(self._read()["Category"].dropna().astype(str).unique().tolist())
+
+
+# ---------- factory ----------
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_entry_store(backend: Optional[str] = None) -> EntryStore:
+    """
+    Process-wide store for the configured backend (shared by all Streamlit sessions).
+    The SQLite store imports the legacy CSV on first use.
+    """
+    backend = (backend or os.environ.get("SPICESSENSE_ENTRY_BACKEND", "sqlite")).lower()
+    with _STORES_LOCK:
+        store = _STORES.get(backend)
+        if store is None:
+            if backend == "sqlite":
+                store = SQLiteEntryStore(SQLITE_PATH)
+                store.migrate_csv(CSV_PATH)
+            elif backend == "csv":
+                store = CSVEntryStore(CSV_PATH)
+            else:
+                raise ValueError(f"Unknown entry store backend: {backend!r} (use 'sqlite' or 'csv')")
+            _STORES[backend] = store
+        return store
@@ -5,55 +5,175 @@ Core classification logic for SPICESsense.
 - Falls back to semantic similarity if no keyword matches or for low-confidence cases.
 """
 
-import re
-from typing import List, Dict
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterable, Iterator, Optional
+import numpy as np
 import pandas as pd
 
 from .keywords import SPICES_KEYWORDS
+from .keyword_match import get_keyword_matcher, _keyword_signature
+from .config import EMBEDDING_CACHE_DIR, ENCODER_BACKEND, SEMANTIC_POOLING
+from .encoders import HashingNgramEncoder, resolve_backend
+from .stats import NULL_STATS, ClassifierStats
 
-# Attempt to import semantic matcher, but handle absence gracefully
-try:
-    from .semantic_match import SemanticMatcher, SENT_TRANSFORMERS_AVAILABLE
-    _SEM_AVAILABLE = SENT_TRANSFORMERS_AVAILABLE
-except Exception:
-    _SEM_AVAILABLE = False
-    SemanticMatcher = None
+def assign_spices_keywords(text: str) -> List[str]:
+    """
+    Return list of SPICES that have at least one keyword present in text.
+    """
+    return list(get_keyword_matcher(SPICES_KEYWORDS).match(text))
 
-# Precompile simple word boundary patterns to avoid substring false positives
-def _word_in_text(word: str, text: str) -> bool:
+def assign_spices_keywords_with_triggers(text: str) -> Dict[str, str]:
     """
-    Return True if 'word' appears as a term in text (case-insensitive),
-    allowing simple phrases. Uses regex word boundaries for safety.
+    Return {spice: keyword} for every matched SPICE, with the keyword that triggered it.
     """
-    pattern = r"\b" + re.escape(word.lower()) + r"\b"
-    return re.search(pattern, text.lower()) is not None
+    return get_keyword_matcher(SPICES_KEYWORDS).match(text)
 
-def assign_spices_keywords(text: str) -> List[str]:
+def combine_scores(kw_mask: np.ndarray, sem_scores: Optional[np.ndarray], sem_threshold: float) -> np.ndarray:
     """
-    Return list of SPICES that have at least one keyword present in text.
+    Vectorized merge of keyword hits and semantic similarities for many rows.
+    kw_mask: bool (rows, spices); sem_scores: float (rows, spices) or None.
+    Returns float32 (rows, spices) holding each assigned SPICE's score and NaN elsewhere:
+    - keyword matches score 1.0; semantic scores >= sem_threshold are added for the other SPICES
+    - rows without keyword matches keep semantic scores >= sem_threshold, or the top-2 as soft suggestions
+    - without semantic scores, rows with no keyword match stay all-NaN ("Uncategorized")
     """
-    matches = []
-    text_l = text.lower()
-    for spice, keywords in SPICES_KEYWORDS.items():
-        for kw in keywords:
-            # check whole phrase or word match
-            if _word_in_text(kw, text_l) or kw.lower() in text_l:
-                matches.append(spice)
-                break
-    return matches
+    if sem_scores is None:
+        return np.where(kw_mask, np.float32(1.0), np.float32(np.nan)).astype(np.float32)
+    sem_scores = np.asarray(sem_scores, dtype=np.float32)
+    # Compare in float64, as the per-row merge did with float(score): float32(0.45) < 0.45
+    above = sem_scores >= np.float64(sem_threshold)
+    scores = np.where(kw_mask, np.float32(1.0), np.where(above, sem_scores, np.float32(np.nan))).astype(np.float32)
+    soft = np.flatnonzero(~kw_mask.any(axis=1) & ~above.any(axis=1))
+    if len(soft):
+        top = np.argsort(-sem_scores[soft], axis=1, kind="stable")[:, :2]
+        scores[soft[:, None], top] = sem_scores[soft[:, None], top]
+    return scores
+
+def format_scores(scores: np.ndarray, spices: List[str]):
+    """
+    Turn a (rows, spices) score matrix (NaN = not assigned) into the 'SPICES' / 'SPICES_scores'
+    strings: labels sorted by score descending, ties in SPICE order, e.g.
+    "Service; Skill Development" / "1.000; 0.512". Rows with nothing assigned become "Uncategorized" / "0.000".
+    """
+    n, k = scores.shape
+    labels = np.empty(n, dtype=object)
+    values = np.empty(n, dtype=object)
+    assigned = ~np.isnan(scores)
+
+    # Keyword-only rows (every score 1.0) are fully described by their SPICE set: format each set once
+    simple = ~(assigned & (scores != 1.0)).any(axis=1)
+    if simple.any() and k <= 62:
+        bits = (assigned[simple].astype(np.int64) << np.arange(k, dtype=np.int64)).sum(axis=1)
+        uniq, inverse = np.unique(bits, return_inverse=True)
+        uniq_labels = np.empty(len(uniq), dtype=object)
+        uniq_values = np.empty(len(uniq), dtype=object)
+        for u, b in enumerate(uniq.tolist()):
+            cols = [j for j in range(k) if (b >> j) & 1]
+            uniq_labels[u] = "; ".join([spices[j] for j in cols]) if cols else "Uncategorized"
+            uniq_values[u] = "; ".join(["1.000"] * len(cols)) if cols else "0.000"
+        labels[simple] = uniq_labels[inverse]
+        values[simple] = uniq_values[inverse]
+        rest = np.flatnonzero(~simple)
+    else:
+        rest = np.arange(n)
+
+    for i in rest:
+        cols = np.flatnonzero(assigned[i]).tolist()
+        if not cols:
+            labels[i], values[i] = "Uncategorized", "0.000"
+            continue
+        # Stable sort on the raw score, as the per-row formatting did (not the printed 3-decimal value)
+        shown = sorted(cols, key=lambda j: -scores[i, j])
+        labels[i] = "; ".join([spices[j] for j in shown])
+        values[i] = "; ".join([f"{scores[i, j]:.3f}" for j in shown])
+    return labels, values
 
 class SPICESClassifier:
-    def __init__(self, use_semantic: bool = True, sem_threshold: float = 0.45):
+    def __init__(self, use_semantic: bool = True, sem_threshold: Optional[float] = None,
+                 cache_dir: str = EMBEDDING_CACHE_DIR, n_workers: int = 1,
+                 keyword_map: Optional[Dict[str, List[str]]] = None, cache_readonly: bool = False,
+                 min_shard_size: int = 2_000, semantic_suggestions: bool = False,
+                 collect_stats: bool = False, log_stats: bool = False, encoder: Optional[str] = None,
+                 dedup_threshold: Optional[float] = None, pooling: Optional[str] = None):
         """
-        use_semantic: attempt to use semantic fallback (requires sentence-transformers)
-        sem_threshold: min cosine similarity to consider a SPICE relevant (0-1 typical)
+        use_semantic: attempt to use semantic fallback
+        sem_threshold: min cosine similarity to consider a SPICE relevant (0-1 typical);
+                       None = 0.45 for sentence-transformers, the hashing encoder's suggested threshold otherwise
+        cache_dir: on-disk embedding cache for the semantic matcher ("" or None disables it)
+        n_workers: >1 shards large batches across a process pool (0 or None = all cores); each worker
+                   builds the keyword tables and semantic matcher once and reuses them for every shard
+        keyword_map: {spice: [keywords]} to classify with (default: SPICES_KEYWORDS)
+        cache_readonly: never write the embedding cache (used by pool workers)
+        min_shard_size: smallest number of distinct texts worth sending to a worker
+        semantic_suggestions: also score keyword-matched rows semantically to add extra suggestions
+                              (loads the model even when every row matches a keyword); by default
+                              only rows without keyword matches use the semantic fallback, so the
+                              model is loaded only once such a row is seen
+        collect_stats: keep stage timings and outcome counters in self.stats (see stats.py);
+                       off by default, when self.stats is a no-op
+        log_stats: with collect_stats, log each batch's stats to the "spicessense.stats" logger
+        encoder: semantic backend: "sentence-transformers", "hashing" (dependency-free character n-gram
+                 embedder, see encoders.py) or "auto" (transformers when installed, else keywords only);
+                 default from SPICESSENSE_ENCODER. An encoder object (anything with a
+                 SentenceTransformer-style encode()) is handed to SemanticMatcher as is
+        dedup_threshold: with the semantic step on, group near-duplicate texts (recurring events; see
+                         dedup.py) whose keyword matches agree and score one representative per group;
+                         its semantic scores are reused for the rest. None = score every distinct text
+        pooling: how SPICE similarity is pooled over the keyword index: "max", "topk" or "phrase"
+                 (see SemanticMatcher); default from SPICESSENSE_POOLING, else the encoder's default
+
+        The semantic matcher (and sentence-transformers/torch) is created on first use, not here.
         """
-        self.use_semantic = use_semantic and _SEM_AVAILABLE
+        self.keyword_map = SPICES_KEYWORDS if keyword_map is None else keyword_map
+        if encoder is None or isinstance(encoder, str):
+            self.encoder = resolve_backend(encoder or ENCODER_BACKEND)
+        else:
+            self.encoder = encoder
+        self.use_semantic = use_semantic and self.encoder is not None
+        if sem_threshold is None:
+            backend = HashingNgramEncoder if self.encoder == "hashing" else self.encoder
+            sem_threshold = getattr(backend, "suggested_threshold", 0.45)
         self.sem_threshold = sem_threshold
-        self.semantic = None
-        if self.use_semantic:
+        self.cache_dir = cache_dir
+        self.n_workers = n_workers if n_workers else (os.cpu_count() or 1)
+        self.min_shard_size = min_shard_size
+        self._pool = None
+        self._pool_signature = None
+        self.keywords = get_keyword_matcher(self.keyword_map)
+        self.semantic_suggestions = semantic_suggestions
+        self.cache_readonly = cache_readonly
+        self._semantic = None
+        self._semantic_signature = None
+        self.log_stats = log_stats
+        self.dedup_threshold = dedup_threshold
+        self.pooling = pooling or SEMANTIC_POOLING
+        self.stats = ClassifierStats(self.spices) if collect_stats else NULL_STATS
+
+    @property
+    def semantic(self):
+        """
+        SemanticMatcher for the keyword map, built on first access (None if semantic is off) and
+        rebuilt after in-place keyword-map edits, like the keyword tables.
+        """
+        if self._semantic is not None and self._semantic_signature != _keyword_signature(self.keyword_map):
+            self._semantic.close()  # frees the embedding cache lock for the rebuilt matcher
+            self._semantic = None
+        if self._semantic is None and self.use_semantic:
+            from .semantic_match import SemanticMatcher
             # Initialize semantic matcher with the SPICES keyword map
-            self.semantic = SemanticMatcher(SPICES_KEYWORDS)
+            self._semantic = SemanticMatcher(self.keyword_map, cache_dir=self.cache_dir,
+                                             cache_readonly=self.cache_readonly, encoder=self.encoder,
+                                             pooling=self.pooling)
+            self._semantic_signature = _keyword_signature(self.keyword_map)
+        return self._semantic
+
+    @property
+    def spices(self) -> List[str]:
+        """SPICE names in column order of score matrices."""
+        self.keywords.refresh()
+        return self.keywords.spices
     
     def classify_text(self, title: str, description: str) -> Dict[str, float]:
         """
@@ -61,53 +181,244 @@ class SPICESClassifier:
         Keyword matches get priority and score=1.0
         """
         text = f"{title}. {description}"
-        # 1) keyword matches
-        kw_matches = assign_spices_keywords(text)
-        scores = {}
-        if kw_matches:
-            # Give deterministic score 1.0 to keyword matches
-            for s in kw_matches:
-                scores[s] = 1.0
-            # Optionally also compute semantic scores to surface additional suggestions
-            if self.use_semantic:
-                sem_scores = self.semantic.score(text)
-                # add sem results above threshold but do not override keywords
-                for spice, val in sem_scores.items():
-                    if val >= self.sem_threshold and spice not in scores:
-                        scores[spice] = float(val)  # lower-than-1 but meaningful
-            return scores
-        # 2) no keyword matches — try semantic (if available)
+        if self.stats.enabled:
+            scores = self.score_texts([text])[0]
+        elif not self.use_semantic:
+            # Keyword matches only: the matcher's dict is already in SPICE order
+            hits = self.keywords.match(text)
+            return dict.fromkeys(hits, 1.0) if hits else {"Uncategorized": 0.0}
+        else:
+            # One row: nothing to deduplicate, so skip score_texts' factorize and stats setup
+            kw_mask, sem = self.match_texts([text])
+            scores = combine_scores(kw_mask, sem, self.sem_threshold)[0]
+        spices = self.spices
+        assigned = {spices[j]: float(scores[j]) for j in np.flatnonzero(~np.isnan(scores))}
+        if not assigned:
+            return {"Uncategorized": 0.0}
+        # keyword matches (1.0) first, then semantic suggestions by score
+        return dict(sorted(assigned.items(), key=lambda x: x[1], reverse=True))
+
+    def score_texts(self, texts, batch_size: int = 64) -> np.ndarray:
+        """
+        Score many texts at once. Returns float32 (len(texts), len(self.spices)) with each
+        assigned SPICE's score and NaN elsewhere (see combine_scores). Duplicate texts are
+        matched and encoded only once (near-duplicates too, with dedup_threshold).
+        """
+        stats = ClassifierStats(self.spices) if self.stats.enabled else NULL_STATS
+        with stats.timer("total"):
+            codes, uniques, counts, n_distinct = self._distinct_texts(texts, stats)
+            weights = counts if stats.enabled else None
+            if self.n_workers > 1 and len(uniques) >= 2 * self.min_shard_size:
+                scores = self._score_parallel(uniques, batch_size, stats, weights)
+            else:
+                scores = self._score_unique(uniques, batch_size, stats, weights)
+            scores = scores[codes]
+        if stats.enabled:
+            stats.count("batches")
+            stats.count("rows", len(codes))
+            stats.count("distinct_texts", n_distinct)
+            stats.count("scored_texts", len(uniques))
+            self.stats.merge(stats)
+            if self.log_stats:
+                stats.log(prefix=f"SPICES batch {self.stats.counters['batches']}")
+        return scores
+
+    def _distinct_texts(self, texts, stats=NULL_STATS):
+        """
+        (codes, texts to score, rows per scored text, distinct text count): exact duplicates are
+        collapsed, then near-duplicates with dedup_threshold; texts[i] is scored as uniques[codes[i]].
+        """
+        codes, uniques = pd.factorize(pd.Series(list(texts), dtype=object), use_na_sentinel=False)
+        uniques = [str(t) for t in uniques]
+        counts = np.bincount(codes, minlength=len(uniques))
+        n_distinct = len(uniques)
+        if self.dedup_threshold is not None and self.use_semantic and len(uniques) > 1:
+            with stats.timer("dedup"):
+                reps, rep_codes = self._near_duplicates(uniques)
+            uniques = [uniques[i] for i in reps]
+            codes = rep_codes[codes]
+            counts = np.bincount(rep_codes, weights=counts, minlength=len(reps)).astype(np.int64)
+        return codes, uniques, counts, n_distinct
+
+    def _near_duplicates(self, texts: List[str]):
+        """
+        (representative positions, representative code per text) for near-duplicate groups
+        (see dedup.py), split so that every group has a single keyword match set.
+        """
+        from .dedup import near_duplicate_groups
+        groups = near_duplicate_groups(texts, self.dedup_threshold)
+        keys = np.column_stack([groups, self.keywords.mask(texts)])
+        _, reps, rep_codes = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        return reps, rep_codes.reshape(-1)
+
+    def match_texts(self, texts: List[str], batch_size: int = 64, stats=NULL_STATS):
+        """
+        The two inputs of combine_scores for texts, before any threshold is applied:
+        (bool keyword mask, float32 semantic similarities or None), both (len(texts), len(self.spices)).
+        Semantic rows that are not needed (keyword-matched rows with semantic_suggestions off) are NaN.
+        """
+        with stats.timer("keyword"):
+            kw_mask = self.keywords.mask(texts)
+        sem = None
         if self.use_semantic:
-            sem_scores = self.semantic.score(text)
-            # return only those above threshold ordered by score
-            filtered = {k: v for k, v in sem_scores.items() if v >= self.sem_threshold}
-            # If nothing found above threshold, return top-2 as soft suggestions
-            if not filtered:
-                sorted_items = sorted(sem_scores.items(), key=lambda x: x[1], reverse=True)[:2]
-                filtered = {k: float(v) for k, v in sorted_items}
-            return filtered
-        # 3) fallback: no semantic available — return 'Uncategorized'
-        return {"Uncategorized": 0.0}
-    
-    def classify_dataframe(self, df: pd.DataFrame, title_col="Title", desc_col="Description") -> pd.DataFrame:
+            if self.semantic_suggestions:
+                sem = self.semantic.score_batch(texts, batch_size=batch_size, stats=stats)
+                self.semantic.flush()
+            else:
+                # Fallback rows only; NaN rows never pass the threshold in combine_scores
+                fallback = np.flatnonzero(~kw_mask.any(axis=1))
+                sem = np.full(kw_mask.shape, np.nan, dtype=np.float32)
+                if len(fallback):
+                    sem[fallback] = self.semantic.score_batch([texts[i] for i in fallback],
+                                                              batch_size=batch_size, stats=stats)
+                    self.semantic.flush()
+        return kw_mask, sem
+
+    def _score_unique(self, texts: List[str], batch_size: int, stats=NULL_STATS,
+                      weights: Optional[np.ndarray] = None) -> np.ndarray:
+        kw_mask, sem = self.match_texts(texts, batch_size, stats)
+        with stats.timer("combine"):
+            scores = combine_scores(kw_mask, sem, self.sem_threshold)
+        stats.record_scores(kw_mask, sem, scores, self.sem_threshold, weights)
+        return scores
+
+    def _score_parallel(self, texts: List[str], batch_size: int, stats=NULL_STATS,
+                        weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Split texts into contiguous shards, score them in the pool and stitch results back in order."""
+        pool = self._get_pool()
+        n_shards = min(4 * self.n_workers, max(1, len(texts) // self.min_shard_size))
+        bounds = np.linspace(0, len(texts), n_shards + 1).astype(int)
+        shards = [texts[bounds[i]:bounds[i + 1]] for i in range(n_shards)]
+        # Weights double as the "collect stats" flag for the workers
+        shard_weights = [None if weights is None else weights[bounds[i]:bounds[i + 1]] for i in range(n_shards)]
+        parts = []
+        for scores, uncached, shard_stats in pool.map(_score_shard, shards, [batch_size] * n_shards,
+                                                      shard_weights):
+            parts.append(scores)
+            if shard_stats is not None:
+                stats.merge(shard_stats)
+            # Workers only read the embedding cache; store what they had to encode here
+            if uncached is not None and self.semantic.cache is not None:
+                self.semantic.cache.put_many(*uncached)
+        if self._semantic is not None:
+            self._semantic.flush()
+        return np.concatenate(parts)
+
+    def _get_pool(self):
+        # Workers hold a snapshot of the keyword map: restart them if it was edited since
+        if self._pool is not None and self._pool_signature != _keyword_signature(self.keyword_map):
+            self.close()
+        if self._pool is None:
+            config = {
+                "use_semantic": self.use_semantic,
+                "sem_threshold": self.sem_threshold,
+                "semantic_suggestions": self.semantic_suggestions,
+                "cache_dir": self.cache_dir,
+                "encoder": self.encoder or "auto",
+                "pooling": self.pooling,
+                # snapshot, so in-memory keyword edits reach spawned workers
+                "keyword_map": {k: list(v) for k, v in self.keyword_map.items()},
+            }
+            # torch does not survive fork() once initialised; start semantic workers fresh
+            ctx = mp.get_context("spawn") if self.use_semantic and self.encoder == "sentence-transformers" else None
+            self._pool = ProcessPoolExecutor(max_workers=self.n_workers, mp_context=ctx,
+                                             initializer=_init_worker, initargs=(config,))
+            self._pool_signature = _keyword_signature(self.keyword_map)
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool (if one was started)."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def classify_dataframe(self, df: pd.DataFrame, title_col="Title", desc_col="Description",
+                           batch_size: int = 64, wide: Optional[str] = None,
+                           inplace: bool = False, compact: bool = False) -> pd.DataFrame:
         """
         Apply classification to a dataframe with event rows. Returns a new DataFrame with a 'SPICES' column
         listing assigned SPICE(s) and 'SPICES_scores' for raw values.
+        Works column-wise: the title/description Series are classified in bulk and the result columns
+        are attached to the frame (no per-row copies; the index and dtypes are kept).
+        wide: also add one column per SPICE ('SPICES_<Name>'): "bool" for assigned flags,
+              "score" for float32 scores (0.0 when not assigned).
+        inplace: add the columns to df itself instead of a shallow copy.
+        compact: instead of the strings, add a 'SPICES_mask' bitmask column and one float32
+                 'SPICES_<Name>' score column per SPICE, NaN when not assigned (see labels.py)
         """
-        rows = []
-        for _, r in df.iterrows():
-            title = str(r.get(title_col, "") or "")
-            desc = str(r.get(desc_col, "") or "")
-            result = self.classify_text(title, desc)
-            # Sort by score descending, then format
-            sorted_items = sorted(result.items(), key=lambda x: x[1], reverse=True)
-            spices_list = [k for k, _ in sorted_items]
-            scores_list = [v for _, v in sorted_items]
-            rows.append({
-                **r.to_dict(),
-                "SPICES": "; ".join(spices_list),
-                "SPICES_scores": "; ".join([f"{s:.3f}" for s in scores_list])
-            })
-        out_df = pd.DataFrame(rows)
+        if wide not in (None, "bool", "score"):
+            raise ValueError(f"wide must be None, 'bool' or 'score', got {wide!r}")
+        if compact and wide is not None:
+            raise ValueError("compact output already has one column per SPICE; drop wide")
+        texts = _text_column(df, title_col) + ". " + _text_column(df, desc_col)
+        scores = self.score_texts(texts.tolist(), batch_size=batch_size)
+
+        out_df = df if inplace else df.copy(deep=False)
+        if compact:
+            from .labels import CompactLabels
+            compact_df = CompactLabels.from_scores(scores, self.spices).to_frame(index=df.index)
+            for col in compact_df.columns:
+                out_df[col] = compact_df[col]
+            return out_df
+        labels, values = format_scores(scores, self.spices)
+        out_df["SPICES"] = labels
+        out_df["SPICES_scores"] = values
+        if wide is not None:
+            for j, spice in enumerate(self.spices):
+                col = f"SPICES_{spice.replace(' ', '_')}"
+                if wide == "bool":
+                    out_df[col] = ~np.isnan(scores[:, j])
+                else:
+                    out_df[col] = np.nan_to_num(scores[:, j], nan=0.0)
         return out_df
 
+    def classify_stream(self, chunks: Iterable[pd.DataFrame], title_col="Title", desc_col="Description",
+                        batch_size: int = 64, wide: Optional[str] = None,
+                        compact: bool = False) -> Iterator[pd.DataFrame]:
+        """
+        Classify an iterable of DataFrame chunks (e.g. pd.read_csv(..., chunksize=N), or chunk_rows(rows))
+        lazily, yielding each chunk with the result columns added. Only one chunk is held at a time.
+        """
+        for chunk in chunks:
+            yield self.classify_dataframe(chunk, title_col=title_col, desc_col=desc_col,
+                                          batch_size=batch_size, wide=wide, inplace=True, compact=compact)
+
+# ---------- process-pool workers ----------
+_WORKER_CLASSIFIER = None
+
+def _init_worker(config):
+    """Build the classifier (compiled keyword tables, semantic matcher) once per worker process."""
+    global _WORKER_CLASSIFIER
+    _WORKER_CLASSIFIER = SPICESClassifier(n_workers=1, cache_readonly=True, **config)
+
+def _score_shard(texts, batch_size, weights=None):
+    clf = _WORKER_CLASSIFIER
+    stats = ClassifierStats(clf.spices) if weights is not None else NULL_STATS
+    scores = clf._score_unique(texts, batch_size, stats, weights)
+    uncached = clf._semantic.take_uncached() if clf._semantic is not None else None
+    return scores, uncached, (stats.to_dict() if stats.enabled else None)
+
+def chunk_rows(rows: Iterable[dict], chunksize: int = 10_000) -> Iterator[pd.DataFrame]:
+    """
+    Group a generator of row dicts into DataFrames of at most `chunksize` rows.
+    """
+    buf = []
+    for row in rows:
+        buf.append(row)
+        if len(buf) >= chunksize:
+            yield pd.DataFrame(buf)
+            buf = []
+    if buf:
+        yield pd.DataFrame(buf)
+
+def _text_column(df: pd.DataFrame, col: str) -> pd.Series:
+    """Column as clean strings ('' for missing values or a missing column)."""
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].fillna("").astype(str)
@@ -0,0 +1,358 @@
+# src/spicessense/cli.py
+"""
+Command-line entry point: python -m spicessense <command> ...
+
+Commands:
+- classify: stream a CSV of events through SPICESClassifier chunk by chunk and write CSV/Parquet as it goes.
+- reclassify: classify an event archive, re-scoring only rows affected by text or keyword edits (see incremental.py).
+- evaluate: per-SPICE precision/recall/F1 and rows/sec on a labeled CSV, sweeping sem_threshold (see evaluate.py).
+- serve: HTTP classification service with micro-batching and backpressure (see service.py).
+- serve-model: keep the sentence-transformers model warm in a long-lived process (see warm_model.py).
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+import pandas as pd
+
+from .config import DEFAULT_MODEL_NAME
+from .dedup import DEFAULT_THRESHOLD as DEDUP_THRESHOLD
+
+try:
+    import resource  # peak RSS for progress lines (Unix only)
+except ImportError:
+    resource = None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+class _CSVSink:
+    def __init__(self, path: str):
+        self.path = path
+        self._header = True
+
+    def write(self, df: pd.DataFrame):
+        df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        if self._header:  # no chunks at all: still leave an empty file behind
+            open(self.path, "w").close()
+
+
+class _ParquetSink:
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("pyarrow not available. Install it to write Parquet output.")
+        self._pa, self._pq = pa, pq
+        self.path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame):
+        pa = self._pa
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            self._writer = self._pq.ParquetWriter(self.path, self._schema)
+        else:
+            try:
+                table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise RuntimeError(
+                    f"Chunk does not match the Parquet schema of the first chunk ({e}). "
+                    "Try a larger --chunksize so column types are inferred from more rows."
+                )
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _open_sink(path: str, fmt: Optional[str]):
+    fmt = fmt or ("parquet" if path.lower().endswith((".parquet", ".pq")) else "csv")
+    if fmt == "parquet":
+        return _ParquetSink(path)
+    return _CSVSink(path)
+
+
+def _check_text_columns(columns, args) -> bool:
+    """False (after printing why) if --title-col or --desc-col is missing, instead of classifying on ""."""
+    missing = [c for c in (args.title_col, args.desc_col) if c not in columns]
+    if missing:
+        print(f"❌ Column(s) not found: {', '.join(missing)}. The input has: {', '.join(map(str, columns))}. "
+              "Set --title-col / --desc-col.", file=sys.stderr)
+        return False
+    return True
+
+
+def cmd_classify(args) -> int:
+    from .classify import SPICESClassifier
+
+    if not os.path.exists(args.input):
+        print(f"❌ Input not found: {args.input}", file=sys.stderr)
+        return 1
+    if args.compact and args.wide:
+        print("❌ --compact already writes one column per SPICE; drop --wide", file=sys.stderr)
+        return 1
+    if not _check_text_columns(pd.read_csv(args.input, nrows=0, encoding=args.encoding).columns, args):
+        return 1
+
+    clf = SPICESClassifier(use_semantic=not args.no_semantic, sem_threshold=args.threshold,
+                           n_workers=args.workers, semantic_suggestions=args.suggestions,
+                           collect_stats=args.stats is not None, encoder=args.encoder,
+                           dedup_threshold=args.dedup)
+    reader = pd.read_csv(args.input, chunksize=args.chunksize, encoding=args.encoding)
+    sink = _open_sink(args.output, args.format)
+
+    start = time.perf_counter()
+    total = 0
+    try:
+        for i, chunk in enumerate(clf.classify_stream(reader, title_col=args.title_col, desc_col=args.desc_col,
+                                                      batch_size=args.batch_size, wide=args.wide,
+                                                      compact=args.compact)):
+            sink.write(chunk)
+            total += len(chunk)
+            if not args.quiet:
+                elapsed = time.perf_counter() - start
+                rss = _peak_rss_mb()
+                mem = f", peak RSS {rss:,.0f} MB" if rss is not None else ""
+                print(f"chunk {i + 1}: {total:,} rows in {elapsed:.1f}s "
+                      f"({total / max(elapsed, 1e-9):,.0f} rows/s{mem})", file=sys.stderr)
+    finally:
+        sink.close()
+        clf.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Classified {total:,} rows in {elapsed:.1f}s -> {args.output}", file=sys.stderr)
+    if args.stats is not None:
+        print(f"stats: {clf.stats.summary()}", file=sys.stderr)
+        if args.stats != "-":
+            clf.stats.to_json(args.stats)
+            print(f"✅ Stats saved to {args.stats}", file=sys.stderr)
+    return 0
+
+
+def cmd_reclassify(args) -> int:
+    from .classify import SPICESClassifier
+    from .incremental import IncrementalClassifier
+
+    if not os.path.exists(args.input):
+        print(f"❌ Input not found: {args.input}", file=sys.stderr)
+        return 1
+    df = pd.read_csv(args.input, encoding=args.encoding)
+    if args.id_col and args.id_col not in df.columns:
+        print(f"❌ Id column not found: {args.id_col}", file=sys.stderr)
+        return 1
+    if not _check_text_columns(df.columns, args):
+        return 1
+
+    clf = SPICESClassifier(use_semantic=args.semantic, sem_threshold=args.threshold,
+                           semantic_suggestions=args.suggestions, encoder=args.encoder,
+                           dedup_threshold=args.dedup)
+    inc = IncrementalClassifier(clf, args.state)
+    start = time.perf_counter()
+    try:
+        out = inc.classify_dataframe(df, id_col=args.id_col, title_col=args.title_col, desc_col=args.desc_col,
+                                     batch_size=args.batch_size)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        clf.close()
+    sink = _open_sink(args.output, args.format)
+    try:
+        sink.write(out)
+    finally:
+        sink.close()
+    inc.save()
+    print(f"✅ {inc.summary()} in {time.perf_counter() - start:.1f}s -> {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_evaluate(args) -> int:
+    from .classify import SPICESClassifier
+    from .evaluate import evaluate_frame
+
+    if not os.path.exists(args.input):
+        print(f"❌ Input not found: {args.input}", file=sys.stderr)
+        return 1
+    df = pd.read_csv(args.input, encoding=args.encoding)
+    if not _check_text_columns(df.columns, args):
+        return 1
+    clf = SPICESClassifier(use_semantic=not args.no_semantic, semantic_suggestions=args.suggestions,
+                           encoder=args.encoder, dedup_threshold=args.dedup, pooling=args.pooling)
+    if args.thresholds and not clf.use_semantic:
+        print("⚠️ Semantic step is off; only keyword matching is evaluated.", file=sys.stderr)
+    try:
+        result = evaluate_frame(clf, df, label_col=args.label_col, title_col=args.title_col,
+                                desc_col=args.desc_col, thresholds=args.thresholds,
+                                batch_size=args.batch_size, n_jobs=args.jobs)
+        pooling = f", {clf.semantic.pooling} pooling" if clf.use_semantic else ""
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        clf.close()
+
+    best = result.best
+    print(f"{result.rows:,} labeled rows ({result.stats['distinct_texts']:,} scored texts, "
+          f"{result.stats['encoded_texts']:,} encoded, {result.stats['cache_hits']:,} cache hits{pooling})\n")
+    print(result.summary.to_string(float_format="{:.3f}".format,
+                                   formatters={"rows_per_sec": "{:,.0f}".format}))
+    print(f"\nPer SPICE at {best}:")
+    print(result.per_spice[best].to_string(float_format="{:.3f}".format))
+    if args.output:
+        long = pd.concat(result.per_spice, names=["setting"]).reset_index()
+        long.to_csv(args.output, index=False)
+        print(f"\n✅ Per-SPICE metrics for every setting saved to {args.output}")
+    s = result.summary.loc[best]
+    print(f"\n✅ Best: {best} (micro F1 {s['micro_f1']:.3f}, {s['rows_per_sec']:,.0f} rows/s)")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    from .classify import SPICESClassifier
+    from .service import serve
+
+    clf = SPICESClassifier(use_semantic=not args.no_semantic, sem_threshold=args.threshold,
+                           semantic_suggestions=args.suggestions, collect_stats=args.stats,
+                           encoder=args.encoder)
+    try:
+        serve(clf, args.host, args.port, batch_size=args.max_batch, max_wait_ms=args.max_wait_ms,
+              max_queue=args.max_queue)
+    finally:
+        clf.close()
+    return 0
+
+
+def cmd_serve_model(args) -> int:
+    from .warm_model import parse_address, serve
+
+    serve(args.model, parse_address(args.address))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="spicessense", description="SPICESsense command-line tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("classify", help="Classify an event CSV into SPICES, streaming chunk by chunk")
+    p.add_argument("input", help="input CSV of events")
+    p.add_argument("-o", "--output", required=True, help="output file (.csv, or .parquet for Parquet)")
+    p.add_argument("--format", choices=["csv", "parquet"], help="output format (default: from extension)")
+    p.add_argument("--chunksize", type=int, default=50_000, help="rows held in memory at a time")
+    p.add_argument("--title-col", default="Title", help="event title column (\"Event Title\" in Honors exports)")
+    p.add_argument("--desc-col", default="Description")
+    p.add_argument("--encoding", default="utf-8", help="input file encoding")
+    p.add_argument("--no-semantic", action="store_true", help="keyword matching only")
+    p.add_argument("--suggestions", action="store_true",
+                   help="also score keyword-matched rows semantically for extra SPICES (loads the model for every run)")
+    p.add_argument("--threshold", type=float, default=None,
+                   help="semantic similarity threshold (default: 0.45, or the hashing encoder's own)")
+    p.add_argument("--encoder", choices=["auto", "sentence-transformers", "hashing"], default=None,
+                   help="semantic backend (default: SPICESSENSE_ENCODER or auto)")
+    p.add_argument("--batch-size", type=int, default=64, help="semantic encoder batch size")
+    p.add_argument("--dedup", nargs="?", type=float, const=DEDUP_THRESHOLD, default=None, metavar="SIMILARITY",
+                   help="score near-duplicate texts (recurring events) once per group; "
+                        f"optional MinHash similarity threshold (default {DEDUP_THRESHOLD})")
+    p.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    p.add_argument("--wide", choices=["bool", "score"], help="also add one column per SPICE")
+    p.add_argument("--compact", action="store_true",
+                   help="write a SPICES_mask bitmask and float32 per-SPICE scores instead of label strings")
+    p.add_argument("-q", "--quiet", action="store_true", help="no per-chunk progress lines")
+    p.add_argument("--stats", nargs="?", const="-", metavar="JSON",
+                   help="collect stage timings and match counts; print a summary and write them to JSON")
+    p.set_defaults(func=cmd_classify)
+
+    p = sub.add_parser("reclassify", help="Classify an event archive, re-scoring only rows affected since the last run")
+    p.add_argument("input", help="input CSV of events")
+    p.add_argument("-o", "--output", required=True, help="output file (.csv, or .parquet for Parquet)")
+    p.add_argument("--state", required=True, help="state file (.npz) kept between runs")
+    p.add_argument("--id-col", default=None,
+                   help="column with stable row ids (default: ids derived from each row's text)")
+    p.add_argument("--format", choices=["csv", "parquet"], help="output format (default: from extension)")
+    p.add_argument("--title-col", default="Title", help="event title column (\"Event Title\" in Honors exports)")
+    p.add_argument("--desc-col", default="Description")
+    p.add_argument("--encoding", default="utf-8", help="input file encoding")
+    p.add_argument("--semantic", action="store_true",
+                   help="also run the semantic step (keyword matching only by default); any keyword "
+                        "edit then re-scores every row, since semantic scores depend on all keywords")
+    p.add_argument("--suggestions", action="store_true",
+                   help="also score keyword-matched rows semantically for extra SPICES (loads the model for every run)")
+    p.add_argument("--threshold", type=float, default=None,
+                   help="semantic similarity threshold (default: 0.45, or the hashing encoder's own)")
+    p.add_argument("--encoder", choices=["auto", "sentence-transformers", "hashing"], default=None,
+                   help="semantic backend with --semantic (default: SPICESSENSE_ENCODER or auto)")
+    p.add_argument("--batch-size", type=int, default=64, help="semantic encoder batch size")
+    p.add_argument("--dedup", nargs="?", type=float, const=DEDUP_THRESHOLD, default=None, metavar="SIMILARITY",
+                   help="with --semantic, score near-duplicate texts (recurring events) once per group; "
+                        f"optional MinHash similarity threshold (default {DEDUP_THRESHOLD})")
+    p.set_defaults(func=cmd_reclassify)
+
+    p = sub.add_parser("evaluate", help="Measure per-SPICE accuracy and throughput on a labeled CSV, "
+                                        "sweeping the semantic threshold")
+    p.add_argument("input", help="CSV of events with gold SPICES labels")
+    p.add_argument("--label-col", default="SPICES", help='gold labels, SPICE names joined by ";"')
+    p.add_argument("--title-col", default="Title", help="event title column (\"Event Title\" in Honors exports)")
+    p.add_argument("--desc-col", default="Description")
+    p.add_argument("--encoding", default="utf-8", help="input file encoding")
+    p.add_argument("--thresholds", type=float, nargs="+", metavar="T",
+                   help="semantic thresholds to compare (default: the encoder's threshold +/- 0.2 in 0.05 steps)")
+    p.add_argument("--jobs", type=int, default=None, help="threads for the threshold sweep")
+    p.add_argument("--no-semantic", action="store_true", help="keyword matching only")
+    p.add_argument("--suggestions", action="store_true",
+                   help="also score keyword-matched rows semantically for extra SPICES (loads the model for every run)")
+    p.add_argument("--encoder", choices=["auto", "sentence-transformers", "hashing"], default=None,
+                   help="semantic backend (default: SPICESSENSE_ENCODER or auto)")
+    p.add_argument("--pooling", choices=["max", "topk", "phrase"], default=None,
+                   help="SPICE similarity pooling to evaluate (default: SPICESSENSE_POOLING or the encoder's default)")
+    p.add_argument("--batch-size", type=int, default=64, help="semantic encoder batch size")
+    p.add_argument("--dedup", nargs="?", type=float, const=DEDUP_THRESHOLD, default=None, metavar="SIMILARITY",
+                   help="score near-duplicate texts (recurring events) once per group; "
+                        f"optional MinHash similarity threshold (default {DEDUP_THRESHOLD})")
+    p.add_argument("-o", "--output", default=None, help="CSV of per-SPICE metrics for every setting")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("serve", help="Serve classification over HTTP, batching concurrent requests")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--max-batch", type=int, default=64, help="most events scored in one batch")
+    p.add_argument("--max-wait-ms", type=float, default=10.0,
+                   help="how long the first queued event waits for others to join its batch")
+    p.add_argument("--max-queue", type=int, default=2048,
+                   help="queued events before new requests are rejected with 503")
+    p.add_argument("--no-semantic", action="store_true", help="keyword matching only")
+    p.add_argument("--suggestions", action="store_true",
+                   help="also score keyword-matched rows semantically for extra SPICES (loads the model for every run)")
+    p.add_argument("--threshold", type=float, default=None,
+                   help="semantic similarity threshold (default: 0.45, or the hashing encoder's own)")
+    p.add_argument("--encoder", choices=["auto", "sentence-transformers", "hashing"], default=None,
+                   help="semantic backend (default: SPICESSENSE_ENCODER or auto)")
+    p.add_argument("--stats", action="store_true", help="include classifier stage timings in /metrics")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("serve-model", help="Keep the semantic model loaded for other invocations to reuse")
+    p.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    p.add_argument("--address", default="127.0.0.1:8765", help="host:port to listen on")
+    p.set_defaults(func=cmd_serve_model)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,36 @@
+# src/spicessense/config.py
+"""
+Shared defaults for SPICESsense. Environment variables override the values below.
+"""
+
+import os
+
+# Semantic fallback backend: "auto" (sentence-transformers if installed, else keywords only),
+# "sentence-transformers" or "hashing" (dependency-free character n-gram embedder)
+ENCODER_BACKEND = os.environ.get("SPICESSENSE_ENCODER", "auto")
+
+# Sentence-transformers model used for the semantic fallback
+DEFAULT_MODEL_NAME = os.environ.get("SPICESSENSE_MODEL", "all-MiniLM-L6-v2")
+
+# On-disk embedding cache (set SPICESSENSE_CACHE_DIR="" to disable)
+EMBEDDING_CACHE_DIR = os.environ.get(
+    "SPICESSENSE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "spicessense", "embeddings"),
+)
+EMBEDDING_CACHE_SIZE = int(os.environ.get("SPICESSENSE_CACHE_SIZE", "200000"))  # max cached texts
+EMBEDDING_CACHE_DTYPE = os.environ.get("SPICESSENSE_CACHE_DTYPE", "float32")  # or "float16"
+
+# Shared secret of the warm model server (serve-model creates it, 0600; clients read it)
+MODEL_SERVER_KEYFILE = os.environ.get(
+    "SPICESSENSE_MODEL_KEYFILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "spicessense", "model_server.key"),
+)
+
+# How SPICE similarity is computed from the keyword embedding index (see keyword_index.py):
+# "max" = best-matching keyword, "topk" = mean of the best SEMANTIC_TOP_K keywords,
+# "phrase" = one embedding of all of a SPICE's keywords joined together.
+# Empty = the encoder's default: "phrase" for sentence-transformers (the 0.45 threshold is tuned for
+# it), "max" for the hashing encoder (its suggested_threshold is tuned for that)
+SEMANTIC_POOLING = os.environ.get("SPICESSENSE_POOLING", "")
+SEMANTIC_TOP_K = int(os.environ.get("SPICESSENSE_TOP_K", "3"))
+KEYWORD_INDEX_DTYPE = os.environ.get("SPICESSENSE_INDEX_DTYPE", "float32")  # or "float16" / "int8"
@@ -0,0 +1,138 @@
+# src/spicessense/data/ingest.py
+"""
+Raw event export ingestion.
+- The encoding is sniffed from a small byte sample (BOM, then strict utf-8 / cp1252 checks), and each
+  file is read from disk once and decoded once instead of re-parsing it per candidate encoding.
+- A directory of semester exports is loaded concurrently with a thread pool.
+- Column names are normalized (whitespace, case) to the canonical export names, and each row is tagged
+  with its source Semester (parsed from the file name, e.g. "... (Fall 2024).csv") and Source File.
+"""
+
+import codecs
+import io
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from glob import glob
+from typing import Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .processed_store import EVENT_SCHEMA
+
+SAMPLE_BYTES = 64 * 1024
+
+# Columns the pipeline knows by name; other columns keep their (whitespace-cleaned) export names
+CANONICAL_COLUMNS = list(EVENT_SCHEMA) + ["Source File"]
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+_SEMESTER_RE = re.compile(r"(spring|summer|fall|autumn|winter)[\s_\-]*((?:19|20)\d{2}|\d{2})(?!\d)", re.IGNORECASE)
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """Best guess for a byte sample: BOM if present, else utf-8 if it decodes, else cp1252, else latin1."""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    # Incremental decode so a multi-byte character cut off at the end of the sample is not an error
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin1"  # decodes any byte sequence
+
+
+def decode_bytes(data: bytes, encoding: Optional[str] = None):
+    """
+    Decode data once with the sniffed (or given) encoding. If a utf-8 guess from the sample fails
+    further into the file, the same bytes are decoded as cp1252/latin1 (nothing is re-read).
+    Returns (text, encoding).
+    """
+    encoding = encoding or sniff_encoding(data[:SAMPLE_BYTES])
+    for candidate in dict.fromkeys([encoding, "cp1252", "latin1"]):
+        try:
+            return data.decode(candidate), candidate
+        except UnicodeDecodeError:
+            continue
+    raise AssertionError("latin1 decodes any byte sequence")
+
+
+def _column_key(name: str) -> str:
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
+
+
+_CANONICAL_BY_KEY = {_column_key(c): c for c in CANONICAL_COLUMNS}
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse whitespace in column names, map case/spacing variants to the canonical names and drop
+    empty 'Unnamed: n' columns left by trailing commas.
+    """
+    df = df.rename(columns=lambda c: _CANONICAL_BY_KEY.get(_column_key(c), re.sub(r"\s+", " ", str(c)).strip()))
+    unnamed = [c for c in df.columns if c.startswith("Unnamed:") and df[c].isna().all()]
+    df = df.drop(columns=unnamed)
+    # Two spellings of the same column in one export: keep the first
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def semester_from_path(path: str) -> str:
+    """'Honors ... 24-25(Fall 2024)(1).csv' -> 'Fall 2024'; falls back to the file name without extension."""
+    name = os.path.basename(path)
+    match = _SEMESTER_RE.search(name)
+    if not match:
+        return os.path.splitext(name)[0]
+    term, year = match.group(1).capitalize(), match.group(2)
+    if term == "Autumn":
+        term = "Fall"
+    if len(year) == 2:
+        year = "20" + year
+    return f"{term} {year}"
+
+
+def read_events_csv(path: str, encoding: Optional[str] = None, semester: Optional[str] = None) -> pd.DataFrame:
+    """Read one export with a single pass over its bytes; adds Semester and Source File columns."""
+    with open(path, "rb") as f:
+        data = f.read()
+    text, encoding = decode_bytes(data, encoding)
+    df = normalize_columns(pd.read_csv(io.StringIO(text)))
+    df["Semester"] = semester or semester_from_path(path)
+    df["Source File"] = os.path.basename(path)
+    df.attrs["encoding"] = encoding
+    return df
+
+
+def list_event_files(path: Union[str, Sequence[str]], pattern: str = "*.csv") -> List[str]:
+    """CSV files in a directory (sorted), a single file, or an explicit list (missing files dropped)."""
+    if isinstance(path, str):
+        if os.path.isdir(path):
+            return sorted(glob(os.path.join(path, pattern)))
+        path = [path]
+    return [p for p in path if os.path.isfile(p)]
+
+
+def load_events(paths: Union[str, Iterable[str]], pattern: str = "*.csv", max_workers: Optional[int] = None,
+                verbose: bool = False) -> pd.DataFrame:
+    """
+    Load every export under a directory (or the given files) concurrently and stack them in file order.
+    Columns missing from some semesters are NaN for those rows.
+    """
+    files = list_event_files(paths if isinstance(paths, str) else list(paths), pattern)
+    if not files:
+        raise FileNotFoundError(f"No event exports found at {paths!r}")
+    workers = max_workers or min(8, len(files))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(read_events_csv, files))
+    if verbose:
+        for path, frame in zip(files, frames):
+            print(f"✅ Loaded '{path}' ({len(frame)} rows, {frame.attrs['encoding']}, {semester_from_path(path)})")
+    return pd.concat(frames, ignore_index=True, sort=False)
@@ -0,0 +1,199 @@
+# src/spicessense/data/processed_store.py
+"""
+Typed Parquet store for the processed events table handed between pipeline stages.
+- One explicit schema: parsed Start/End Date, categorical Event Type/Visibility, numeric RSVP columns.
+  Clock times stay text: a bare "6:00 PM" would otherwise parse to that time on the build date.
+- The Parquet file records a fingerprint (path, size, mtime) of the raw inputs it was built from,
+  so a stage rebuilds it only when those inputs change.
+- Readers ask for just the columns they need; Parquet skips the rest on disk.
+- iter_processed streams the table in chunks (Parquet record batches or CSV chunks) in constant memory.
+- cached_excel keeps a Parquet copy of a slow-to-parse .xlsx next to it.
+Falls back to the processed CSV (with the schema applied after reading) when pyarrow is not installed.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+PROCESSED_CSV_PATH = "data/processed/honors_events_science_processed.csv"
+PROCESSED_PARQUET_PATH = "data/processed/honors_events_science_processed.parquet"
+
+RSVP_COLUMNS = [
+    "# Invited", "# RSVP Yes", "# RSVP No", "# RSVP Maybe",
+    "# RSVP No Response", "# Marked Attended",
+]
+
+# column -> pandas dtype ("datetime" = parsed with pd.to_datetime)
+EVENT_SCHEMA: Dict[str, str] = {
+    "Start Date": "datetime",
+    "Start Time": "string",
+    "End Date": "datetime",
+    "End Time": "string",
+    "Event Type": "category",
+    "Visibility": "category",
+    "Status": "category",
+    "Semester": "category",
+    "Event Title": "string",
+    "Description": "string",
+    "Online Location": "string",
+    **{col: "float64" for col in RSVP_COLUMNS},
+}
+
+_FINGERPRINT_KEY = b"spicessense.fingerprint"
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str] = EVENT_SCHEMA) -> pd.DataFrame:
+    """
+    Coerce the schema columns that are present (unparseable values become NaT/NaN).
+    Other object columns are stored as strings so mixed-type columns still write to Parquet.
+    """
+    df = df.copy()
+    for col in df.columns:
+        dtype = schema.get(col)
+        if dtype == "datetime":
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif dtype == "float64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        elif dtype == "category":
+            df[col] = df[col].astype("string").astype("category")
+        elif dtype == "string" or (dtype is None and df[col].dtype == object):
+            df[col] = df[col].astype("string")
+    return df
+
+
+def source_fingerprint(paths: Iterable[str]) -> str:
+    """Hash of (path, size, mtime) for each input; missing files are part of the fingerprint too."""
+    parts = []
+    for path in paths:
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+            parts.append([path, st.st_size, st.st_mtime_ns])
+        except FileNotFoundError:
+            parts.append([path, None, None])
+    return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def _require_pyarrow():
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("pyarrow not available. Install it to use the Parquet processed store.")
+
+
+class ProcessedStore:
+    """A single Parquet table plus the fingerprint of the inputs it was built from."""
+
+    def __init__(self, path: str = PROCESSED_PARQUET_PATH, schema: Dict[str, str] = EVENT_SCHEMA):
+        self.path = path
+        self.schema = schema
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def fingerprint(self) -> Optional[str]:
+        """Fingerprint stored in the file, or None if there is no (readable) store."""
+        if not PARQUET_AVAILABLE or not self.exists():
+            return None
+        import pyarrow.parquet as pq
+
+        try:
+            metadata = pq.read_schema(self.path).metadata or {}
+        except (OSError, ValueError):
+            return None
+        value = metadata.get(_FINGERPRINT_KEY)
+        return value.decode("utf-8") if value else None
+
+    def is_fresh(self, sources: Sequence[str]) -> bool:
+        return self.fingerprint() == source_fingerprint(sources)
+
+    def write(self, df: pd.DataFrame, sources: Sequence[str]) -> pd.DataFrame:
+        """Write df (schema applied) atomically, tagged with the fingerprint of sources. Returns the typed df."""
+        _require_pyarrow()
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = apply_schema(df, self.schema)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_FINGERPRINT_KEY] = source_fingerprint(sources).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp{os.getpid()}"
+        pq.write_table(table, tmp)
+        os.replace(tmp, self.path)
+        return df
+
+    def read(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read the table; columns limits what is loaded from disk (unknown names are ignored)."""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        if columns is not None:
+            available = set(pq.read_schema(self.path).names)
+            columns = [c for c in columns if c in available]
+        return pq.read_table(self.path, columns=columns).to_pandas()
+
+    def iter_batches(self, columns: Optional[List[str]] = None, chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+        """Read the table chunksize rows at a time (only `columns`; unknown names are ignored)."""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(self.path)
+        if columns is not None:
+            available = set(parquet.schema_arrow.names)
+            columns = [c for c in columns if c in available]
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+
+    def load_or_build(self, sources: Sequence[str], build: Callable[[], pd.DataFrame],
+                      columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read the store if it matches sources, otherwise call build(), store the result and return it."""
+        if self.is_fresh(sources):
+            return self.read(columns)
+        df = self.write(build(), sources)
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+
+def read_processed(columns: Optional[List[str]] = None,
+                   parquet_path: str = PROCESSED_PARQUET_PATH,
+                   csv_path: str = PROCESSED_CSV_PATH) -> pd.DataFrame:
+    """
+    The processed events table with only `columns` loaded: from the Parquet store when it exists,
+    otherwise from the processed CSV with the schema applied.
+    """
+    store = ProcessedStore(parquet_path)
+    if PARQUET_AVAILABLE and store.exists():
+        return store.read(columns)
+    usecols = None if columns is None else (lambda c: c in set(columns))
+    return apply_schema(pd.read_csv(csv_path, usecols=usecols))
+
+
+def iter_processed(columns: Optional[List[str]] = None, chunksize: int = 50_000,
+                   parquet_path: str = PROCESSED_PARQUET_PATH,
+                   csv_path: str = PROCESSED_CSV_PATH) -> Iterator[pd.DataFrame]:
+    """read_processed chunk by chunk: at most chunksize rows in memory at a time."""
+    store = ProcessedStore(parquet_path)
+    if PARQUET_AVAILABLE and store.exists():
+        yield from store.iter_batches(columns, chunksize)
+        return
+    usecols = None if columns is None else (lambda c: c in set(columns))
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=chunksize):
+        yield apply_schema(chunk)
+
+
+def cached_excel(path: str, cache_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    pd.read_excel(path) with a Parquet copy next to the workbook (<name>.parquet), reused until the
+    workbook changes. Without pyarrow this is just read_excel.
+    """
+    if not PARQUET_AVAILABLE:
+        return pd.read_excel(path)
+    store = ProcessedStore(cache_path or os.path.splitext(path)[0] + ".parquet", schema={})
+    return store.load_or_build([path], lambda: pd.read_excel(path))
@@ -0,0 +1,121 @@
+# src/spicessense/dedup.py
+"""
+Near-duplicate grouping of event texts, so recurring events ("Mindfulness Monday", weekly info
+sessions) are classified once per group instead of once per occurrence.
+- Exact stage: texts that are identical after normalization (case, punctuation, spacing, and the
+  digits of dates, times and room numbers) share a group.
+- Near stage: MinHash signatures over character n-gram shingles, LSH banding to find candidate pairs,
+  and a greedy pass that joins each text to the most similar earlier representative when the
+  estimated Jaccard similarity reaches the threshold (so every member is close to its
+  representative, with no chaining through intermediate texts).
+Used by SPICESClassifier(dedup_threshold=...) in front of the semantic step (see classify.py).
+"""
+
+import re
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .encoders import _NON_WORD, char_ngram_hashes
+
+_DIGITS = re.compile(r"\d+")
+_MAX_HASH = np.iinfo(np.uint32).max
+_MAX_U64 = np.iinfo(np.uint64).max
+_FOLD = np.uint64(0x100000001B3)
+_OFFSET = 0x9E3779B1  # distinguishes borrowed bin values by how far they were borrowed from
+
+
+def normalize(text: str) -> str:
+    """Lowercase, punctuation folded to spaces, every digit run replaced by "0" (dates, times, rooms)."""
+    return _DIGITS.sub("0", _NON_WORD.sub(" ", str(text).lower())).strip()
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows per band) with bands * rows == num_perm whose S-curve midpoint (1/b)^(1/r) is closest to threshold."""
+    pairs = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(pairs, key=lambda p: abs((1 / p[0]) ** (1 / p[1]) - threshold))
+
+
+def minhash_signatures(texts: Sequence[str], num_perm: int = 64, ngram: int = 5, seed: int = 0,
+                       chunk_size: int = 50_000, normalized: bool = False) -> np.ndarray:
+    """
+    (len(texts), num_perm) uint32 MinHash signatures of each text's character n-gram set.
+    One-permutation hashing: each shingle hash picks one of num_perm bins and the bin keeps its
+    smallest value; empty bins borrow the next non-empty bin's value (rotation densification).
+    One hash per shingle instead of num_perm, with the same meaning: the fraction of equal positions
+    between two signatures estimates their Jaccard similarity.
+    Texts too short for a single n-gram get an all-max signature. normalized: see char_ngram_hashes.
+    """
+    mix = np.random.default_rng(seed).integers(0, _MAX_U64, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    sig = np.full((len(texts), num_perm), _MAX_HASH, dtype=np.uint32)
+    for lo in range(0, len(texts), chunk_size):
+        rows, hashes = char_ngram_hashes(texts[lo:lo + chunk_size], (ngram, ngram), normalized)
+        if not len(rows):
+            continue
+        h = hashes * mix
+        bins = ((h >> np.uint64(32)) % np.uint64(num_perm)).astype(np.int64)
+        values = (h & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        mins = pd.Series(values).groupby(rows * num_perm + bins).min()
+        keys = mins.index.to_numpy()
+        sig[lo + keys // num_perm, keys % num_perm] = mins.to_numpy()
+    # Densify: an empty bin takes the first non-empty bin to its right (wrapping), offset by the distance
+    empty = sig == _MAX_HASH
+    filled = ~empty.all(axis=1)
+    if empty[filled].any():
+        block = sig[filled]
+        cols = np.arange(2 * num_perm)
+        nxt = np.where(np.tile(~empty[filled], 2), cols, 2 * num_perm)
+        nxt = np.minimum.accumulate(nxt[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+        dist = (nxt - cols[:num_perm]).astype(np.uint32)
+        borrowed = np.take_along_axis(block, nxt % num_perm, axis=1) + dist * np.uint32(_OFFSET)
+        sig[filled] = np.where(empty[filled], borrowed, block)
+    return sig
+
+
+DEFAULT_THRESHOLD = 0.8
+
+
+def near_duplicate_groups(texts: Sequence[str], threshold: float = DEFAULT_THRESHOLD, num_perm: int = 64,
+                          ngram: int = 5, seed: int = 0) -> np.ndarray:
+    """
+    Group id per text (0..n_groups-1, numbered by first appearance). The first text of each group
+    is its representative; every other member has estimated Jaccard similarity >= threshold to it.
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+    codes, uniques = pd.factorize(pd.Series([normalize(t) for t in texts], dtype=object))
+    n = len(uniques)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    sig = minhash_signatures(list(uniques), num_perm, ngram, seed, normalized=True)
+    bands, rows = lsh_bands(threshold, num_perm)
+    band_codes = np.empty((n, bands), dtype=np.int64)
+    for i in range(bands):
+        key = np.zeros(n, dtype=np.uint64)
+        for j in range(i * rows, (i + 1) * rows):  # fold the band into one 64-bit key
+            key = (key ^ sig[:, j].astype(np.uint64)) * _FOLD
+        band_codes[:, i] = pd.factorize(key)[0]
+    # A text can only join an earlier representative if it shares a bucket with an earlier text
+    first_seen = np.zeros((n, bands), dtype=bool)
+    for i in range(bands):
+        _, first = np.unique(band_codes[:, i], return_index=True)
+        first_seen[first, i] = True
+    collides = ~first_seen.all(axis=1)
+
+    rep_of = np.arange(n)
+    buckets = [dict() for _ in range(bands)]  # band code -> representatives in that bucket
+    for u in range(n):
+        codes_u = band_codes[u].tolist()
+        if collides[u]:
+            cands = {r for i, c in enumerate(codes_u) for r in buckets[i].get(c, ())}
+            if cands:
+                cands = np.sort(np.fromiter(cands, dtype=np.int64, count=len(cands)))  # ties -> earliest
+                sims = (sig[cands] == sig[u]).mean(axis=1)
+                best = int(np.argmax(sims))
+                if sims[best] >= threshold:
+                    rep_of[u] = cands[best]
+                    continue
+        for i, c in enumerate(codes_u):
+            buckets[i].setdefault(c, []).append(u)
+    return pd.factorize(rep_of[codes])[0].astype(np.int64)
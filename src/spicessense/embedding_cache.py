@@ -0,0 +1,297 @@
+# src/spicessense/embedding_cache.py
+"""
+Persistent, content-addressed embedding cache.
+- Entries are keyed by a hash of (model name, text).
+- Vectors live in a memory-mapped float32/float16 .npy array; keys and LRU clocks in an index file.
+- The cache is bounded: when full, the least recently used entries are evicted in batches (up to
+  flush_every or a tenth of the cache). The index without them is written before their slots are
+  reused, so after a crash, or for a reader opened later, an evicted key never maps to another text's
+  vector. Opening a writable cache with a lower max_entries trims it to the most recent entries.
+- Each model gets its own directory; a model/dimension mismatch wipes it instead of mixing vectors.
+- One writer per directory: a writable cache holds an exclusive lock on it (fcntl, Unix) until it is
+  closed or the process exits, so a `serve` process and a CLI run never hand out the same slots.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl  # cross-process writer lock (Unix only)
+except ImportError:
+    fcntl = None
+
+_INDEX_VERSION = 1
+_KEY_BYTES = 16
+
+
+def _text_key(model_name: str, text: str) -> bytes:
+    return hashlib.blake2b(
+        (model_name + "\0" + text).encode("utf-8"), digest_size=_KEY_BYTES
+    ).digest()
+
+
+def _atomic_write(path: str, write_fn):
+    """Write via a temp file + os.replace so readers never see a half-written file."""
+    tmp = f"{path}.tmp.{os.getpid()}"
+    write_fn(tmp)
+    os.replace(tmp, path)
+
+
+class CacheLocked(RuntimeError):
+    """The cache directory is already open for writing (by another process or cache object)."""
+
+
+def _flush_at_exit(ref):
+    cache = ref()
+    if cache is not None:
+        try:
+            cache.close()
+        except Exception:
+            pass
+
+
+class EmbeddingCache:
+    """
+    Disk-backed cache of text embeddings for one model.
+
+    A writable cache takes an exclusive lock on its directory and raises CacheLocked if another
+    writer holds it (without fcntl, e.g. on Windows, nothing is locked: give each process its own
+    cache_dir). Readers (readonly=True) take no lock; open them only while the writer that owns the
+    directory is not evicting, e.g. in worker processes of that writer.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str, max_entries: int = 200_000,
+                 dtype: str = "float32", readonly: bool = False, flush_every: int = 1024):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported cache dtype: {dtype!r} (use 'float32' or 'float16')")
+        self.model_name = model_name
+        self.max_entries = int(max_entries)
+        self.dtype = np.dtype(dtype)
+        self.readonly = readonly
+        self.flush_every = flush_every
+        slug = hashlib.sha1(model_name.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, slug)
+        self._meta_path = os.path.join(self.path, "meta.json")
+        self._index_path = os.path.join(self.path, "index.npz")
+        self._data_path = os.path.join(self.path, "embeddings.npy")
+
+        self.dim: Optional[int] = None
+        self._data = None                                   # np.memmap (capacity, dim)
+        self._keys = np.zeros((0, _KEY_BYTES), dtype=np.uint8)  # per slot key digest
+        self._used = np.zeros(0, dtype=np.int64)            # per slot LRU clock, 0 = empty
+        self._lookup: Dict[bytes, int] = {}
+        self._clock = 0
+        self._dirty = False
+        self._pending = 0                                   # puts since last flush
+        self.hits = 0
+        self.misses = 0
+        self._lock_file = None
+        if not readonly:
+            self._lock()  # before loading, so the index read is the one this process will extend
+        self._load()
+        if not readonly:
+            atexit.register(_flush_at_exit, weakref.ref(self))
+
+    # ---------- persistence ----------
+    def _lock(self):
+        if fcntl is None:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        f = open(os.path.join(self.path, "lock"), "a")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            raise CacheLocked(f"Embedding cache {self.path} is already open for writing elsewhere; "
+                              "use another cache_dir or open it readonly")
+        self._lock_file = f
+
+    def close(self):
+        """Flush and release the writer lock; the cache is read-only afterwards."""
+        self.flush()
+        if self._lock_file is not None:
+            self._lock_file.close()  # closing the descriptor releases the flock
+            self._lock_file = None
+        self.readonly = True
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            return
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta.get("version") != _INDEX_VERSION or meta.get("model_name") != self.model_name
+                    or meta.get("dtype") != self.dtype.name):
+                raise ValueError("cache belongs to a different model or format")
+            with np.load(self._index_path) as idx:
+                keys, used = idx["keys"], idx["used"]
+            data = np.load(self._data_path, mmap_mode="r" if self.readonly else "r+")
+            if data.shape != (len(keys), meta["dim"]):
+                raise ValueError("cache index and data are out of sync")
+        except Exception:
+            # Stale or corrupt cache: start over rather than serve wrong vectors
+            if not self.readonly:
+                self.clear()
+            return
+        self.dim = int(meta["dim"])
+        self._clock = int(meta.get("clock", 0))
+        self._data, self._keys, self._used = data, keys.copy(), used.copy()
+        filled = np.flatnonzero(self._used)
+        self._lookup = {self._keys[i].tobytes(): int(i) for i in filled}
+        if not self.readonly and len(self._used) > self.max_entries:
+            self._trim()
+
+    def _trim(self):
+        """Keep the max_entries most recently used entries, in a data file of that capacity."""
+        filled = np.flatnonzero(self._used)
+        keep = filled[np.argsort(self._used[filled], kind="stable")[max(0, len(filled) - self.max_entries):]]
+        vectors, keys, used = np.asarray(self._data[keep]), self._keys[keep], self._used[keep]
+        self._data, self._keys, self._used = None, keys[:0], used[:0]
+        self._resize(self.max_entries)
+        n = len(keep)
+        self._data[:n], self._keys[:n], self._used[:n] = vectors, keys, used
+        self._lookup = {self._keys[i].tobytes(): i for i in range(n)}
+        self.flush()
+
+    def flush(self):
+        """Persist the index and flush vectors to disk."""
+        if self.readonly or not self._dirty or self._data is None:
+            return
+        self._data.flush()
+        meta = {
+            "version": _INDEX_VERSION, "model_name": self.model_name, "dim": self.dim,
+            "dtype": self.dtype.name, "clock": self._clock,
+        }
+
+        def write_index(path):
+            with open(path, "wb") as f:
+                np.savez(f, keys=self._keys, used=self._used)
+
+        def write_meta(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        _atomic_write(self._index_path, write_index)
+        _atomic_write(self._meta_path, write_meta)
+        self._dirty = False
+        self._pending = 0
+
+    def clear(self):
+        """Drop every entry (and the files backing them)."""
+        self._data = None
+        self.dim = None
+        self._keys = np.zeros((0, _KEY_BYTES), dtype=np.uint8)
+        self._used = np.zeros(0, dtype=np.int64)
+        self._lookup = {}
+        self._clock = 0
+        self._dirty = False
+        for p in (self._meta_path, self._index_path, self._data_path):
+            if os.path.exists(p):
+                os.remove(p)
+
+    def _resize(self, capacity: int):
+        """(Re)allocate the memory-mapped array with room for `capacity` vectors."""
+        os.makedirs(self.path, exist_ok=True)
+        tmp = self._data_path + f".tmp.{os.getpid()}"
+        new = np.lib.format.open_memmap(tmp, mode="w+", dtype=self.dtype, shape=(capacity, self.dim))
+        old_n = len(self._used)
+        if self._data is not None and old_n:
+            new[:old_n] = self._data[:old_n]
+        new.flush()
+        del new
+        self._data = None
+        os.replace(tmp, self._data_path)
+        self._data = np.load(self._data_path, mmap_mode="r+")
+        self._keys = np.concatenate([self._keys, np.zeros((capacity - old_n, _KEY_BYTES), dtype=np.uint8)])
+        self._used = np.concatenate([self._used, np.zeros(capacity - old_n, dtype=np.int64)])
+        self._dirty = True
+
+    # ---------- lookups ----------
+    def __len__(self):
+        return len(self._lookup)
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        Look up texts. Returns (embeddings, missing) where embeddings is a float32 array
+        (len(texts), dim) with cached rows filled in (None if the cache is empty) and
+        missing lists the positions that still need encoding.
+        """
+        if self._data is None:
+            self.misses += len(texts)
+            return None, list(range(len(texts)))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        missing = []
+        hit_pos, hit_slots = [], []
+        for i, text in enumerate(texts):
+            slot = self._lookup.get(_text_key(self.model_name, text))
+            if slot is None:
+                missing.append(i)
+            else:
+                hit_pos.append(i)
+                hit_slots.append(slot)
+        if hit_slots:
+            out[hit_pos] = self._data[hit_slots]
+            if not self.readonly:
+                self._clock += 1
+                self._used[hit_slots] = self._clock
+                self._dirty = True
+        self.hits += len(hit_slots)
+        self.misses += len(missing)
+        return out, missing
+
+    def put_many(self, texts: Sequence[str], embs: np.ndarray):
+        """Store embeddings for texts, evicting least recently used entries if full."""
+        if self.readonly or not len(texts):
+            return
+        embs = np.asarray(embs)
+        if self.dim is None:
+            self.dim = int(embs.shape[1])
+        elif embs.shape[1] != self.dim:
+            # Same model name but a different output size: the old vectors are unusable
+            self.clear()
+            self.dim = int(embs.shape[1])
+        keys = {}
+        for text, emb in zip(texts, embs):
+            keys[_text_key(self.model_name, text)] = emb
+        new_keys = [k for k in keys if k not in self._lookup]
+        if len(new_keys) > self.max_entries:
+            new_keys = new_keys[-self.max_entries:]
+
+        # Grow geometrically up to max_entries, then evict
+        capacity = len(self._used)
+        needed = len(self._lookup) + len(new_keys)
+        if needed > capacity and capacity < self.max_entries:
+            self._resize(min(self.max_entries, max(needed, 2 * capacity, 1024)))
+        free = np.flatnonzero(self._used == 0)
+        if len(free) < len(new_keys):
+            n_evict = len(new_keys) - len(free)
+            filled = np.flatnonzero(self._used)
+            # Evict a batch and persist the index without it before any victim slot is overwritten
+            n_evict = min(len(filled), max(n_evict, min(self.flush_every, self.max_entries // 10)))
+            victims = filled[np.argpartition(self._used[filled], n_evict - 1)[:n_evict]]
+            for slot in victims:
+                del self._lookup[self._keys[slot].tobytes()]
+            self._used[victims] = 0
+            self._dirty = True
+            self.flush()
+            free = np.flatnonzero(self._used == 0)
+
+        self._clock += 1
+        slots = []
+        for key, slot in zip(new_keys, free):
+            self._lookup[key] = int(slot)
+            self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+            slots.append(int(slot))
+        if slots:
+            self._data[slots] = np.stack([keys[k] for k in new_keys[:len(slots)]]).astype(self.dtype)
+            self._used[slots] = self._clock
+        self._dirty = True
+        self._pending += len(slots)
+        if self._pending >= self.flush_every:
+            self.flush()
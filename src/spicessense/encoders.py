@@ -0,0 +1,144 @@
+# src/spicessense/encoders.py
+"""
+Encoder backends for the semantic matcher.
+Any object with SentenceTransformer-style `encode(texts, batch_size=..., ...) -> (n, dim) array` works.
+- "sentence-transformers": the transformer model (needs torch and a downloaded model), optionally
+  served by a warm model process (warm_model.py).
+- "hashing": HashingNgramEncoder, a dependency-free hashed character n-gram TF-IDF embedder fitted on
+  the keyword map. Vectorized with numpy; encodes thousands of texts per second with no model load.
+- "auto": sentence-transformers when it is installed (or a warm server is configured), else no
+  semantic step (keyword matching only). Hashing is opt-in: its cosines are low enough that the
+  top-2 soft suggestions for keyword-free rows would mostly be noise.
+"""
+
+import hashlib
+import importlib.util
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BACKENDS = ("auto", "sentence-transformers", "hashing")
+
+_NON_WORD = re.compile(r"[\W_]+")
+_PRIME = np.uint64(1099511628211)        # FNV-1a 64-bit prime, used as the rolling-hash base
+_MIX = np.uint64(0x9E3779B97F4A7C15)     # golden-ratio multiplier to spread the bits
+
+
+def transformer_available() -> bool:
+    """sentence-transformers is installed, or a warm model process is configured."""
+    if importlib.util.find_spec("sentence_transformers") is not None:
+        return True
+    from .warm_model import configured_address
+    return configured_address() is not None
+
+
+def resolve_backend(name: Optional[str]) -> Optional[str]:
+    """
+    Concrete backend for a requested name: "sentence-transformers", "hashing", or None when
+    sentence-transformers (explicitly or through "auto") is not available.
+    """
+    name = (name or "auto").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"encoder must be one of {BACKENDS}, got {name!r}")
+    if name == "hashing":
+        return "hashing"
+    if transformer_available():
+        return "sentence-transformers"
+    return None
+
+
+def _normalize_text(text: str) -> bytes:
+    return (" " + _NON_WORD.sub(" ", str(text).lower()).strip() + " ").encode("utf-8")
+
+
+def char_ngram_hashes(texts: Sequence[str], ngram_range: Tuple[int, int] = (3, 5), normalized: bool = False):
+    """
+    (text index, 64-bit hash) for every character n-gram of every normalized text (lowercased,
+    punctuation folded to spaces, words padded with spaces). Vectorized over all texts at once.
+    normalized: texts are already lowercased with punctuation folded (only the padding is added).
+    """
+    encoded = [(" " + t + " ").encode("utf-8") for t in texts] if normalized else [_normalize_text(t) for t in texts]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+    owner = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+    ends = np.cumsum(lengths)[owner]  # end offset of each position's text
+    rows, hashes = [], []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        m = len(data) - n + 1
+        if m <= 0:
+            continue
+        h = np.full(m, np.uint64(n), dtype=np.uint64)
+        for j in range(n):
+            h = h * _PRIME + data[j:j + m]
+        h = (h ^ (h >> np.uint64(29))) * _MIX
+        start = np.arange(m)
+        valid = start + n <= ends[:m]  # n-grams must not cross into the next text
+        rows.append(owner[:m][valid])
+        hashes.append(h[valid])
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint64)
+    return np.concatenate(rows), np.concatenate(hashes)
+
+
+class HashingNgramEncoder:
+    """
+    Bag of hashed character n-grams (words padded with spaces, so n-grams mark word starts/ends),
+    log-scaled term frequencies, IDF weights fitted on a small corpus (the keywords), L2-normalized.
+
+    Not a language model: it matches spelling variants and shared word pieces ("volunteering" ~
+    "volunteer"), not synonyms. Similarities run lower than transformer cosines, so use
+    `suggested_threshold` as the semantic threshold.
+    """
+
+    cacheable = False  # cheaper to recompute than to look up in the embedding cache
+    suggested_threshold = 0.25
+    default_pooling = "max"  # suggested_threshold is calibrated for best-keyword pooling
+
+    def __init__(self, dim: int = 2048, ngram_range: Tuple[int, int] = (3, 5)):
+        self.dim = int(dim)
+        self.ngram_range = tuple(ngram_range)
+        self.idf = np.ones(self.dim, dtype=np.float32)
+        self._fit_digest = "unfitted"
+
+    @property
+    def name(self) -> str:
+        """Identifies the embedding space (settings + fitted IDF) for caches and indexes."""
+        lo, hi = self.ngram_range
+        return f"hashing-char{lo}-{hi}-d{self.dim}-{self._fit_digest}"
+
+    def _hash_ids(self, texts: Sequence[str]):
+        """(text index, bucket) for every character n-gram of every text."""
+        rows, hashes = char_ngram_hashes(texts, self.ngram_range)
+        return rows, ((hashes >> np.uint64(32)) % np.uint64(self.dim)).astype(np.int64)
+
+    def _counts(self, texts: Sequence[str]) -> np.ndarray:
+        rows, buckets = self._hash_ids(texts)
+        flat = np.bincount(rows * self.dim + buckets, minlength=len(texts) * self.dim)
+        return flat.reshape(len(texts), self.dim).astype(np.float32)
+
+    def fit(self, corpus: Iterable[str]) -> "HashingNgramEncoder":
+        """IDF weights from a corpus (e.g. all keywords); n-grams never seen get the highest weight."""
+        corpus = [t for t in corpus if str(t).strip()]
+        if not corpus:
+            return self
+        df = (self._counts(corpus) > 0).sum(axis=0)
+        self.idf = (np.log((1 + len(corpus)) / (1 + df)) + 1).astype(np.float32)
+        self._fit_digest = hashlib.sha1(self.idf.tobytes()).hexdigest()[:12]
+        return self
+
+    @classmethod
+    def from_keyword_map(cls, keyword_map: Dict[str, List[str]], **kwargs) -> "HashingNgramEncoder":
+        return cls(**kwargs).fit(kw for kws in keyword_map.values() for kw in kws)
+
+    def encode(self, texts, batch_size: int = 1024, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        texts = list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        step = max(int(batch_size), 1024)  # dense (batch, dim) counts; larger batches amortize overhead
+        for lo in range(0, len(texts), step):
+            counts = self._counts(texts[lo:lo + step])
+            weighted = np.log1p(counts) * self.idf
+            norms = np.linalg.norm(weighted, axis=1, keepdims=True) + 1e-12
+            out[lo:lo + step] = weighted / norms
+        return out
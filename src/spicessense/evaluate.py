@@ -0,0 +1,160 @@
+# src/spicessense/evaluate.py
+"""
+Accuracy and throughput of SPICESClassifier against labeled events.
+- Gold labels: one column of SPICE names joined by ";" (the 'SPICES' output format); "Uncategorized"
+  or an empty cell means no SPICE.
+- Per-SPICE precision / recall / F1 / support, micro and macro averages, and exact-match accuracy
+  (the whole SPICE set right).
+- sem_threshold sweep: keyword masks and semantic similarities are computed once per distinct text
+  (SPICESClassifier.match_texts); each threshold is then only a combine_scores over those matrices,
+  run in parallel threads, so nothing is re-encoded per threshold. A keyword-only row is included.
+- Throughput: rows/sec per setting = rows / (time of the stages that setting needs), measured on
+  this run (the embedding cache makes repeat runs faster; see encoded_texts / cache_hits).
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .classify import SPICESClassifier, _text_column, combine_scores
+from .stats import ClassifierStats
+
+KEYWORDS_ONLY = "keywords"
+SWEEP_STEPS = np.arange(-0.2, 0.201, 0.05)  # default sweep: offsets around the classifier's own threshold
+
+_SEPARATORS = re.compile(r"[;,]")
+
+
+class Evaluation(NamedTuple):
+    summary: pd.DataFrame                # one row per setting: threshold, micro/macro scores, exact match, rows/sec
+    per_spice: Dict[str, pd.DataFrame]   # setting -> precision/recall/f1/support/predicted per SPICE
+    rows: int
+    stats: Dict[str, float]              # shared stage seconds and encode/cache counters of the single scoring pass
+
+    @property
+    def best(self) -> str:
+        """Setting with the highest micro F1 (the faster one on ties)."""
+        ranked = self.summary.sort_values(["micro_f1", "rows_per_sec"], ascending=False, kind="stable")
+        return ranked.index[0]
+
+
+def parse_labels(values: Sequence, spices: Sequence[str]) -> np.ndarray:
+    """Bool (rows, spices) from label strings ("Service; Skill Development"); each distinct string is parsed once."""
+    col = {s.lower(): j for j, s in enumerate(spices)}
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna("").astype(str))
+    table = np.zeros((len(uniques), len(spices)), dtype=bool)
+    for u, value in enumerate(uniques):
+        for name in (n.strip() for n in _SEPARATORS.split(value)):
+            if not name or name.lower() == "uncategorized":
+                continue
+            if name.lower() not in col:
+                raise ValueError(f"Unknown SPICE {name!r} in label {value!r}")
+            table[u, col[name.lower()]] = True
+    return table[codes]
+
+
+def per_spice_metrics(gold: np.ndarray, pred: np.ndarray, spices: Sequence[str]) -> pd.DataFrame:
+    """
+    Precision, recall, F1, support (gold rows) and predicted rows per SPICE, plus 'micro avg' and
+    'macro avg' rows. A zero denominator gives 0.0.
+    """
+    tp = (gold & pred).sum(axis=0)
+    fp = (~gold & pred).sum(axis=0)
+    fn = (gold & ~pred).sum(axis=0)
+    precision, recall, f1 = _prf(tp, fp, fn)
+    micro = _prf(tp.sum(), fp.sum(), fn.sum())
+    out = pd.DataFrame({
+        "precision": np.append(precision, [micro[0], precision.mean()]),
+        "recall": np.append(recall, [micro[1], recall.mean()]),
+        "f1": np.append(f1, [micro[2], f1.mean()]),
+        "support": np.append(tp + fn, [(tp + fn).sum()] * 2),
+        "predicted": np.append(tp + fp, [(tp + fp).sum()] * 2),
+    }, index=list(spices) + ["micro avg", "macro avg"])
+    out.index.name = "SPICE"
+    return out
+
+
+def _prf(tp, fp, fn):
+    tp, fp, fn = (np.asarray(a, dtype=np.float64) for a in (tp, fp, fn))
+    precision = np.divide(tp, tp + fp, out=np.zeros_like(tp), where=(tp + fp) > 0)
+    recall = np.divide(tp, tp + fn, out=np.zeros_like(tp), where=(tp + fn) > 0)
+    f1 = np.divide(2 * tp, 2 * tp + fp + fn, out=np.zeros_like(tp), where=(2 * tp + fp + fn) > 0)
+    return precision, recall, f1
+
+
+def default_thresholds(clf: SPICESClassifier) -> List[float]:
+    """clf.sem_threshold +/- 0.2 in steps of 0.05, kept inside (0, 1)."""
+    return sorted({round(float(t), 3) for t in clf.sem_threshold + SWEEP_STEPS if 0 < t < 1})
+
+
+def evaluate(clf: SPICESClassifier, texts: Sequence[str], gold, thresholds: Optional[Sequence[float]] = None,
+             batch_size: int = 64, n_jobs: Optional[int] = None, keywords_only: bool = True) -> Evaluation:
+    """
+    Score texts once and evaluate every setting against gold (label strings or a bool (rows, spices) matrix).
+    thresholds: sem_threshold values to sweep (default: default_thresholds(clf); ignored without the
+                semantic step). keywords_only: also evaluate keyword matching alone.
+    n_jobs: threads for the sweep (default: one per setting, up to the CPU count).
+    Uses the classifier's semantic_suggestions and dedup_threshold settings, as score_texts would.
+    """
+    spices = clf.spices
+    gold = np.asarray(gold, dtype=bool) if isinstance(gold, np.ndarray) else parse_labels(gold, spices)
+    if gold.shape != (len(texts), len(spices)):
+        raise ValueError(f"gold labels must be ({len(texts)}, {len(spices)}), got {gold.shape}")
+
+    # One scoring pass over distinct texts (and near-duplicate representatives), as in score_texts
+    stats = ClassifierStats(spices)
+    start = time.perf_counter()
+    codes, uniques, _, _ = clf._distinct_texts(texts, stats)
+    kw_mask, sem = clf.match_texts(uniques, batch_size, stats)
+    shared = time.perf_counter() - start
+    keyword_seconds = shared - sum(stats.timers[k] for k in ("dedup", "encode", "similarity"))
+
+    settings = []
+    if keywords_only or sem is None:
+        settings.append((KEYWORDS_ONLY, None))
+    if sem is not None:
+        ts = default_thresholds(clf) if thresholds is None else thresholds
+        settings += [(f"{t:g}", float(t)) for t in ts]
+
+    def run(setting):
+        label, threshold = setting
+        t0 = time.perf_counter()
+        scores = combine_scores(kw_mask, None if threshold is None else sem, threshold)
+        seconds = (keyword_seconds if threshold is None else shared) + time.perf_counter() - t0
+        pred = ~np.isnan(scores)[codes]
+        table = per_spice_metrics(gold, pred, spices)
+        row = {
+            "threshold": np.nan if threshold is None else threshold,
+            "micro_precision": table.at["micro avg", "precision"],
+            "micro_recall": table.at["micro avg", "recall"],
+            "micro_f1": table.at["micro avg", "f1"],
+            "macro_f1": table.at["macro avg", "f1"],
+            "exact_match": float((pred == gold).all(axis=1).mean()) if len(gold) else 0.0,
+            "rows_per_sec": len(gold) / max(seconds, 1e-9),
+        }
+        return label, row, table
+
+    workers = n_jobs or min(len(settings), 32)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:  # numpy releases the GIL; no matrix copies
+        results = list(pool.map(run, settings))
+
+    summary = pd.DataFrame([row for _, row, _ in results], index=[label for label, _, _ in results])
+    summary.index.name = "setting"
+    timings = {k: round(stats.timers[k], 6) for k in ("dedup", "encode", "similarity")}
+    timings.update(keyword=round(keyword_seconds, 6), scoring=round(shared, 6),
+                   distinct_texts=len(uniques), encoded_texts=stats.counters["encoded_texts"],
+                   cache_hits=stats.counters["cache_hits"])
+    return Evaluation(summary, {label: table for label, _, table in results}, len(gold), timings)
+
+
+def evaluate_frame(clf: SPICESClassifier, df: pd.DataFrame, label_col: str = "SPICES", title_col: str = "Title",
+                   desc_col: str = "Description", **kwargs) -> Evaluation:
+    """evaluate() on a labeled DataFrame, with texts built as classify_dataframe builds them."""
+    if label_col not in df.columns:
+        raise ValueError(f"Label column not found: {label_col}")
+    texts = _text_column(df, title_col) + ". " + _text_column(df, desc_col)
+    return evaluate(clf, texts.tolist(), df[label_col].tolist(), **kwargs)
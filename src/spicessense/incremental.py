@@ -0,0 +1,354 @@
+# src/spicessense/incremental.py
+"""
+Incremental re-classification of an event archive after keyword or text edits.
+- Saves, for every row: its id, a fingerprint of its text, the keywords it matched and its scores.
+  It also saves an inverted index token -> rows and the keyword map and settings the scores came from.
+- On the next run only these rows are re-scored:
+  - new rows and rows whose text changed (the fingerprint differs);
+  - rows that matched a removed keyword;
+  - rows containing every token of an added keyword. The index finds them and the keyword matcher
+    then decides.
+  Unchanged rows keep their saved scores.
+- Semantic scores depend on every keyword, so with the semantic step on, a keyword edit re-scores
+  every row. sentence-transformers text embeddings come from the embedding cache, so this is cheap.
+  The `reclassify` command is therefore keyword-only unless given --semantic.
+- New SPICEs, reordered SPICEs or changed classifier settings also re-score everything.
+State lives in one .npz file (see IncrementalClassifier.save).
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .classify import SPICESClassifier, _text_column, format_scores
+from .config import DEFAULT_MODEL_NAME, SEMANTIC_TOP_K
+
+_STATE_VERSION = 1
+_TOKEN = re.compile(r"\w+")
+_SEP = "\x1f"  # joins a row's matched keywords in the saved state
+
+
+def text_fingerprints(texts: List[str]) -> np.ndarray:
+    """64-bit BLAKE2b fingerprint of each text (uint64)."""
+    digests = b"".join(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest() for t in texts)
+    return np.frombuffer(digests, dtype="<u8").astype(np.uint64)
+
+
+def fingerprint_ids(texts: List[str]) -> List[str]:
+    """
+    Row ids derived from the text itself (fingerprint plus occurrence number for duplicates), for
+    tables without an id column. Inserting or deleting rows does not renumber the others; an edited
+    row counts as a deleted row plus a new one.
+    """
+    fps = pd.Series(text_fingerprints(texts))
+    occurrence = fps.groupby(fps).cumcount().to_numpy()
+    return [f"{fp:016x}#{n}" for fp, n in zip(fps.tolist(), occurrence.tolist())]
+
+
+def keyword_changes(old_map: Dict[str, List[str]], new_map: Dict[str, List[str]]) -> Tuple[Set[str], Set[str]]:
+    """(added, removed) keywords between two keyword maps, lowercased; a keyword moved between SPICES is in both."""
+    added, removed = set(), set()
+    for spice in list(old_map) + [s for s in new_map if s not in old_map]:
+        old = {k.lower().strip() for k in old_map.get(spice, [])} - {""}
+        new = {k.lower().strip() for k in new_map.get(spice, [])} - {""}
+        added |= new - old
+        removed |= old - new
+    return added, removed
+
+
+class TokenIndex:
+    """
+    Inverted index token -> row keys (lowercase \\w+ tokens, as the keyword matcher sees words).
+    Postings are stored as sorted CSR arrays plus a small dict of keys added since the last merge.
+    Keys of rows that were edited or deleted are not removed, so a lookup may return extra rows.
+    That is safe because candidate rows are re-scored anyway. See IncrementalClassifier for
+    when the index is rebuilt.
+    """
+
+    def __init__(self, vocab: Optional[List[str]] = None, offsets: Optional[np.ndarray] = None,
+                 keys: Optional[np.ndarray] = None):
+        self.vocab = list(vocab or [])
+        self._ids = {t: i for i, t in enumerate(self.vocab)}
+        self.offsets = np.zeros(len(self.vocab) + 1, dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64) if keys is None else np.asarray(keys, dtype=np.int64)
+        self._pending: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def tokens(text: str) -> Set[str]:
+        return set(_TOKEN.findall(text.lower()))
+
+    def add(self, keys, texts):
+        """Index texts under their row keys."""
+        pending = self._pending
+        for key, text in zip(np.asarray(keys).tolist(), texts):
+            for tok in self.tokens(text):
+                pending.setdefault(tok, []).append(key)
+
+    def lookup(self, token: str) -> np.ndarray:
+        i = self._ids.get(token)
+        base = self.keys[self.offsets[i]:self.offsets[i + 1]] if i is not None else self.keys[:0]
+        extra = self._pending.get(token)
+        return base if not extra else np.union1d(base, extra)
+
+    def candidates(self, keyword: str) -> Optional[np.ndarray]:
+        """Keys of rows that contain every token of keyword (None: the keyword has no word tokens)."""
+        toks = _TOKEN.findall(keyword.lower())
+        if not toks:
+            return None
+        postings = sorted((self.lookup(t) for t in set(toks)), key=len)
+        out = postings[0]
+        for p in postings[1:]:
+            if not len(out):
+                break
+            out = np.intersect1d(out, p, assume_unique=True)
+        return out
+
+    def merge(self):
+        """Fold pending postings into the sorted arrays (done before saving)."""
+        if not self._pending:
+            return
+        tok = [np.repeat(np.arange(len(self.vocab), dtype=np.int64), np.diff(self.offsets))]
+        keys = [self.keys]
+        for token, extra in self._pending.items():
+            i = self._ids.get(token)
+            if i is None:
+                i = self._ids[token] = len(self.vocab)
+                self.vocab.append(token)
+            tok.append(np.full(len(extra), i, dtype=np.int64))
+            keys.append(np.asarray(extra, dtype=np.int64))
+        tok, keys = np.concatenate(tok), np.concatenate(keys)
+        order = np.lexsort((keys, tok))
+        tok, keys = tok[order], keys[order]
+        keep = np.ones(len(tok), dtype=bool)
+        keep[1:] = (tok[1:] != tok[:-1]) | (keys[1:] != keys[:-1])
+        tok, self.keys = tok[keep], keys[keep]
+        self.offsets = np.searchsorted(tok, np.arange(len(self.vocab) + 1)).astype(np.int64)
+        self._pending = {}
+
+    @classmethod
+    def build(cls, keys, texts) -> "TokenIndex":
+        index = cls()
+        index.add(keys, texts)
+        index.merge()
+        return index
+
+
+class IncrementalClassifier:
+    """
+    Wraps a SPICESClassifier and keeps the scores of an archive between runs:
+
+        inc = IncrementalClassifier(SPICESClassifier(use_semantic=False), "spices_state.npz")
+        out = inc.classify_dataframe(df, id_col="Event ID")   # only affected rows are scored
+        inc.save()
+
+    Row ids must be unique within a call; rows missing from a call are dropped from the state.
+    self.last_update describes the most recent call (rows, new, text_changed, keyword_affected,
+    rescored, and the reason for a full re-score if there was one).
+    """
+
+    def __init__(self, classifier: Optional[SPICESClassifier] = None, state_path: Optional[str] = None):
+        self.classifier = classifier if classifier is not None else SPICESClassifier()
+        self.state_path = state_path
+        self._state = self._load(state_path) if state_path and os.path.exists(state_path) else None
+        self.last_update: Dict = {}
+
+    def _config(self) -> Dict:
+        """Classifier settings the saved scores depend on (besides the keyword map)."""
+        clf = self.classifier
+        config = {"use_semantic": bool(clf.use_semantic)}
+        if clf.use_semantic:
+            config.update(sem_threshold=float(clf.sem_threshold), semantic_suggestions=bool(clf.semantic_suggestions),
+                          encoder=clf.encoder if isinstance(clf.encoder, str) else
+                          getattr(clf.encoder, "name", type(clf.encoder).__name__),
+                          model=DEFAULT_MODEL_NAME, pooling=clf.pooling,
+                          top_k=SEMANTIC_TOP_K, dedup_threshold=clf.dedup_threshold)
+        return config
+
+    # ---------- classification ----------
+    def classify(self, ids, texts, batch_size: int = 64) -> np.ndarray:
+        """
+        Scores for texts (float32 (rows, spices), NaN = not assigned, as SPICESClassifier.score_texts).
+        Saved scores are reused where still valid. The state is updated in memory; call save() to keep it.
+        """
+        clf = self.classifier
+        ids = pd.Index([str(i) for i in ids])
+        if not ids.is_unique:
+            raise ValueError("Row ids must be unique (pass an id column, or use fingerprint_ids)")
+        texts = [str(t) for t in texts]
+        n = len(texts)
+        fps = text_fingerprints(texts)
+        spices = clf.spices
+        config = self._config()
+        st = self._state
+
+        reason = None
+        if st is None:
+            reason = "no saved state"
+        elif st["spices"] != spices:
+            reason = "SPICE list changed"
+        elif st["config"] != config:
+            reason = "classifier settings changed"
+
+        if st is None:
+            pos = np.full(n, -1, dtype=np.int64)
+        else:
+            pos = pd.Index(st["ids"]).get_indexer(ids)
+        known = pos >= 0
+        changed = ~known
+        if st is not None:
+            changed[known] = st["fingerprints"][pos[known]] != fps[known]
+        affected = np.zeros(n, dtype=bool)
+
+        if reason is None:
+            added, removed = keyword_changes(st["keyword_map"], clf.keyword_map)
+            if (added or removed) and clf.use_semantic:
+                reason = "keyword map changed (semantic scores use every keyword)"
+            elif added or removed:
+                affected = known & self._keyword_affected(st, pos, added, removed)
+
+        rescore = np.ones(n, dtype=bool) if reason else (changed | affected)
+        todo = np.flatnonzero(rescore)
+        sub_texts = [texts[i] for i in todo]
+        new_scores = clf.score_texts(sub_texts, batch_size=batch_size)
+        find = clf.keywords.find_keywords
+        new_matched = [_SEP.join(find(t)) for t in sub_texts]
+
+        scores = np.empty((n, len(spices)), dtype=np.float32)
+        matched = np.empty(n, dtype=object)
+        keys = np.empty(n, dtype=np.int64)
+        if reason is None:
+            scores[known] = st["scores"][pos[known]]
+        if st is not None:
+            matched[known] = st["matched"][pos[known]]
+            keys[known] = st["keys"][pos[known]]
+        scores[todo] = new_scores
+        matched[todo] = new_matched
+
+        next_key = st["next_key"] if st is not None else 0
+        keys[~known] = next_key + np.arange((~known).sum())
+        next_key += int((~known).sum())
+        if st is None:
+            index, stale = TokenIndex.build(keys, texts), 0
+        else:
+            index = st["index"]
+            index.add(keys[changed], [texts[i] for i in np.flatnonzero(changed)])
+            stale = st["stale"] + int((changed & known).sum()) + (len(st["ids"]) - int(known.sum()))
+            if stale > n // 2:  # mostly stale postings: rebuild from the current texts
+                index, stale = TokenIndex.build(keys, texts), 0
+
+        self._state = {
+            "ids": np.asarray(ids, dtype=object), "keys": keys, "fingerprints": fps, "matched": matched,
+            "scores": scores, "spices": list(spices), "config": config,
+            "keyword_map": {s: list(kws) for s, kws in clf.keyword_map.items()},
+            "index": index, "next_key": next_key, "stale": stale,
+        }
+        self.last_update = {
+            "rows": n,
+            "new": int((~known).sum()),
+            "text_changed": int((changed & known).sum()),
+            "keyword_affected": int((affected & ~changed).sum()),
+            "rescored": len(todo),
+            "full_rescore": reason,
+        }
+        return scores
+
+    def _keyword_affected(self, st, pos, added: Set[str], removed: Set[str]) -> np.ndarray:
+        """Rows (of this call, via their saved position) that an added or removed keyword can change."""
+        index = st["index"]
+        hit_keys, all_rows = [], False
+        for kw in added:
+            cand = index.candidates(kw)
+            if cand is None:
+                all_rows = True
+                break
+            hit_keys.append(cand)
+        if all_rows:
+            return np.ones(len(pos), dtype=bool)
+        saved_hits = np.zeros(len(st["ids"]), dtype=bool)
+        if hit_keys:
+            saved_hits |= np.isin(st["keys"], np.concatenate(hit_keys))
+        if removed:
+            # Only rows that actually matched a removed keyword; the index narrows the search
+            cand = [index.candidates(kw) for kw in removed]
+            if any(c is None for c in cand):
+                rows = np.arange(len(st["ids"]))
+            else:
+                rows = np.flatnonzero(np.isin(st["keys"], np.concatenate(cand)))
+            matched = st["matched"]
+            for r in rows:
+                if not removed.isdisjoint(matched[r].split(_SEP)):
+                    saved_hits[r] = True
+        out = np.zeros(len(pos), dtype=bool)
+        known = pos >= 0
+        out[known] = saved_hits[pos[known]]
+        return out
+
+    def classify_dataframe(self, df: pd.DataFrame, id_col: Optional[str] = None, title_col="Title",
+                           desc_col="Description", batch_size: int = 64) -> pd.DataFrame:
+        """
+        classify_dataframe with saved scores reused: adds 'SPICES' and 'SPICES_scores' columns.
+        id_col: column of stable row ids. Without one, ids come from the text (see fingerprint_ids).
+        """
+        texts = (_text_column(df, title_col) + ". " + _text_column(df, desc_col)).tolist()
+        ids = df[id_col].tolist() if id_col else fingerprint_ids(texts)
+        scores = self.classify(ids, texts, batch_size=batch_size)
+        labels, values = format_scores(scores, self.classifier.spices)
+        out_df = df.copy(deep=False)
+        out_df["SPICES"] = labels
+        out_df["SPICES_scores"] = values
+        return out_df
+
+    def summary(self) -> str:
+        u = self.last_update
+        if not u:
+            return "nothing classified yet"
+        text = (f"{u['rescored']:,} of {u['rows']:,} rows re-scored ({u['new']:,} new, "
+                f"{u['text_changed']:,} edited, {u['keyword_affected']:,} affected by keyword edits)")
+        return text + (f"; full re-score: {u['full_rescore']}" if u["full_rescore"] else "")
+
+    # ---------- persistence ----------
+    def save(self, path: Optional[str] = None):
+        path = path or self.state_path
+        if not path:
+            raise ValueError("No state path given")
+        st = self._state
+        if st is None:
+            return
+        index = st["index"]
+        index.merge()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {
+            "version": np.int64(_STATE_VERSION),
+            "ids": st["ids"], "keys": st["keys"], "fingerprints": st["fingerprints"],
+            "matched": st["matched"], "scores": st["scores"],
+            "meta": np.asarray(json.dumps({"spices": st["spices"], "config": st["config"],
+                                           "keyword_map": st["keyword_map"], "next_key": st["next_key"],
+                                           "stale": st["stale"]})),
+            "index_vocab": np.asarray(index.vocab, dtype=object),
+            "index_offsets": index.offsets, "index_keys": index.keys,
+        }
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:  # a file handle keeps np.savez from appending ".npz"
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _load(path: str) -> Optional[Dict]:
+        """Saved state, or None if it is unreadable or from another state version (then everything is re-scored)."""
+        try:
+            with np.load(path, allow_pickle=True) as data:
+                if int(data["version"]) != _STATE_VERSION:
+                    return None
+                meta = json.loads(str(data["meta"]))
+                index = TokenIndex(data["index_vocab"].tolist(), data["index_offsets"], data["index_keys"])
+                return {
+                    "ids": data["ids"], "keys": data["keys"], "fingerprints": data["fingerprints"],
+                    "matched": data["matched"], "scores": data["scores"], "index": index, **meta,
+                }
+        except (OSError, KeyError, ValueError):
+            return None
@@ -0,0 +1,166 @@
+# src/spicessense/keyword_index.py
+"""
+Keyword-level embedding index for the semantic matcher.
+- One L2-normalized embedding per keyword, stored grouped by SPICE (contiguous rows per SPICE).
+- A text is compared against every keyword in a single matmul; keyword similarities are pooled per
+  SPICE by max, or by the mean of the top-k keywords.
+- Storage as float32, float16, or int8 with a per-keyword scale (symmetric quantization).
+- Saved as .npz next to the embedding cache, keyed by model name, keyword map and dtype, so a warm
+  start loads it without touching the model.
+"""
+
+import hashlib
+import os
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+_INDEX_VERSION = 1
+POOLINGS = ("max", "topk")
+DTYPES = ("float32", "float16", "int8")
+
+
+def _l2_normalize(embs):
+    """Row-wise L2 normalization (rows of zeros stay zero)."""
+    embs = np.asarray(embs, dtype=np.float32)
+    return embs / (np.linalg.norm(embs, axis=1, keepdims=True) + 1e-12)
+
+
+def _index_key(model_name: str, keyword_map: Dict[str, List[str]], dtype: str) -> str:
+    h = hashlib.sha1()
+    h.update(f"v{_INDEX_VERSION}\0{model_name}\0{dtype}".encode("utf-8"))
+    for spice, kws in keyword_map.items():
+        h.update(("\1" + spice + "\2" + "\3".join(kws)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def index_path(cache_dir: str, model_name: str, keyword_map: Dict[str, List[str]], dtype: str) -> str:
+    return os.path.join(cache_dir, "keyword_index", _index_key(model_name, keyword_map, dtype) + ".npz")
+
+
+class KeywordEmbeddingIndex:
+    """
+    spices: SPICE names (score column order); keywords: one entry per row of the index;
+    owners: SPICE index of each keyword (non-decreasing); embs: normalized vectors, possibly quantized;
+    scale: per-row dequantization factors for int8 (None otherwise).
+    """
+
+    def __init__(self, spices: List[str], keywords: List[str], owners: np.ndarray, embs: np.ndarray,
+                 scale: Optional[np.ndarray] = None):
+        self.spices = list(spices)
+        self.keywords = list(keywords)
+        self.owners = np.asarray(owners, dtype=np.int64)
+        self.embs = embs
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float32)
+        # First row of each SPICE's block; SPICEs without keywords have an empty block
+        self.starts = np.searchsorted(self.owners, np.arange(len(self.spices)))
+        self.ends = np.searchsorted(self.owners, np.arange(len(self.spices)), side="right")
+        self._matrix = None
+
+    @property
+    def dtype(self) -> str:
+        return str(self.embs.dtype)
+
+    @classmethod
+    def build(cls, keyword_map: Dict[str, List[str]], encode: Callable[[List[str]], np.ndarray],
+              dtype: str = "float32") -> "KeywordEmbeddingIndex":
+        """Encode every keyword once (encode(list_of_texts) -> array) and normalize/quantize the result."""
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported index dtype: {dtype!r} (use one of {DTYPES})")
+        spices = list(keyword_map.keys())
+        keywords, owners = [], []
+        for j, spice in enumerate(spices):
+            for kw in dict.fromkeys(k.strip() for k in keyword_map[spice] if k.strip()):
+                keywords.append(kw)
+                owners.append(j)
+        raw = encode(keywords) if keywords else np.zeros((0, 1), dtype=np.float32)
+        embs = _l2_normalize(raw)
+        scale = None
+        if dtype == "int8":
+            scale = np.abs(embs).max(axis=1) / 127.0 + 1e-12
+            embs = np.clip(np.rint(embs / scale[:, None]), -127, 127).astype(np.int8)
+        elif dtype == "float16":
+            embs = embs.astype(np.float16)
+        return cls(spices, keywords, np.asarray(owners, dtype=np.int64), embs, scale)
+
+    @classmethod
+    def from_phrases(cls, spices: List[str], phrase_embs: np.ndarray) -> "KeywordEmbeddingIndex":
+        """One entry per SPICE (the joined-keywords phrase embedding used before keyword-level pooling)."""
+        return cls(spices, list(spices), np.arange(len(spices)), _l2_normalize(phrase_embs))
+
+    # ---------- persistence ----------
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {
+            "version": np.int64(_INDEX_VERSION),
+            "spices": np.asarray(self.spices, dtype=object),
+            "keywords": np.asarray(self.keywords, dtype=object),
+            "owners": self.owners,
+            "embs": self.embs,
+        }
+        if self.scale is not None:
+            arrays["scale"] = self.scale
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:  # a file handle keeps np.savez from appending ".npz"
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["KeywordEmbeddingIndex"]:
+        """The saved index, or None if it is missing, unreadable or from another index version."""
+        try:
+            with np.load(path, allow_pickle=True) as data:
+                if int(data["version"]) != _INDEX_VERSION:
+                    return None
+                scale = data["scale"] if "scale" in data.files else None
+                return cls(data["spices"].tolist(), data["keywords"].tolist(), data["owners"], data["embs"], scale)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    @classmethod
+    def load_or_build(cls, keyword_map: Dict[str, List[str]], encode: Callable[[List[str]], np.ndarray],
+                      model_name: str, cache_dir: Optional[str] = None, dtype: str = "float32",
+                      readonly: bool = False) -> "KeywordEmbeddingIndex":
+        """Load the index for (model, keyword map, dtype) from cache_dir, building and saving it on a miss."""
+        path = index_path(cache_dir, model_name, keyword_map, dtype) if cache_dir else None
+        if path and os.path.exists(path):
+            index = cls.load(path)
+            if index is not None:
+                return index
+        index = cls.build(keyword_map, encode, dtype)
+        if path and not readonly:
+            index.save(path)
+        return index
+
+    # ---------- scoring ----------
+    def matrix(self) -> np.ndarray:
+        """(dim, n_keywords) float32 matrix of (dequantized) keyword vectors, built once."""
+        if self._matrix is None:
+            embs = self.embs.astype(np.float32)
+            if self.scale is not None:
+                embs = embs * self.scale[:, None]
+            self._matrix = np.ascontiguousarray(embs.T)
+        return self._matrix
+
+    def similarities(self, text_embs_norm: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each (L2-normalized) text to each keyword: (n_texts, n_keywords)."""
+        return np.asarray(text_embs_norm, dtype=np.float32) @ self.matrix()
+
+    def pool(self, sims: np.ndarray, pooling: str = "max", top_k: int = 3) -> np.ndarray:
+        """Per-SPICE scores (n_texts, n_spices) from keyword similarities; SPICEs without keywords get -1."""
+        if pooling not in POOLINGS:
+            raise ValueError(f"pooling must be one of {POOLINGS}, got {pooling!r}")
+        out = np.full((sims.shape[0], len(self.spices)), -1.0, dtype=np.float32)
+        for j, (lo, hi) in enumerate(zip(self.starts, self.ends)):
+            if hi <= lo:
+                continue
+            block = sims[:, lo:hi]
+            if pooling == "max" or hi - lo == 1:
+                out[:, j] = block.max(axis=1)
+            else:
+                k = min(top_k, hi - lo)
+                out[:, j] = np.partition(block, hi - lo - k, axis=1)[:, hi - lo - k:].mean(axis=1)
+        return out
+
+    def score(self, text_embs_norm: np.ndarray, pooling: str = "max", top_k: int = 3) -> np.ndarray:
+        return self.pool(self.similarities(text_embs_norm), pooling, top_k)
@@ -0,0 +1,205 @@
+# src/spicessense/keyword_match.py
+"""
+Compiled keyword engine for SPICES classification.
+- Builds one alternation regex from a {spice: [keywords]} map.
+- Scans each text once and reports every matched SPICE with the keyword that triggered it.
+- Rebuilds itself when the keyword map is edited in place.
+- word_boundary=False matches plain substrings instead, for the legacy first-match scripts (see tagging.py).
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .keywords import SPICES_KEYWORDS
+
+
+def _keyword_signature(keyword_map: Dict[str, List[str]]) -> Tuple:
+    """Cheap, comparable snapshot of a keyword map (detects in-place edits)."""
+    return tuple((spice, tuple(kws)) for spice, kws in keyword_map.items())
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex alternation for words with shared prefixes factored out
+    (["career", "career services", "cv"] -> "c(?:areer(?: services)?|v)"), so the regex
+    engine branches per character instead of retrying every keyword at every position.
+    Longer continuations are tried before shorter ones.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def walk(node: dict) -> str:
+        end = "" in node
+        branches = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            return ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return walk(trie)
+
+
+def _has_partial_overlaps(words: List[str], word_boundary: bool = True) -> bool:
+    """
+    True if some word can begin at an inner word boundary of another (any inner position when
+    matching substrings) and extend past its end.
+    """
+    if not word_boundary:
+        prefixes = {b[:j] for b in words for j in range(1, len(b))}
+        return any(a[i:] in prefixes for a in words for i in range(1, len(a)))
+    for a in words:
+        for i in (m.start() for m in re.finditer(r"\b", a)):
+            if 0 < i < len(a):
+                tail = a[i:]
+                # b must also leave a word boundary where a ends, or a could not match there
+                boundary = re.compile(re.escape(tail) + r"\b")
+                if any(len(b) > len(tail) and b.startswith(tail) and boundary.match(b) for b in words):
+                    return True
+    return False
+
+
+class KeywordMatcher:
+    """
+    Matches all SPICES keywords against a text in a single regex pass.
+
+    Keywords are matched case-insensitively on word boundaries (same rule as the
+    old per-keyword `\\b<kw>\\b` search), or as plain substrings (`kw in text`) with
+    word_boundary=False. Keywords that sit inside longer phrases ("food drive" / "drive")
+    or overlap each other are all reported.
+    """
+
+    def __init__(self, keyword_map: Optional[Dict[str, List[str]]] = None, word_boundary: bool = True):
+        self.keyword_map = SPICES_KEYWORDS if keyword_map is None else keyword_map
+        self.word_boundary = word_boundary
+        self._signature = None
+        self._build()
+
+    def _build(self):
+        self._signature = _keyword_signature(self.keyword_map)
+        self.spices = list(self.keyword_map.keys())
+        # keyword -> SPICES it belongs to (a keyword may sit under several, e.g. "workshop")
+        kw_spices: Dict[str, List[str]] = {}
+        for spice, keywords in self.keyword_map.items():
+            for kw in keywords:
+                kw_l = kw.lower().strip()
+                if not kw_l:
+                    continue
+                owners = kw_spices.setdefault(kw_l, [])
+                if spice not in owners:
+                    owners.append(spice)
+        self.keyword_spices = kw_spices
+        spice_pos = {spice: i for i, spice in enumerate(self.spices)}
+        self._keyword_cols = {kw: [spice_pos[s] for s in owners] for kw, owners in kw_spices.items()}
+
+        if not kw_spices:
+            self._pattern = None
+            self._implied = {}
+            self._match_bits = {}
+            return
+
+        # Longest first so the alternation prefers "career services" over "career"
+        ordered = sorted(kw_spices, key=len, reverse=True)
+        alternation = _trie_pattern(ordered)
+        b = r"\b" if self.word_boundary else ""
+        overlapping = re.compile(b + r"(?=(" + alternation + r")" + b + r")")
+
+        # A match reports only its longest keyword, so record which other keywords it
+        # implies: those it starts with or contains (on word boundaries, unless matching substrings),
+        # e.g. "food drive" -> "drive".
+        implied = {}
+        for kw in ordered:
+            inner = [
+                other for other in ordered
+                if other != kw and other in kw and re.search(b + re.escape(other) + b, kw)
+            ]
+            implied[kw] = [kw] + sorted(inner, key=kw.find)
+        self._implied = implied
+
+        # A consuming scan is faster than a lookahead tried at every boundary, and exact as long
+        # as no keyword can start inside another one and run past its end.
+        if _has_partial_overlaps(ordered, self.word_boundary):
+            self._pattern = overlapping
+        else:
+            self._pattern = re.compile(b + r"(" + alternation + r")" + b)
+        # SPICE bitmask (bit j = column j) switched on by each alternative, implied keywords included
+        self._match_bits = {
+            kw: sum(1 << c for c in {c for other in implied[kw] for c in self._keyword_cols[other]})
+            for kw in ordered
+        }
+
+    def refresh(self) -> bool:
+        """Rebuild the compiled tables if the keyword map changed. Returns True if rebuilt."""
+        if _keyword_signature(self.keyword_map) != self._signature:
+            self._build()
+            return True
+        return False
+
+    def find_keywords(self, text: str) -> List[str]:
+        """Return every distinct keyword present in text, in order of first appearance."""
+        self.refresh()
+        if self._pattern is None or not text:
+            return []
+        found = {}
+        for m in self._pattern.finditer(text.lower()):
+            for kw in self._implied[m.group(1)]:
+                found.setdefault(kw, None)
+        return list(found)
+
+    def match(self, text: str) -> Dict[str, str]:
+        """
+        Return {spice: keyword} for every SPICE with at least one keyword in text.
+        The keyword is the first one (in text order) that triggered the SPICE; the dict
+        follows the keyword map's SPICE order.
+        """
+        hits: Dict[str, str] = {}
+        for kw in self.find_keywords(text):
+            for spice in self.keyword_spices[kw]:
+                hits.setdefault(spice, kw)
+        return {spice: hits[spice] for spice in self.spices if spice in hits}
+
+    def mask(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Return a boolean array (len(texts), len(self.spices)) marking the SPICES whose
+        keywords appear in each text; columns follow the keyword map order.
+        """
+        self.refresh()
+        texts = list(texts)
+        out = np.zeros((len(texts), len(self.spices)), dtype=bool)
+        if self._pattern is None:
+            return out
+        findall, match_bits = self._pattern.findall, self._match_bits
+        bits = [0] * len(texts)
+        for i, text in enumerate(texts):
+            if text:
+                b = 0
+                for kw in set(findall(text.lower())):
+                    b |= match_bits[kw]
+                bits[i] = b
+        if len(self.spices) <= 62:
+            packed = np.array(bits, dtype=np.int64)
+            return ((packed[:, None] >> np.arange(len(self.spices), dtype=np.int64)) & 1).astype(bool)
+        for i, b in enumerate(bits):
+            out[i] = [(b >> j) & 1 for j in range(len(self.spices))]
+        return out
+
+_MATCHERS: Dict[Tuple[int, bool], KeywordMatcher] = {}
+
+
+def get_keyword_matcher(keyword_map: Optional[Dict[str, List[str]]] = None,
+                        word_boundary: bool = True) -> KeywordMatcher:
+    """Shared matcher per keyword map object (and matching rule); rebuilt lazily when the map changes."""
+    keyword_map = SPICES_KEYWORDS if keyword_map is None else keyword_map
+    key = (id(keyword_map), word_boundary)
+    matcher = _MATCHERS.get(key)
+    if matcher is None or matcher.keyword_map is not keyword_map:
+        matcher = KeywordMatcher(keyword_map, word_boundary=word_boundary)
+        _MATCHERS[key] = matcher
+    return matcher
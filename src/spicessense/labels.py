@@ -0,0 +1,163 @@
+# src/spicessense/labels.py
+"""
+Compact classifier output: SPICE sets as an unsigned-integer bitmask (bit j = SPICE j) plus the
+scores as one contiguous float32 (rows, spices) array (NaN = not assigned).
+- Converts losslessly to and from the 'SPICES' / 'SPICES_scores' strings of classify_dataframe
+  (scores are kept at the strings' 3 decimals when parsed from them, so SPICES whose scores print
+  the same come back in SPICE order).
+- Filtering is bitwise on the mask: labels.has("Service"), labels.has_all(...), labels.has_any(...).
+- As DataFrame columns: 'SPICES_mask' plus one float32 'SPICES_<Name>' score column per SPICE, NaN
+  when not assigned (SPICESClassifier.classify_dataframe(..., compact=True)).
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .classify import format_scores
+
+MASK_COLUMN = "SPICES_mask"
+
+
+def score_column(spice: str) -> str:
+    """Per-SPICE column name, as classify_dataframe(wide=...) names it."""
+    return f"SPICES_{spice.replace(' ', '_')}"
+
+
+def mask_dtype(n_spices: int) -> np.dtype:
+    """Smallest unsigned integer type with a bit per SPICE (uint8 for up to 8 SPICES)."""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_spices <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    raise ValueError(f"At most 64 SPICES fit in a bitmask, got {n_spices}")
+
+
+class CompactLabels:
+    """
+    spices: SPICE names (bit and score column order); mask: (rows,) bitmask of assigned SPICES;
+    scores: float32 (rows, spices) with NaN where a SPICE is not assigned.
+    """
+
+    def __init__(self, spices: Sequence[str], mask: np.ndarray, scores: np.ndarray):
+        self.spices = list(spices)
+        self.mask = np.asarray(mask, dtype=mask_dtype(len(self.spices)))
+        self.scores = np.ascontiguousarray(scores, dtype=np.float32)
+        if self.scores.shape != (len(self.mask), len(self.spices)):
+            raise ValueError(f"scores must be (rows, {len(self.spices)}), got {self.scores.shape}")
+
+    # ---------- construction ----------
+    @classmethod
+    def from_scores(cls, scores: np.ndarray, spices: Sequence[str]) -> "CompactLabels":
+        """From a score_texts matrix (NaN = not assigned)."""
+        scores = np.asarray(scores, dtype=np.float32)
+        dtype = mask_dtype(len(spices))
+        weights = (np.ones(1, dtype=dtype) << np.arange(len(spices), dtype=dtype)).astype(dtype)
+        mask = (~np.isnan(scores)).astype(dtype) @ weights if len(spices) else np.zeros(len(scores), dtype)
+        return cls(spices, mask.astype(dtype), scores)
+
+    @classmethod
+    def from_strings(cls, labels: Sequence[str], values: Sequence[str], spices: Sequence[str]) -> "CompactLabels":
+        """
+        Parse 'SPICES' / 'SPICES_scores' strings ("Service; Skill Development" / "1.000; 0.512";
+        "Uncategorized" / "0.000" for nothing assigned). Each distinct pair is parsed once.
+        """
+        spices = list(spices)
+        col = {s: j for j, s in enumerate(spices)}
+        pairs = pd.Series(labels, dtype=object).fillna("").astype(str) + "\0" + \
+            pd.Series(values, dtype=object).fillna("").astype(str)
+        codes, uniques = pd.factorize(pairs)
+        table = np.full((len(uniques), len(spices)), np.nan, dtype=np.float32)
+        for u, pair in enumerate(uniques):
+            label_str, value_str = pair.split("\0")
+            names = [s.strip() for s in label_str.split(";") if s.strip()]
+            if names in ([], ["Uncategorized"]):
+                continue
+            nums = [v.strip() for v in value_str.split(";")]
+            if len(nums) != len(names):
+                raise ValueError(f"{len(names)} labels but {len(nums)} scores in {label_str!r} / {value_str!r}")
+            for name, num in zip(names, nums):
+                if name not in col:
+                    raise ValueError(f"Unknown SPICE {name!r}")
+                table[u, col[name]] = float(num)
+        return cls.from_scores(table[codes], spices)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, spices: Sequence[str]) -> "CompactLabels":
+        """From compact columns (see to_frame), or else from 'SPICES' / 'SPICES_scores' strings."""
+        score_cols = [score_column(s) for s in spices]
+        if MASK_COLUMN in df.columns and all(c in df.columns for c in score_cols):
+            return cls.from_scores(df[score_cols].to_numpy(dtype=np.float32), spices)
+        return cls.from_strings(df["SPICES"].tolist(), df["SPICES_scores"].tolist(), spices)
+
+    # ---------- conversion ----------
+    def to_strings(self):
+        """('SPICES', 'SPICES_scores') string arrays, exactly as classify_dataframe formats them."""
+        return format_scores(self.scores, self.spices)
+
+    def to_frame(self, index=None) -> pd.DataFrame:
+        """'SPICES_mask' plus one float32 'SPICES_<name>' score column per SPICE."""
+        out = pd.DataFrame(self.scores, columns=[score_column(s) for s in self.spices], index=index, copy=False)
+        out.insert(0, MASK_COLUMN, self.mask)
+        return out
+
+    def to_categorical(self) -> pd.Categorical:
+        """Label sets as a categorical, SPICES joined in SPICE order (one category per distinct set)."""
+        uniq, inverse = np.unique(self.mask, return_inverse=True)
+        names = ["; ".join(s for j, s in enumerate(self.spices) if (int(b) >> j) & 1) or "Uncategorized"
+                 for b in uniq]
+        return pd.Categorical.from_codes(inverse.reshape(-1), categories=names)
+
+    # ---------- filtering ----------
+    def bits(self, *spices: str) -> int:
+        """Bitmask with the bits of the given SPICES set."""
+        out = 0
+        for s in spices:
+            try:
+                out |= 1 << self.spices.index(s)
+            except ValueError:
+                raise ValueError(f"Unknown SPICE {s!r}") from None
+        return out
+
+    def has(self, spice: str) -> np.ndarray:
+        return self.has_any(spice)
+
+    def has_any(self, *spices: str) -> np.ndarray:
+        """Rows with at least one of the SPICES."""
+        return (self.mask & self.mask.dtype.type(self.bits(*spices))) != 0
+
+    def has_all(self, *spices: str) -> np.ndarray:
+        """Rows with every one of the SPICES."""
+        b = self.mask.dtype.type(self.bits(*spices))
+        return (self.mask & b) == b
+
+    @property
+    def uncategorized(self) -> np.ndarray:
+        return self.mask == 0
+
+    def counts(self) -> pd.Series:
+        """Rows per SPICE."""
+        shifts = np.arange(len(self.spices), dtype=self.mask.dtype)
+        hits = ((self.mask[:, None] >> shifts) & 1).sum(axis=0)
+        return pd.Series(hits, index=self.spices, dtype=np.int64)
+
+    # ---------- container ----------
+    def __len__(self) -> int:
+        return len(self.mask)
+
+    def __getitem__(self, rows) -> "CompactLabels":
+        """Row subset by boolean mask, index array or slice: labels[labels.has("Service")]."""
+        return CompactLabels(self.spices, self.mask[rows], self.scores[rows])
+
+    @property
+    def nbytes(self) -> int:
+        return self.mask.nbytes + self.scores.nbytes
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactLabels):
+            return NotImplemented
+        return (self.spices == other.spices and np.array_equal(self.mask, other.mask)
+                and np.array_equal(self.scores, other.scores, equal_nan=True))
+
+    def __repr__(self) -> str:
+        return f"CompactLabels({len(self)} rows, {len(self.spices)} SPICES, {self.nbytes:,} bytes)"
@@ -0,0 +1,102 @@
+# src/spicessense/metrics.py
+"""
+Cohort-normalized event metrics, vectorized over whole tables.
+- Event_Size_%, Attendance_Rate, Reach_Rate, No_Response_% and Engagement_Index as column arithmetic.
+- Cohort size per Semester (events from terms without a configured size use the default).
+- Committee size buckets with one pd.cut call: <=15 Small, <=34 Medium, otherwise Large.
+- Pivots (event counts and mean engagement per group x size bucket) from a single groupby pass.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .data.processed_store import RSVP_COLUMNS
+
+DEFAULT_COHORT_SIZE = 460
+
+SIZE_BINS = [-np.inf, 15, 34, np.inf]
+SIZE_LABELS = ["Small", "Medium", "Large"]
+SUMMARY_COLUMNS = ["Event_Size_%", "Attendance_Rate", "Reach_Rate", "No_Response_%", "Engagement_Index"]
+ENGAGEMENT_WEIGHTS = {"Reach_Rate": 0.5, "Attendance_Rate": 0.3, "Responded": 0.2}
+
+
+class MetricSummary(NamedTuple):
+    counts: pd.DataFrame           # events per group x Size_Category
+    avg_engagement: pd.DataFrame   # mean Engagement_Index per group x Size_Category
+    stats: pd.DataFrame            # describe() of SUMMARY_COLUMNS
+
+
+def size_category(event_size) -> pd.Series:
+    """Committee size buckets for a Series of attendance counts (categorical Small < Medium < Large)."""
+    return pd.cut(event_size, bins=SIZE_BINS, labels=SIZE_LABELS, right=True)
+
+
+def cohort_size_column(df: pd.DataFrame, cohort_sizes: Optional[Dict[str, float]] = None,
+                       default: float = DEFAULT_COHORT_SIZE) -> pd.Series:
+    """Cohort size for each row, looked up by its Semester."""
+    if not cohort_sizes or "Semester" not in df.columns:
+        return pd.Series(float(default), index=df.index)
+    return df["Semester"].astype(object).map(cohort_sizes).astype("float64").fillna(default)
+
+
+def ensure_numeric(df: pd.DataFrame, columns: Sequence[str] = RSVP_COLUMNS, verbose: bool = False) -> List[str]:
+    """Coerce RSVP columns to numbers (invalid/missing -> 0), adding absent ones as 0. Returns the added names."""
+    added = []
+    for col in columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+        else:
+            if verbose:
+                print(f"⚠️ Column '{col}' not found; filling with zeros.")
+            df[col] = 0
+            added.append(col)
+    return added
+
+
+def add_event_metrics(df: pd.DataFrame, cohort_sizes: Optional[Dict[str, float]] = None,
+                      default_cohort_size: float = DEFAULT_COHORT_SIZE, inplace: bool = False) -> pd.DataFrame:
+    """
+    Add Event_Size, the cohort-normalized rates, Engagement_Index and Size_Category.
+    Expects numeric RSVP columns (see ensure_numeric). Zero denominators count as 1.
+    """
+    out = df if inplace else df.copy()
+    attended = out["# Marked Attended"].to_numpy(dtype="float64")
+    invited = out["# Invited"].to_numpy(dtype="float64")
+    invited = np.where(invited == 0, 1.0, invited)
+    rsvp_yes = out["# RSVP Yes"].to_numpy(dtype="float64")
+    rsvp_yes = np.where(rsvp_yes == 0, 1.0, rsvp_yes)
+    cohort = cohort_size_column(out, cohort_sizes, default_cohort_size).to_numpy(dtype="float64")
+
+    out["Event_Size"] = out["# Marked Attended"]
+    out["Event_Size_%"] = attended / cohort * 100
+    out["Attendance_Rate"] = attended / rsvp_yes
+    out["Reach_Rate"] = attended / invited
+    out["No_Response_%"] = out["# RSVP No Response"].to_numpy(dtype="float64") / invited
+    out["Engagement_Index"] = (
+        ENGAGEMENT_WEIGHTS["Reach_Rate"] * out["Reach_Rate"]
+        + ENGAGEMENT_WEIGHTS["Attendance_Rate"] * out["Attendance_Rate"]
+        + ENGAGEMENT_WEIGHTS["Responded"] * (1 - out["No_Response_%"])
+    )
+    out["Size_Category"] = size_category(out["Event_Size"])
+    return out
+
+
+def summarize(df: pd.DataFrame, by="SPICES Category") -> MetricSummary:
+    """
+    Event counts and mean engagement per `by` group (a column or list of columns, e.g.
+    ["Semester", "SPICES Category"]) x Size_Category, from one groupby, plus summary statistics.
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    grouped = df.groupby(keys + ["Size_Category"], observed=True).agg(
+        count=("Event_Size", "count"),
+        avg_engagement=("Engagement_Index", "mean"),
+    )
+    counts = grouped["count"].unstack("Size_Category", fill_value=0)
+    avg_engagement = grouped["avg_engagement"].unstack("Size_Category")
+    for table in (counts, avg_engagement):
+        table.columns = table.columns.astype(str)
+        table.columns.name = "Size_Category"
+    stats = df[SUMMARY_COLUMNS].describe().T
+    return MetricSummary(counts, avg_engagement, stats)
@@ -0,0 +1,50 @@
+# src/spicessense/models/hashed_features.py
+"""
+Stateless feature transformers for models trained out of core (partial_fit over chunks).
+- CategoryHasher: one-hot style "column=value" indicators hashed into a fixed number of columns, so
+  categories first seen in a later chunk (a new event type, a new semester) need no refit.
+Being stateless, they give identical output for every chunk and never need a full pass over the data.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction import FeatureHasher
+
+
+class CategoryHasher(TransformerMixin, BaseEstimator):
+    """
+    Hash each (column, value) pair of a DataFrame into n_features sparse indicator columns.
+    Missing values get their own "column=" indicator; whole-number floats hash like integers
+    (18.0 -> "start_hour=18"), so numeric codes such as hours and weekdays work as categories.
+    """
+
+    def __init__(self, n_features: int = 2 ** 12, columns: Optional[List[str]] = None):
+        self.n_features = n_features
+        self.columns = columns
+
+    def fit(self, X, y=None):
+        return self
+
+    @staticmethod
+    def _tokens(name: str, values: pd.Series) -> List[str]:
+        def fmt(v):
+            if v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NA or v is pd.NaT:
+                return f"{name}="
+            if isinstance(v, (float, np.floating)) and float(v).is_integer():
+                v = int(v)
+            return f"{name}={v}"
+        return [fmt(v) for v in values.astype(object).tolist()]
+
+    def transform(self, X):
+        X = pd.DataFrame(X)
+        columns = self.columns if self.columns is not None else list(X.columns)
+        per_column = [self._tokens(str(c), X[c]) for c in columns]
+        rows = [list(tokens) for tokens in zip(*per_column)] if per_column else [[] for _ in range(len(X))]
+        hasher = FeatureHasher(n_features=self.n_features, input_type="string", alternate_sign=False)
+        return hasher.transform(rows)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray([f"hash_{i}" for i in range(self.n_features)], dtype=object)
@@ -1,46 +1,179 @@
 # src/spicessense/semantic_match.py
 """
-Semantic matcher using sentence-transformers.
+Semantic matcher using sentence-transformers (or another encoder backend, see encoders.py).
 This module encapsulates loading the model and computing similarity
 between an event description and each SPICE concept.
 """
 
+import importlib.util
+import warnings
+
 import numpy as np
 
-try:
-    from sentence_transformers import SentenceTransformer, util
-    SENT_TRANSFORMERS_AVAILABLE = True
-except Exception:
-    SENT_TRANSFORMERS_AVAILABLE = False
+from .config import (
+    DEFAULT_MODEL_NAME, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_DTYPE,
+    KEYWORD_INDEX_DTYPE, SEMANTIC_POOLING, SEMANTIC_TOP_K,
+)
+from .embedding_cache import CacheLocked, EmbeddingCache
+from .encoders import HashingNgramEncoder
+from .keyword_index import KeywordEmbeddingIndex, _l2_normalize
+from .stats import NULL_STATS
+from . import warm_model
+
+# Only check that the package is installed; importing it (and torch) is deferred to the first model load
+SENT_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
 
 class SemanticMatcher:
     """
-    Wraps a SentenceTransformer model to compute a similarity score for each SPICE.
-    If sentence-transformers is unavailable, this class raises at init.
+    Wraps a SentenceTransformer model (or another encoder) to compute a similarity score for each SPICE.
+    With the sentence-transformers backend, if the package is unavailable, this class raises at init.
+    Embeddings are served from an on-disk EmbeddingCache when cache_dir is set; the model
+    itself is only loaded the first time a text misses the cache. If a warm model process is
+    running (SPICESSENSE_MODEL_SERVER, see warm_model.py) it is used instead of a local model.
+    SPICEs are represented by a KeywordEmbeddingIndex (one normalized vector per keyword), saved
+    under cache_dir so later runs load it without encoding anything.
     """
 
-    def __init__(self, spice_keyword_map, model_name="all-MiniLM-L6-v2"):
-        if not SENT_TRANSFORMERS_AVAILABLE:
-            raise RuntimeError("sentence-transformers not available. Install it to enable semantic matching.")
-        self.model = SentenceTransformer(model_name)
-        # Precompute embeddings for each SPICE aggregated keywords phrase
+    def __init__(self, spice_keyword_map, model_name=DEFAULT_MODEL_NAME, cache_dir=EMBEDDING_CACHE_DIR,
+                 cache_size=EMBEDDING_CACHE_SIZE, cache_dtype=EMBEDDING_CACHE_DTYPE, cache_readonly=False,
+                 pooling=SEMANTIC_POOLING, top_k=SEMANTIC_TOP_K, index_dtype=KEYWORD_INDEX_DTYPE,
+                 encoder=None):
+        """
+        cache_readonly: read from the cache but never write it (e.g. in worker processes); newly
+                        encoded texts are kept for the caller to collect with take_uncached().
+        pooling: "max" (best keyword), "topk" (mean of the top_k keywords) or "phrase"
+                 (one embedding of the SPICE's joined keywords); None / "" = the encoder's
+                 default_pooling, "phrase" for sentence-transformers
+        index_dtype: storage for keyword vectors: "float32", "float16" or "int8"
+        encoder: None / "sentence-transformers" for model_name, "hashing" for a HashingNgramEncoder
+                 fitted on the keyword map, or any object with a SentenceTransformer-style encode()
+        """
+        if pooling and pooling not in ("max", "topk", "phrase"):
+            raise ValueError(f"pooling must be 'max', 'topk' or 'phrase', got {pooling!r}")
+        self._model = None
+        self.model_name = model_name
+        if encoder is None or encoder == "sentence-transformers":
+            if not SENT_TRANSFORMERS_AVAILABLE and warm_model.configured_address() is None:
+                raise RuntimeError("sentence-transformers not available. Install it to enable semantic matching.")
+        else:
+            if encoder == "hashing":
+                encoder = HashingNgramEncoder.from_keyword_map(spice_keyword_map)
+            elif isinstance(encoder, str):
+                raise ValueError(f"Unknown encoder backend: {encoder!r}")
+            self._model = encoder
+            self.model_name = getattr(encoder, "name", type(encoder).__name__)
+        pooling = pooling or getattr(self._model, "default_pooling", "phrase")
+        if not getattr(self._model, "cacheable", True):
+            cache_dir = None  # recomputing is cheaper than the cache
+        self.cache = None
+        if cache_dir:
+            try:
+                self.cache = EmbeddingCache(cache_dir, self.model_name, cache_size, cache_dtype,
+                                            readonly=cache_readonly)
+            except CacheLocked as e:
+                # Another process (e.g. a running `serve`) owns the cache: work uncached rather than share it
+                warnings.warn(f"{e}; continuing without the embedding cache")
+        self._uncached = []
         self.spice_keys = list(spice_keyword_map.keys())
-        # Join keywords into a phrase representing the SPICE to get a concept-level embedding
-        self.spice_phrases = ["; ".join(spice_keyword_map[k]) for k in self.spice_keys]
-        self.spice_embs = self.model.encode(self.spice_phrases, convert_to_numpy=True, show_progress_bar=False)
+        self.pooling = pooling
+        self.top_k = top_k
+        if pooling == "phrase":
+            # Join keywords into a phrase representing the SPICE to get a concept-level embedding
+            phrases = ["; ".join(spice_keyword_map[k]) for k in self.spice_keys]
+            self.index = KeywordEmbeddingIndex.from_phrases(self.spice_keys, self.encode(phrases))
+        else:
+            # Precomputed, L2-normalized keyword vectors, so every similarity is one matmul
+            self.index = KeywordEmbeddingIndex.load_or_build(
+                spice_keyword_map, self.encode, self.model_name, cache_dir=cache_dir, dtype=index_dtype,
+                readonly=cache_readonly,
+            )
+
+    @property
+    def model(self):
+        if self._model is None:
+            remote = warm_model.connect()
+            if remote is not None and remote.model_name == self.model_name:
+                self._model = remote
+            else:
+                if remote is not None:  # serving a different model
+                    remote.close()
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, texts, batch_size=64, stats=NULL_STATS):
+        """
+        Embed texts as a float32 array (len(texts), dim). Cached texts skip the model;
+        misses are de-duplicated, encoded in batches and written back to the cache.
+        stats: ClassifierStats to count model-encoded texts and cache hits/misses in.
+        """
+        texts = list(texts)
+        if self.cache is None:
+            stats.count("encoded_texts", len(texts))
+            return np.asarray(self.model.encode(
+                texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+            ), dtype=np.float32)
+        embs, missing = self.cache.get_many(texts)
+        stats.count("cache_hits", len(texts) - len(missing))
+        stats.count("cache_misses", len(missing))
+        if missing:
+            todo = list(dict.fromkeys(texts[i] for i in missing))
+            stats.count("encoded_texts", len(todo))
+            new = np.asarray(self.model.encode(
+                todo, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+            ), dtype=np.float32)
+            if embs is None:
+                embs = np.zeros((len(texts), new.shape[1]), dtype=np.float32)
+            pos = {t: j for j, t in enumerate(todo)}
+            embs[missing] = new[[pos[texts[i]] for i in missing]]
+            if self.cache.readonly:
+                self._uncached.append((todo, new))
+            else:
+                self.cache.put_many(todo, new)
+        return embs
+
+    def take_uncached(self):
+        """
+        With a read-only cache: return (texts, embeddings) encoded since the last call
+        (so another process can store them) and forget them. None if there are none.
+        """
+        if not self._uncached:
+            return None
+        texts = [t for batch, _ in self._uncached for t in batch]
+        embs = np.concatenate([e for _, e in self._uncached])
+        self._uncached = []
+        return texts, embs
     
+    def flush(self):
+        """Write any pending cache entries to disk (also done automatically at exit)."""
+        if self.cache is not None:
+            self.cache.flush()
+
+    def close(self):
+        """Flush the cache and release it for other processes (the matcher then stops writing it)."""
+        if self.cache is not None:
+            self.cache.close()
+
     def score(self, text):
         """
         Returns a dict {spice: similarity_score} (cosine in [-1,1]) for the input text.
         Higher means more semantically similar.
         """
-        text_emb = self.model.encode([text], convert_to_numpy=True, show_progress_bar=False)[0]
-        # cosine similarity between text_emb and spice_embs
-        # cosine = (a·b) / (||a||*||b||)
-        a = text_emb
-        b = self.spice_embs  # shape (num_spices, dim)
-        a_norm = np.linalg.norm(a) + 1e-12
-        b_norm = np.linalg.norm(b, axis=1) + 1e-12
-        sims = (b @ a) / (b_norm * a_norm)
+        sims = self.score_batch([text])[0]
         return {self.spice_keys[i]: float(sims[i]) for i in range(len(self.spice_keys))}
 
+    def score_batch(self, texts, batch_size=64, stats=NULL_STATS):
+        """
+        Returns an array of shape (len(texts), num_spices) with the cosine similarity
+        of every text against every SPICE. Texts are encoded `batch_size` at a time and
+        compared in a single matrix multiply. stats: ClassifierStats timing the
+        "encode" and "similarity" stages.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, len(self.spice_keys)), dtype=np.float32)
+        with stats.timer("encode"):
+            text_embs = self.encode(texts, batch_size=batch_size, stats=stats)
+        with stats.timer("similarity"):
+            return self.index.score(_l2_normalize(text_embs), pooling="topk" if self.pooling == "topk" else "max",
+                                    top_k=self.top_k)
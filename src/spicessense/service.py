@@ -0,0 +1,281 @@
+# src/spicessense/service.py
+"""
+Micro-batching HTTP classification service (asyncio, standard library only).
+`python -m spicessense serve` keeps one SPICESClassifier (and its model) warm and answers:
+- POST /classify  {"title": ..., "description": ...}  or  {"events": [{...}, ...]}
+- GET  /health    liveness plus queue depth
+- GET  /metrics   request/batch counters, latency percentiles, throughput (and classifier stats)
+Concurrent requests are gathered into micro-batches (at most batch_size events, or whatever arrived
+within max_wait_ms of the first one) and scored with one score_texts call in a worker thread, so the
+event loop keeps accepting requests. When max_queue events are already waiting, new requests get
+503 + Retry-After instead of queueing without bound.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+
+class Overloaded(Exception):
+    """The queue is full; the caller should retry later."""
+
+
+class ServiceMetrics:
+    """Counters plus a window of recent request latencies (for percentiles)."""
+
+    def __init__(self, window: int = 10_000):
+        self.started = time.time()
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.events = 0
+        self.batches = 0
+        self.batched_events = 0
+        self.latencies = deque(maxlen=window)       # seconds per /classify request
+        self.completions = deque(maxlen=window)     # (finish time, events) for recent throughput
+
+    def observe(self, latency: float, events: int):
+        self.requests += 1
+        self.events += events
+        self.latencies.append(latency)
+        self.completions.append((time.time(), events))
+
+    def snapshot(self, queue_depth: int) -> dict:
+        uptime = time.time() - self.started
+        lat = np.asarray(self.latencies, dtype=np.float64) * 1000
+        pct = {f"p{p}": round(float(np.percentile(lat, p)), 3) for p in (50, 90, 99)} if len(lat) else {}
+        cutoff = time.time() - 60
+        recent = sum(n for t, n in self.completions if t >= cutoff)
+        return {
+            "uptime_s": round(uptime, 1),
+            "requests": self.requests,
+            "events": self.events,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_events / self.batches, 2) if self.batches else 0.0,
+            "queue_depth": queue_depth,
+            "latency_ms": pct,
+            "events_per_s": round(self.events / uptime, 2) if uptime else 0.0,
+            "events_per_s_last_60s": round(recent / min(60.0, uptime or 1.0), 2),
+        }
+
+
+class MicroBatcher:
+    """Queues texts from many requests and scores them together in batches."""
+
+    def __init__(self, classifier, batch_size: int = 64, max_wait_ms: float = 10.0, max_queue: int = 2048,
+                 metrics: Optional[ServiceMetrics] = None):
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self.metrics = metrics or ServiceMetrics()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, texts: List[str]) -> np.ndarray:
+        """Score texts as part of upcoming batches; raises Overloaded if they do not fit in the queue."""
+        if self.max_queue - self._queue.qsize() < len(texts):
+            raise Overloaded()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            fut = loop.create_future()
+            self._queue.put_nowait((text, fut))
+            futures.append(fut)
+        return np.stack(await asyncio.gather(*futures)) if futures else np.zeros((0, len(self.classifier.spices)))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            texts = [text for text, _ in batch]
+            try:
+                # Batches run one at a time, so the classifier is never used from two threads
+                scores = await loop.run_in_executor(None, self.classifier.score_texts, texts)
+            except Exception as e:  # fail this batch's requests, keep serving
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.metrics.batches += 1
+            self.metrics.batched_events += len(batch)
+            for (_, fut), row in zip(batch, scores):
+                if not fut.done():
+                    fut.set_result(row)
+
+
+def _event_result(row: np.ndarray, spices: List[str]) -> dict:
+    assigned = {spices[j]: round(float(row[j]), 4) for j in np.flatnonzero(~np.isnan(row))}
+    if not assigned:
+        return {"spices": ["Uncategorized"], "scores": {"Uncategorized": 0.0}}
+    ordered = dict(sorted(assigned.items(), key=lambda x: x[1], reverse=True))
+    return {"spices": list(ordered), "scores": ordered}
+
+
+def _event_text(event: dict) -> str:
+    if not isinstance(event, dict):
+        raise ValueError("each event must be an object with 'title' and/or 'description'")
+    title = event.get("title") or event.get("Title") or ""
+    desc = event.get("description") or event.get("Description") or ""
+    return f"{title}. {desc}"
+
+
+class ClassificationService:
+    def __init__(self, classifier, batch_size: int = 64, max_wait_ms: float = 10.0, max_queue: int = 2048):
+        self.classifier = classifier
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(classifier, batch_size, max_wait_ms, max_queue, self.metrics)
+        self._server = None
+
+    # ---------- request handling ----------
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, dict, Dict[str, str]]:
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"status": "ok", "queue_depth": self.batcher.depth,
+                         "semantic": bool(self.classifier.use_semantic)}, {}
+        if path == "/metrics":
+            data = self.metrics.snapshot(self.batcher.depth)
+            if getattr(self.classifier.stats, "enabled", False):
+                data["classifier"] = self.classifier.stats.to_dict()
+            return 200, data, {}
+        if path != "/classify":
+            return 404, {"error": f"unknown path {path}"}, {}
+        if method != "POST":
+            return 405, {"error": "use POST"}, {"Allow": "POST"}
+
+        start = time.perf_counter()
+        try:
+            payload = json.loads(body or b"{}")
+            single = "events" not in payload
+            events = [payload] if single else payload["events"]
+            if not isinstance(events, list):
+                raise ValueError("'events' must be a list")
+            texts = [_event_text(e) for e in events]
+        except (ValueError, TypeError, AttributeError) as e:
+            return 400, {"error": f"bad request: {e}"}, {}
+        if len(texts) > self.batcher.max_queue:  # would never fit, retrying does not help
+            return 413, {"error": f"at most {self.batcher.max_queue} events per request"}, {}
+        try:
+            scores = await self.batcher.submit(texts)
+        except Overloaded:
+            self.metrics.rejected += 1
+            return 503, {"error": "overloaded, retry later"}, {"Retry-After": "1"}
+        except Exception as e:
+            self.metrics.errors += 1
+            return 500, {"error": repr(e)}, {}
+        spices = self.classifier.spices
+        results = [_event_result(row, spices) for row in scores]
+        self.metrics.observe(time.perf_counter() - start, len(texts))
+        return 200, (results[0] if single else {"results": results}), {}
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, {}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = headers.get("content-length", "0") or "0"
+                if not length.isdigit():  # digits only: rejects "abc", "-1", "+5", " 5"
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, {}, keep_alive=False)
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "body too large"}, {}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, data, extra = await self.handle(method.upper(), path, body)
+                await self._respond(writer, status, data, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status: int, data: dict, extra: Dict[str, str], keep_alive: bool):
+        body = json.dumps(data).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin1") + body)
+        await writer.drain()
+
+    # ---------- lifecycle ----------
+    async def start(self, host: str = "127.0.0.1", port: int = 8080):
+        # Warm up: build keyword tables and load the model before the first request arrives
+        await asyncio.get_running_loop().run_in_executor(None, self.classifier.score_texts, ["warm up"])
+        self.classifier.stats.reset()
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080):
+        server = await self.start(host, port)
+        print(f"✅ SPICES service on http://{host}:{port} (POST /classify, GET /health, GET /metrics)")
+        async with server:
+            await server.serve_forever()
+
+
+def serve(classifier, host: str = "127.0.0.1", port: int = 8080, batch_size: int = 64,
+          max_wait_ms: float = 10.0, max_queue: int = 2048):
+    """Run the service until interrupted."""
+    service = ClassificationService(classifier, batch_size, max_wait_ms, max_queue)
+    try:
+        asyncio.run(service.serve_forever(host, port))
+    except KeyboardInterrupt:
+        pass
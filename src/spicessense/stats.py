@@ -0,0 +1,155 @@
+# src/spicessense/stats.py
+"""
+Counters and timers for SPICESClassifier (enable with SPICESClassifier(collect_stats=True)).
+- Stage timers: near-duplicate grouping, keyword matching, embedding (encode), similarity, score
+  combination, total.
+- Outcome counters: rows, distinct texts, texts actually scored (after near-duplicate grouping),
+  keyword-matched rows, semantic fallback rows, threshold assignments, top-2 soft suggestions,
+  Uncategorized rows, per-SPICE keyword hits and assignments, embedding cache hits/misses.
+- Dump with to_dict()/to_json(), or log a line per batch through the "spicessense.stats" logger.
+When stats are off the classifier holds NULL_STATS, whose methods do nothing.
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("spicessense.stats")
+
+TIMERS = ["dedup", "keyword", "encode", "similarity", "combine", "total"]
+COUNTERS = [
+    "batches", "rows", "distinct_texts", "scored_texts", "keyword_rows", "fallback_rows", "semantic_rows",
+    "soft_suggestion_rows", "uncategorized_rows", "encoded_texts", "cache_hits", "cache_misses",
+]
+
+
+class ClassifierStats:
+    """
+    Cumulative statistics. Row counters count input rows (duplicates included); stage timers are
+    seconds summed over batches (and over workers when a process pool is used).
+    """
+
+    enabled = True
+
+    def __init__(self, spices: Optional[List[str]] = None):
+        self.spices = list(spices or [])
+        self.reset()
+
+    def reset(self):
+        self.timers: Dict[str, float] = {name: 0.0 for name in TIMERS}
+        self.counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+        self.keyword_hits = np.zeros(len(self.spices), dtype=np.int64)
+        self.assigned = np.zeros(len(self.spices), dtype=np.int64)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] = self.timers.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def record_scores(self, kw_mask: np.ndarray, sem: Optional[np.ndarray], scores: np.ndarray,
+                      sem_threshold: float, weights: Optional[np.ndarray] = None):
+        """
+        Classification outcomes for one scored batch of distinct texts (see combine_scores).
+        weights: how many input rows each text stands for (default 1 each).
+        """
+        if weights is None:
+            weights = np.ones(len(scores), dtype=np.int64)
+        keyword_any = kw_mask.any(axis=1)
+        assigned = ~np.isnan(scores)
+        if sem is not None:
+            above = np.nan_to_num(sem, nan=-np.inf) >= np.float64(sem_threshold)
+            semantic = above.any(axis=1) & ~keyword_any
+            soft = ~keyword_any & ~above.any(axis=1)
+        else:
+            semantic = soft = np.zeros(len(scores), dtype=bool)
+        self.count("keyword_rows", weights[keyword_any].sum())
+        self.count("fallback_rows", weights[~keyword_any].sum())
+        self.count("semantic_rows", weights[semantic].sum())
+        self.count("soft_suggestion_rows", weights[soft].sum())
+        self.count("uncategorized_rows", weights[~assigned.any(axis=1)].sum())
+        self.keyword_hits += weights @ kw_mask.astype(np.int64)
+        self.assigned += weights @ assigned.astype(np.int64)
+
+    def merge(self, other):
+        """Add another stats object (or its to_dict()) into this one, e.g. from a pool worker."""
+        data = other.to_dict() if isinstance(other, ClassifierStats) else other
+        for name, seconds in data["timers"].items():
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+        for name, n in data["counters"].items():
+            self.count(name, n)
+        for j, spice in enumerate(self.spices):
+            self.keyword_hits[j] += data["keyword_hits"].get(spice, 0)
+            self.assigned[j] += data["assigned"].get(spice, 0)
+        return self
+
+    @property
+    def fallback_rate(self) -> float:
+        """Share of rows with no keyword match (the ones that need the semantic fallback)."""
+        return self.counters["fallback_rows"] / self.counters["rows"] if self.counters["rows"] else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "timers": {k: round(v, 6) for k, v in self.timers.items()},
+            "counters": dict(self.counters),
+            "fallback_rate": round(self.fallback_rate, 6),
+            "keyword_hits": {s: int(n) for s, n in zip(self.spices, self.keyword_hits)},
+            "assigned": {s: int(n) for s, n in zip(self.spices, self.assigned)},
+        }
+
+    def to_json(self, path: Optional[str] = None, **kwargs) -> str:
+        """JSON string of to_dict(); also written to path if given."""
+        text = json.dumps(self.to_dict(), **{"indent": 2, **kwargs})
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def summary(self) -> str:
+        c, t = self.counters, self.timers
+        return (
+            f"{c['rows']} rows ({c['distinct_texts']} distinct, {c['scored_texts']} scored) in {t['total']:.3f}s | "
+            f"keyword {t['keyword']:.3f}s, encode {t['encode']:.3f}s ({c['encoded_texts']} encoded, "
+            f"{c['cache_hits']} cache hits), similarity {t['similarity']:.3f}s | "
+            f"fallback {self.fallback_rate:.1%}, semantic {c['semantic_rows']}, "
+            f"soft suggestions {c['soft_suggestion_rows']}, uncategorized {c['uncategorized_rows']}"
+        )
+
+    def log(self, level: int = logging.INFO, prefix: str = "SPICES stats"):
+        logger.log(level, "%s: %s", prefix, self.summary())
+
+
+class _NullStats(ClassifierStats):
+    """Stats turned off: every call is a no-op."""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__([])
+
+    def timer(self, name: str):
+        return nullcontext()
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def record_scores(self, *args, **kwargs):
+        pass
+
+    def merge(self, other):
+        return self
+
+    def log(self, *args, **kwargs):
+        pass
+
+
+NULL_STATS = _NullStats()
@@ -0,0 +1,78 @@
+# src/spicessense/tagging.py
+"""
+Multi-label keyword tagging for event tables.
+- Matching is done by keyword_match.KeywordMatcher, the engine SPICESClassifier uses, so the scripts
+  and the classifier agree on what counts as a match for the same keyword list.
+- Produces a rows x categories boolean matrix in one scan per text (no per-category passes).
+- Supports multi-label output and a first-match policy (first category, in map order, that matches).
+The keyword map is configuration: each script passes its own {category: [keywords]}.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from .keyword_match import get_keyword_matcher
+
+
+def combine_text_columns(df: pd.DataFrame, columns: Iterable[str], lower: bool = True) -> pd.Series:
+    """
+    Join the given columns into one text Series separated by spaces (missing columns/values become '').
+    """
+    text = None
+    for col in columns:
+        part = df[col].fillna("").astype(str) if col in df.columns else pd.Series("", index=df.index)
+        text = part if text is None else text + " " + part
+    if text is None:
+        text = pd.Series("", index=df.index)
+    return text.str.lower() if lower else text
+
+
+class KeywordTagger:
+    """
+    Tags text columns with categories from a {category: [keywords]} map.
+
+    word_boundary=True matches whole words/phrases (r"\\bkw\\b"); False matches plain substrings,
+    the way the older first-match scripts did.
+    """
+
+    def __init__(self, keyword_map: Dict[str, List[str]], word_boundary: bool = True):
+        self.keyword_map = keyword_map
+        self.word_boundary = word_boundary
+        self.matcher = get_keyword_matcher(keyword_map, word_boundary=word_boundary)
+
+    @property
+    def categories(self) -> List[str]:
+        self.matcher.refresh()
+        return self.matcher.spices
+
+    def tag_matrix(self, texts: pd.Series) -> pd.DataFrame:
+        """
+        Boolean DataFrame (rows x categories): True where the category has a keyword in the text
+        (matched case-insensitively, see KeywordMatcher.mask).
+        """
+        texts = texts.fillna("").astype(str)
+        mask = self.matcher.mask(texts.tolist())
+        return pd.DataFrame(mask, index=texts.index, columns=self.matcher.spices)
+
+    def first_match(self, texts: pd.Series, default: str = "Uncategorized") -> pd.Series:
+        """
+        Single label per row: the first category (in keyword-map order) with a match, else `default`.
+        """
+        matrix = self.tag_matrix(texts).to_numpy()
+        labels = np.asarray(self.categories, dtype=object)
+        if not len(labels):
+            return pd.Series(default, index=texts.index, dtype=object)
+        first = labels[matrix.argmax(axis=1)]
+        return pd.Series(np.where(matrix.any(axis=1), first, default), index=texts.index, dtype=object)
+
+    def tag(self, texts: pd.Series, policy: str = "multi", default: str = "Uncategorized"):
+        """
+        policy="multi": boolean matrix (see tag_matrix); policy="first": label Series (see first_match).
+        """
+        if policy == "multi":
+            return self.tag_matrix(texts)
+        if policy == "first":
+            return self.first_match(texts, default=default)
+        raise ValueError(f"policy must be 'multi' or 'first', got {policy!r}")
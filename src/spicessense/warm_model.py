@@ -0,0 +1,142 @@
+# src/spicessense/warm_model.py
+"""
+Long-lived "warm" sentence-transformers process.
+- `python -m spicessense serve-model` loads the model once and answers encode requests over a local socket.
+- RemoteEncoder is a drop-in for SentenceTransformer.encode that talks to that process, so scripts and
+  Streamlit reruns skip the multi-second model load.
+- SemanticMatcher uses it automatically when SPICESSENSE_MODEL_SERVER=host:port is set and reachable.
+- multiprocessing.connection unpickles every message, so the socket is guarded by a random key that
+  serve-model writes to MODEL_SERVER_KEYFILE (mode 0600) on first start; clients of the same user
+  read it from there (or set SPICESSENSE_MODEL_AUTHKEY on both sides, e.g. across hosts).
+"""
+
+import os
+import secrets
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .config import MODEL_SERVER_KEYFILE
+
+DEFAULT_ADDRESS = ("127.0.0.1", 8765)
+
+
+def load_authkey(create: bool = False, path: str = MODEL_SERVER_KEYFILE) -> Optional[bytes]:
+    """
+    The server's shared secret: SPICESSENSE_MODEL_AUTHKEY if set, else the key file. With create,
+    a missing key file is generated (32 random bytes, hex, mode 0600); otherwise None is returned.
+    """
+    env = os.environ.get("SPICESSENSE_MODEL_AUTHKEY")
+    if env:
+        return env.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        if not create:
+            return None
+    os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+    key = secrets.token_hex(32).encode("ascii")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:  # another server created it first
+        return load_authkey(path=path)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    """'host:port' (or just 'port') -> (host, port)."""
+    host, _, port = value.rpartition(":")
+    return (host or DEFAULT_ADDRESS[0], int(port))
+
+
+def configured_address() -> Optional[Tuple[str, int]]:
+    value = os.environ.get("SPICESSENSE_MODEL_SERVER", "").strip()
+    return parse_address(value) if value else None
+
+
+class RemoteEncoder:
+    """
+    Client for a warm model process. Mirrors SentenceTransformer.encode for the arguments
+    SemanticMatcher uses. One connection per encoder, guarded by a lock.
+    """
+
+    def __init__(self, address: Tuple[str, int] = DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+        self.address = address
+        authkey = authkey or load_authkey()
+        if authkey is None:
+            raise AuthenticationError("no model server key (start serve-model, or set SPICESSENSE_MODEL_AUTHKEY)")
+        self._conn = Client(address, authkey=authkey)
+        self._lock = threading.Lock()
+        self.model_name = self._request(("info",))["model_name"]
+
+    def _request(self, msg):
+        with self._lock:
+            self._conn.send(msg)
+            status, payload = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"warm model server error: {payload}")
+        return payload
+
+    def encode(self, texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        return np.asarray(self._request(("encode", list(texts), batch_size)), dtype=np.float32)
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(address: Optional[Tuple[str, int]] = None) -> Optional[RemoteEncoder]:
+    """RemoteEncoder for the configured/given server, or None if nothing (we hold the key for) is listening there."""
+    address = address or configured_address()
+    if address is None:
+        return None
+    try:
+        return RemoteEncoder(address)
+    except (OSError, EOFError, AuthenticationError):
+        return None
+
+
+def _handle(conn, model, model_name):
+    with conn:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                if msg[0] == "encode":
+                    _, texts, batch_size = msg
+                    embs = model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                        show_progress_bar=False)
+                    conn.send(("ok", np.asarray(embs, dtype=np.float32)))
+                elif msg[0] == "info":
+                    conn.send(("ok", {"model_name": model_name}))
+                else:
+                    conn.send(("error", f"unknown request {msg[0]!r}"))
+            except Exception as e:  # keep serving other requests
+                conn.send(("error", repr(e)))
+
+
+def serve(model_name: str, address: Tuple[str, int] = DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+    """Load the model once and serve encode requests until interrupted (one thread per client)."""
+    from sentence_transformers import SentenceTransformer
+
+    authkey = authkey or load_authkey(create=True)
+    model = SentenceTransformer(model_name)
+    with Listener(address, authkey=authkey) as listener:
+        print(f"✅ Serving '{model_name}' on {address[0]}:{address[1]} (Ctrl+C to stop)")
+        if "SPICESSENSE_MODEL_AUTHKEY" not in os.environ:
+            print(f"   Clients authenticate with the key in {MODEL_SERVER_KEYFILE}")
+        while True:
+            try:
+                conn = listener.accept()
+            except KeyboardInterrupt:
+                return
+            except Exception:  # bad authkey / aborted handshake
+                continue
+            threading.Thread(target=_handle, args=(conn, model, model_name), daemon=True).start()